@@ -0,0 +1,780 @@
+"""
+Benchmarks and parity checks for the NexGenTeck AI Chatbot backend.
+
+Run from the Chatbot directory, for example:
+    python benchmarks.py embedding-backends --backend onnx-int8
+
+Every subcommand prints a small plain-text report; nothing is written to
+the knowledge base.
+"""
+
+import os
+
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+SAMPLE_QUERIES = [
+    "What services do you offer?",
+    "How do I contact your team?",
+    "Do you build mobile apps for iOS and Android?",
+    "Can you help with SEO for my online store?",
+    "I want to hire you for an AI chatbot project",
+    "What technologies do you use for web development?",
+    "Do you do 3D product visualization?",
+    "How much does a website cost?",
+    "Hola, ¿ofrecen desarrollo de software a medida?",
+    "Do you offer blockchain development?",
+]
+
+
+def _sample_corpus() -> List[str]:
+    """Chunked fallback knowledge base, used when no crawl is available."""
+    from chunking import chunk_document
+    from scraper import WebsiteScraper
+
+    corpus = []
+    for doc in WebsiteScraper()._get_fallback_content():
+        corpus.extend(chunk.text for chunk in chunk_document(doc['content']))
+    return corpus
+
+
+def _median_seconds(fn: Callable[[], object], repeat: int) -> float:
+    """Run fn repeat times (after one warm-up call) and return the median duration."""
+    fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def _print_table(rows: List[Dict[str, object]]):
+    """Print a list of dicts as an aligned table."""
+    if not rows:
+        return
+    headers = list(rows[0])
+    widths = {h: max(len(h), *(len(str(r[h])) for r in rows)) for h in headers}
+    print("  ".join(h.ljust(widths[h]) for h in headers))
+    for row in rows:
+        print("  ".join(str(row[h]).ljust(widths[h]) for h in headers))
+
+
+# ----------------------------------------------------------------------
+# Embedding backends
+# ----------------------------------------------------------------------
+
+def bench_embedding_backends(args):
+    """Compare an embedding backend against full-precision torch."""
+    from config import config
+    from embeddings import load_embedding_model
+
+    corpus = _sample_corpus()
+    queries = SAMPLE_QUERIES
+    texts = corpus + queries
+
+    candidates = args.backend or ["torch-int8", "onnx", "onnx-int8"]
+    backends = ["torch"] + [b for b in candidates if b != "torch"]
+    models = {}
+    for backend in backends:
+        start = time.perf_counter()
+        models[backend] = load_embedding_model(config.EMBEDDING_MODEL, backend)
+        print(f"Loaded {backend} in {time.perf_counter() - start:.1f}s")
+
+    reference = models["torch"].encode(texts, normalize_embeddings=True)
+    ref_corpus, ref_queries = reference[:len(corpus)], reference[len(corpus):]
+    ref_top = np.argsort(-(ref_queries @ ref_corpus.T), axis=1)[:, :args.top_k]
+
+    rows = []
+    for backend, model in models.items():
+        vectors = model.encode(texts, normalize_embeddings=True)
+        cosine = np.sum(vectors * reference, axis=1)
+
+        top = np.argsort(-(vectors[len(corpus):] @ vectors[:len(corpus)].T), axis=1)[:, :args.top_k]
+        overlap = np.mean([len(set(a) & set(b)) / args.top_k for a, b in zip(top, ref_top)])
+
+        single = _median_seconds(
+            lambda: model.encode(queries[0], normalize_embeddings=True),
+            args.repeat
+        )
+        batch = _median_seconds(
+            lambda: model.encode(corpus, normalize_embeddings=True),
+            max(1, args.repeat // 5)
+        )
+
+        rows.append({
+            "backend": backend,
+            "cos_mean": f"{cosine.mean():.4f}",
+            "cos_min": f"{cosine.min():.4f}",
+            f"top{args.top_k}_agree": f"{overlap:.2%}",
+            "query_ms": f"{single * 1000:.1f}",
+            "corpus_texts/s": f"{len(corpus) / batch:.1f}",
+        })
+
+    print(f"\n{config.EMBEDDING_MODEL}: {len(corpus)} chunks, {len(queries)} queries")
+    _print_table(rows)
+
+
+# ----------------------------------------------------------------------
+# Vector search backends
+# ----------------------------------------------------------------------
+
+def bench_vector_search(args):
+    """Compare the NumPy backend against qdrant-client's ":memory:" mode."""
+    from qdrant_client import QdrantClient
+    from vector_backends import NumpyBackend, QdrantBackend
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.points, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(args.points)]
+    payloads = [{"content": f"chunk {i}"} for i in range(args.points)]
+    vector_lists = vectors.tolist()
+    query_lists = queries.tolist()
+
+    backends = {
+        "qdrant-memory": QdrantBackend(QdrantClient(":memory:"), in_memory=True),
+        "numpy": NumpyBackend(),
+    }
+
+    results = {}
+    rows = []
+    for name, backend in backends.items():
+        backend.create_collection("bench", args.dim)
+
+        start = time.perf_counter()
+        backend.upsert("bench", ids, vector_lists, payloads)
+        upsert_s = time.perf_counter() - start
+
+        latencies = []
+        hits = []
+        for query in query_lists:
+            start = time.perf_counter()
+            hits.append([hit.id for hit in backend.search("bench", query, args.top_k)])
+            latencies.append(time.perf_counter() - start)
+        results[name] = hits
+
+        latencies.sort()
+        rows.append({
+            "backend": name,
+            "upsert_s": f"{upsert_s:.2f}",
+            "search_p50_ms": f"{statistics.median(latencies) * 1000:.2f}",
+            "search_p95_ms": f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}",
+        })
+
+    agree = np.mean([
+        len(set(a) & set(b)) / args.top_k
+        for a, b in zip(results["qdrant-memory"], results["numpy"])
+    ])
+
+    print(f"{args.points} points x {args.dim} dims, {args.queries} queries, top-{args.top_k}")
+    _print_table(rows)
+    print(f"top-{args.top_k} agreement: {agree:.2%}")
+
+
+def bench_snapshot(args):
+    """Save an index snapshot and time restoring it into each in-memory backend."""
+    import tempfile
+    from qdrant_client import QdrantClient
+    from snapshot import IndexSnapshot
+    from vector_backends import NumpyBackend, QdrantBackend
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.points, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = vectors[0].tolist()
+    ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(args.points)]
+    payloads = [{"content": f"chunk {i} " + "lorem ipsum " * 60, "source": f"https://example.com/{i}"}
+                for i in range(args.points)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = IndexSnapshot(directory)
+        start = time.perf_counter()
+        manifest = snapshot.save(ids, vectors, payloads, "bench-model")
+        save_s = time.perf_counter() - start
+        sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+
+        rows = []
+        for name, factory in (
+            ("numpy", NumpyBackend),
+            ("qdrant-memory", lambda: QdrantBackend(QdrantClient(":memory:"), in_memory=True)),
+        ):
+            backend = factory()
+            start = time.perf_counter()
+            _, loaded_ids, loaded_vectors, loaded_payloads = snapshot.load("bench-model")
+            backend.load_collection("bench", loaded_ids, loaded_vectors, loaded_payloads)
+            restore_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            hits = backend.search("bench", query, args.top_k)
+            first_search_s = time.perf_counter() - start
+            rows.append({
+                "backend": name,
+                "restore_ms": f"{restore_s * 1000:.0f}",
+                "first_search_ms": f"{first_search_s * 1000:.1f}",
+                "top_hit_ok": hits[0].id == ids[0],
+            })
+            del backend, loaded_vectors
+
+        refused = snapshot.load("another-model") is None
+        refused_backend = snapshot.load("bench-model", "onnx-int8", "qint8_avx2") is None
+
+    print(f"{manifest['count']} points x {manifest['dim']} dims, saved in {save_s * 1000:.0f} ms: "
+          + ", ".join(f"{name.split('-')[0]} {size / 2**20:.1f} MiB" for name, size in sorted(sizes.items())))
+    _print_table(rows)
+    print(f"snapshot for another model refused: {refused}, for another backend: {refused_backend}")
+
+
+# ----------------------------------------------------------------------
+# LLM client
+# ----------------------------------------------------------------------
+
+def _percentile_ms(latencies: List[float], p: float) -> str:
+    ordered = sorted(latencies)
+    return f"{ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000:.0f}"
+
+
+def bench_llm_client(args):
+    """Connection reuse, retries and hedging against a local stand-in server."""
+    import asyncio
+
+    import httpx
+
+    from llm_client import LLMClient, LLMError
+    from tests.llm_stub import StandInLLMServer
+
+    server = StandInLLMServer(
+        latency_ms=args.latency_ms,
+        tail_ms=args.tail_ms,
+        tail_rate=args.tail_rate,
+        error_rate=args.error_rate,
+    )
+    messages = [{"role": "user", "content": "What services do you offer?"}]
+
+    async def per_request_client():
+        # Previous behaviour: a new client (and connection) for every message
+        async with httpx.AsyncClient(base_url=server.url) as client:
+            response = await client.post("/chat/completions", json={"messages": messages})
+            if response.status_code != 200:
+                raise LLMError(f"HTTP {response.status_code}", status_code=response.status_code)
+            return response.json()["choices"][0]["message"]["content"]
+
+    async def run(call):
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+        errors = 0
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    reply = await call()
+                    assert reply.startswith("echo:"), reply
+                    latencies.append(time.perf_counter() - start)
+                except LLMError:
+                    errors += 1
+
+        await asyncio.gather(*(one() for _ in range(args.requests)))
+        return latencies, errors
+
+    variants = {
+        "client per request": (per_request_client, None),
+        "shared": (None, LLMClient(base_url=server.url, api_key="test", hedge_percentile=0)),
+        f"shared + hedge p{args.hedge_percentile:g}": (
+            None, LLMClient(base_url=server.url, api_key="test", hedge_percentile=args.hedge_percentile)
+        ),
+    }
+
+    rows = []
+    for name, (call, client) in variants.items():
+        if client is not None:
+            async def call(client=client):
+                return await client.chat(messages, temperature=0.1, max_tokens=64)
+
+            # Warm the latency window so hedging has a percentile to work with
+            async def warm(client=client):
+                for _ in range(30):
+                    await client.chat(messages, temperature=0.1, max_tokens=64)
+            asyncio.run(warm())
+        server.reset()
+        latencies, errors = asyncio.run(run(call))
+        stats = client.status() if client is not None else {}
+        rows.append({
+            "variant": name,
+            "p50_ms": _percentile_ms(latencies, 50),
+            "p95_ms": _percentile_ms(latencies, 95),
+            "p99_ms": _percentile_ms(latencies, 99),
+            "errors": errors,
+            "server_requests": server.requests,
+            "connections": len(server.connections),
+            "retries": stats.get("retries", "-"),
+            "hedged": stats.get("hedged", "-"),
+            "hedge_wins": stats.get("hedge_wins", "-"),
+        })
+
+    # Streaming parity: the streamed fragments join to the full reply
+    async def stream_once():
+        client = LLMClient(base_url=server.url, api_key="test")
+        text = "".join([t async for t in client.stream(messages, temperature=0.1, max_tokens=64)])
+        await client.aclose()
+        return text.strip()
+
+    streamed = asyncio.run(stream_once())
+    server.close()
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"latency {args.latency_ms:g} ms (+{args.tail_ms:g} ms for {args.tail_rate:.0%}), "
+        f"error rate {args.error_rate:.0%}"
+    )
+    _print_table(rows)
+    print(f"stream: {streamed!r} ({'ok' if streamed == 'echo: ' + messages[-1]['content'] else 'MISMATCH'})")
+
+
+# ----------------------------------------------------------------------
+# Intent fast path
+# ----------------------------------------------------------------------
+
+INTENT_SAMPLE_MESSAGES = SAMPLE_QUERIES + [
+    "hi",
+    "Hello there!",
+    "good evening",
+    "thanks a lot",
+    "ok, bye",
+    "What is your email?",
+    "Can I get a quote for an e-commerce site?",
+    "I need a team to build my startup's MVP",
+    "Your contact form is broken",
+    "Tell me more about NexGenTeck",
+]
+
+
+def bench_rerank_cache(args):
+    """Cached re-ranker scoring vs. CrossEncoder.predict: score parity and latency."""
+    from reranker import CrossEncoderReranker, reranker
+
+    model = CrossEncoderReranker._model
+    if model is None:
+        print("Re-ranker model not loaded (ENABLE_RERANKING / RERANK_MODEL)")
+        return
+
+    corpus = _sample_corpus()
+    rng = np.random.default_rng(0)
+    size = min(args.candidates, len(corpus))
+    pools = [[corpus[i] for i in rng.choice(len(corpus), size=size, replace=False)] for _ in SAMPLE_QUERIES]
+
+    def timed(score):
+        latencies, results = [], []
+        for query, pool in zip(SAMPLE_QUERIES, pools):
+            start = time.perf_counter()
+            results.append(np.asarray(score(query, pool), dtype=np.float32))
+            latencies.append(time.perf_counter() - start)
+        return statistics.median(latencies) * 1000, results
+
+    baseline_ms, expected = timed(
+        lambda query, pool: model.predict([(query, content) for content in pool], show_progress_bar=False)
+    )
+    reranker.invalidate()
+    cold_ms, cold = timed(reranker._cached_scores)
+    # New queries against chunks that are already tokenized
+    reranker._scores.clear()
+    tokens_ms, _ = timed(reranker._cached_scores)
+    repeat_ms, _ = timed(reranker._cached_scores)
+
+    max_diff = max(float(np.max(np.abs(a - b))) for a, b in zip(cold, expected))
+    print(f"{len(SAMPLE_QUERIES)} queries x {size} candidates from {len(corpus)} chunks")
+    _print_table([
+        {"scoring": "CrossEncoder.predict", "p50_ms": f"{baseline_ms:.1f}"},
+        {"scoring": "cold caches", "p50_ms": f"{cold_ms:.1f}"},
+        {"scoring": "chunks pre-tokenized", "p50_ms": f"{tokens_ms:.1f}"},
+        {"scoring": "repeated queries", "p50_ms": f"{repeat_ms:.2f}"},
+    ])
+    print(f"max |score difference| vs. predict: {max_diff:.2e}")
+    status = reranker.status()
+    print(f"token cache: {status['token_cache']}")
+    print(f"score cache: {status['score_cache']}")
+
+
+def bench_intent_fastpath(args):
+    """Fast-path hit rate and agreement with the LLM intent labels."""
+    import asyncio
+
+    from intent_classifier import NO_CONTEXT_INTENTS, intent_classifier
+    from sentiment import llm_analyzer
+
+    messages = INTENT_SAMPLE_MESSAGES
+    if args.messages:
+        with open(args.messages, "r", encoding="utf-8") as f:
+            messages = [line.strip() for line in f if line.strip()]
+
+    async def run():
+        rows = []
+        for message in messages:
+            prediction = await intent_classifier.classify(message)
+            start = time.perf_counter()
+            analysis = await llm_analyzer._analyze_intent_llm(message)
+            llm_ms = (time.perf_counter() - start) * 1000
+            if analysis.get("intent_source") == "llm":
+                intent_classifier.record(prediction, analysis)
+            rows.append({
+                "message": message[:40],
+                "fastpath": prediction["intent"] if prediction["confident"] else "-",
+                "best": prediction["intent"],
+                "score": f"{prediction['score']:.3f}",
+                "margin": f"{prediction['margin']:.3f}",
+                "llm": analysis.get("intent"),
+                "llm_ms": f"{llm_ms:.0f}",
+                "context_ok": (prediction["intent"] not in NO_CONTEXT_INTENTS)
+                              == analysis.get("needs_context", True),
+            })
+        return rows
+
+    rows = asyncio.run(run())
+    _print_table(rows)
+    print()
+    for key, value in intent_classifier.status().items():
+        print(f"{key}: {value}")
+
+
+def bench_crawl(args):
+    """Crawl wall time by number of workers, checking the output is identical."""
+    from config import config
+    from scraper import WebsiteScraper
+
+    config.CRAWL_HOST_DELAY_SECONDS = args.host_delay
+    config.CRAWL_HTTP_FIRST = not args.browser_only
+    rows = []
+    baseline = None
+    for workers in args.workers:
+        config.CRAWL_WORKERS = workers
+        config.CRAWL_HOST_CONCURRENCY = workers
+        scraper = WebsiteScraper(args.url)
+        start = time.perf_counter()
+        scraper._crawl_site(max_pages=args.max_pages)
+        elapsed = time.perf_counter() - start
+
+        output = [(doc["metadata"]["source"], doc["content"]) for doc in scraper.documents]
+        if baseline is None:
+            baseline = (elapsed, output)
+        rows.append({
+            "workers": workers,
+            "pages": len(scraper.visited_urls),
+            "documents": len(scraper.documents),
+            "http": scraper.crawl_report["pages_http"],
+            "browser": scraper.crawl_report["pages_browser"],
+            "wall_s": f"{elapsed:.1f}",
+            "pages_per_s": f"{len(scraper.visited_urls) / elapsed:.2f}",
+            "speedup": f"{baseline[0] / elapsed:.2f}x",
+            "same_output": output == baseline[1],
+        })
+    _print_table(rows)
+
+
+def bench_extractor(args):
+    """
+    Single-pass lxml extractor vs. the previous BeautifulSoup walk, per-page
+    time. Output parity is covered by tests/test_extractor.py.
+    """
+    import glob
+
+    from scraper import collect_page_content
+    from tests.extractor_reference import legacy_page_content, synthetic_pages
+
+    pages = synthetic_pages()
+    for pattern in args.html:
+        paths = glob.glob(os.path.join(pattern, "*.html")) if os.path.isdir(pattern) else glob.glob(pattern)
+        for path in sorted(paths):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                pages[os.path.basename(path)] = f.read()
+    if args.url:
+        import httpx
+        with httpx.Client(follow_redirects=True, timeout=30) as client:
+            for url in args.url:
+                pages[url] = client.get(url).text
+
+    rows = []
+    for name, html in pages.items():
+        legacy_s = _median_seconds(lambda: legacy_page_content(html), args.repeat)
+        current_s = _median_seconds(lambda: collect_page_content(html), args.repeat)
+        rows.append({
+            "page": name[:40],
+            "kb": f"{len(html.encode('utf-8')) / 1024:.0f}",
+            "bs4_ms": f"{legacy_s * 1000:.2f}",
+            "single_pass_ms": f"{current_s * 1000:.2f}",
+            "speedup": f"{legacy_s / current_s:.1f}x" if current_s else "-",
+        })
+    _print_table(rows)
+
+
+def _chunking_corpus(args) -> List[Dict[str, object]]:
+    """
+    Pages for the chunking benchmark: their assembled text and target
+    passages (paragraphs and list items, or lines of the fallback content).
+    """
+    import glob
+
+    from scraper import WebsiteScraper, collect_page_content
+
+    pages = []
+
+    def add_html(url: str, html: str):
+        content = collect_page_content(html)
+        pages.append({
+            "url": url,
+            "text": WebsiteScraper._page_text(content, url),
+            "targets": content.paragraphs + content.list_items[:30],
+        })
+
+    for pattern in args.html:
+        paths = glob.glob(os.path.join(pattern, "*.html")) if os.path.isdir(pattern) else glob.glob(pattern)
+        for path in sorted(paths):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                add_html(f"file://{os.path.abspath(path)}", f.read())
+    if args.url:
+        import httpx
+        with httpx.Client(follow_redirects=True, timeout=30) as client:
+            for url in args.url:
+                add_html(url, client.get(url).text)
+    if not pages:
+        for doc in WebsiteScraper()._get_fallback_content():
+            lines = [line.strip() for line in doc['content'].splitlines()]
+            pages.append({"url": doc['metadata']['title'], "text": doc['content'], "targets": lines})
+
+    for page in pages:
+        page["targets"] = [t for t in page["targets"] if len(t.split()) >= args.min_target_words]
+    return pages
+
+
+def _tfidf_search(chunks: List[str], queries: List[str], top_k: int) -> np.ndarray:
+    """Top-k chunk indices per query by TF-IDF cosine (model-free retriever)."""
+    vocabulary: Dict[str, int] = {}
+    def bag(text: str) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for word in text.lower().split():
+            word = word.strip(".,:;!?()[]\"'•|")
+            if word:
+                index = vocabulary.setdefault(word, len(vocabulary))
+                counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    chunk_bags = [bag(text) for text in chunks]
+    query_bags = [bag(text) for text in queries]
+    matrix = np.zeros((len(chunks), len(vocabulary)), dtype=np.float32)
+    for row, counts in enumerate(chunk_bags):
+        for index, count in counts.items():
+            matrix[row, index] = count
+    idf = np.log((1 + len(chunks)) / (1 + (matrix > 0).sum(axis=0))) + 1
+    matrix *= idf
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+    query_matrix = np.zeros((len(queries), len(vocabulary)), dtype=np.float32)
+    for row, counts in enumerate(query_bags):
+        for index, count in counts.items():
+            query_matrix[row, index] = count
+    query_matrix *= idf
+    return np.argsort(-(query_matrix @ matrix.T), axis=1)[:, :top_k]
+
+
+def bench_chunking(args):
+    """Structure/token-aware chunker vs. the previous 800-char window: index size and recall."""
+    import random
+
+    from chunking import chunk_document, get_token_counter
+    from utils import chunk_text
+
+    pages = _chunking_corpus(args)
+    counter = get_token_counter()
+
+    # Queries: the first half of a target passage. A hit is a retrieved chunk
+    # holding the whole passage, so a passage split across chunks can't hit.
+    rng = random.Random(0)
+    targets = [(page["url"], target) for page in pages for target in page["targets"]]
+    rng.shuffle(targets)
+    targets = targets[:args.queries]
+    queries = [" ".join(t.split()[:max(4, len(t.split()) // 2)]) for _, t in targets]
+
+    chunkers = {"chars-800/100": lambda text: chunk_text(text, chunk_size=800, overlap=100)}
+    for max_tokens in args.max_tokens:
+        chunkers[f"tokens-{max_tokens}"] = (
+            lambda text, max_tokens=max_tokens: [c.text for c in chunk_document(text, max_tokens, counter)]
+        )
+
+    model = None
+    if args.retriever == "embedding":
+        from config import config
+        from embeddings import load_embedding_model
+        model = load_embedding_model(config.EMBEDDING_MODEL, config.EMBEDDING_BACKEND)
+        query_vectors = model.encode(queries, normalize_embeddings=True)
+
+    page_chars = sum(len(page["text"]) for page in pages)
+    rows = []
+    for name, chunker in chunkers.items():
+        chunks, owners = [], []
+        for page in pages:
+            for chunk in chunker(page["text"]):
+                chunks.append(chunk)
+                owners.append(page["url"])
+        seconds = _median_seconds(lambda: [chunker(page["text"]) for page in pages], args.repeat)
+        tokens = counter.count(chunks)
+
+        split = sum(
+            not any(target in chunk for chunk, owner in zip(chunks, owners) if owner == url)
+            for url, target in targets
+        )
+        if model is not None:
+            vectors = model.encode(chunks, normalize_embeddings=True)
+            top = np.argsort(-(query_vectors @ vectors.T), axis=1)[:, :args.top_k]
+        else:
+            top = _tfidf_search(chunks, queries, args.top_k)
+        hits_at_1 = hits_at_k = 0
+        for (_, target), ranked in zip(targets, top):
+            found = [target in chunks[index] for index in ranked]
+            hits_at_1 += found[0]
+            hits_at_k += any(found)
+
+        total_chars = sum(len(chunk) for chunk in chunks)
+        rows.append({
+            "chunker": name,
+            "chunks": len(chunks),
+            "index_chars": total_chars,
+            "vs_page_text": f"{total_chars / page_chars:.2f}x",
+            "tokens_mean": f"{statistics.mean(tokens):.0f}",
+            "tokens_max": max(tokens),
+            "split_targets": split,
+            "recall@1": f"{hits_at_1 / len(targets):.2%}",
+            f"recall@{args.top_k}": f"{hits_at_k / len(targets):.2%}",
+            "chunk_ms": f"{seconds * 1000:.1f}",
+        })
+
+    print(f"\n{len(pages)} pages, {len(targets)} queries, tokens counted with {counter.name}, "
+          f"retriever: {args.retriever}")
+    _print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    embed = subparsers.add_parser(
+        "embedding-backends",
+        help="Cosine parity and speed of embedding backends vs. torch"
+    )
+    embed.add_argument(
+        "--backend", action="append", default=[],
+        help="Backend to compare (repeatable): torch-int8, onnx, onnx-int8"
+    )
+    embed.add_argument("--top-k", type=int, default=5)
+    embed.add_argument("--repeat", type=int, default=20)
+    embed.set_defaults(func=bench_embedding_backends)
+
+    vectors = subparsers.add_parser(
+        "vector-search",
+        help="NumPy exact search vs. Qdrant :memory: on synthetic vectors"
+    )
+    vectors.add_argument("--points", type=int, default=3000)
+    vectors.add_argument("--dim", type=int, default=1024)
+    vectors.add_argument("--queries", type=int, default=200)
+    vectors.add_argument("--top-k", type=int, default=25)
+    vectors.set_defaults(func=bench_vector_search)
+
+    snapshots = subparsers.add_parser(
+        "snapshot",
+        help="Index snapshot save / restore time per in-memory backend"
+    )
+    snapshots.add_argument("--points", type=int, default=5000)
+    snapshots.add_argument("--dim", type=int, default=1024)
+    snapshots.add_argument("--top-k", type=int, default=5)
+    snapshots.set_defaults(func=bench_snapshot)
+
+    llm = subparsers.add_parser(
+        "llm-client",
+        help="Pooled LLM client vs. a client per request, against a local stand-in server"
+    )
+    llm.add_argument("--requests", type=int, default=300)
+    llm.add_argument("--concurrency", type=int, default=16)
+    llm.add_argument("--latency-ms", type=float, default=20)
+    llm.add_argument("--tail-ms", type=float, default=400)
+    llm.add_argument("--tail-rate", type=float, default=0.05)
+    llm.add_argument("--error-rate", type=float, default=0.05)
+    llm.add_argument("--hedge-percentile", type=float, default=90)
+    llm.set_defaults(func=bench_llm_client)
+
+    rerank = subparsers.add_parser(
+        "rerank-cache",
+        help="Re-ranker token / score caches vs. CrossEncoder.predict (parity, latency)"
+    )
+    rerank.add_argument("--candidates", type=int, default=25)
+    rerank.set_defaults(func=bench_rerank_cache)
+
+    intents = subparsers.add_parser(
+        "intent-fastpath",
+        help="Intent fast-path hit rate and accuracy against LLM labels (calls Groq)"
+    )
+    intents.add_argument("--messages", help="Text file with one message per line")
+    intents.set_defaults(func=bench_intent_fastpath)
+
+    crawl = subparsers.add_parser(
+        "crawl",
+        help="Crawl wall time vs. number of workers (needs Chrome for SPA pages)"
+    )
+    crawl.add_argument("--url", default=None, help="Site to crawl (default WEBSITE_URL)")
+    crawl.add_argument("--max-pages", type=int, default=30)
+    crawl.add_argument(
+        "--workers", type=lambda value: [int(n) for n in value.split(",")], default=[1, 2, 4, 8],
+        help="Comma-separated worker counts, e.g. 1,2,4,8"
+    )
+    crawl.add_argument("--host-delay", type=float, default=0.0)
+    crawl.add_argument(
+        "--browser-only", action="store_true",
+        help="Render every page in Chrome (CRAWL_HTTP_FIRST=false) for comparison"
+    )
+    crawl.set_defaults(func=bench_crawl)
+
+    extractor = subparsers.add_parser(
+        "extractor",
+        help="Single-pass lxml extractor vs. the previous BeautifulSoup walk (per-page time)"
+    )
+    extractor.add_argument(
+        "--html", action="append", default=[],
+        help="Saved page, glob or directory of .html files (repeatable)"
+    )
+    extractor.add_argument("--url", action="append", default=[], help="Page to fetch and time (repeatable)")
+    extractor.add_argument("--repeat", type=int, default=10)
+    extractor.set_defaults(func=bench_extractor)
+
+    chunking = subparsers.add_parser(
+        "chunking",
+        help="Structure/token-aware chunker vs. the previous character window (index size, recall)"
+    )
+    chunking.add_argument(
+        "--html", action="append", default=[],
+        help="Saved page, glob or directory of .html files (repeatable; default: fallback content)"
+    )
+    chunking.add_argument("--url", action="append", default=[], help="Page to fetch (repeatable)")
+    chunking.add_argument(
+        "--max-tokens", type=lambda v: [int(x) for x in v.split(",")], default=[128, 256],
+        help="Comma-separated token budgets to compare"
+    )
+    chunking.add_argument("--retriever", choices=["embedding", "tfidf"], default="embedding")
+    chunking.add_argument("--queries", type=int, default=300)
+    chunking.add_argument("--min-target-words", type=int, default=8)
+    chunking.add_argument("--top-k", type=int, default=3)
+    chunking.add_argument("--repeat", type=int, default=5)
+    chunking.set_defaults(func=bench_chunking)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Structure- and token-aware chunking for the NexGenTeck AI Chatbot.
+
+A page's text, as assembled by WebsiteScraper._extract_all_content, is a
+sequence of blocks separated by blank lines. A section marker ("SECTIONS:",
+"CONTENT:", ...) or an [Hn] heading line starts a new section. Chunks are
+packed from these up to CHUNK_MAX_TOKENS, counted with the tokenizer of
+CHUNK_TOKENIZER (RERANK_MODEL by default, since its 512-token window must
+hold the query and the chunk):
+
+    1. a section that still fits in the current chunk is appended to it
+    2. otherwise a reasonably full chunk is closed, so the section starts
+       a chunk of its own instead of being split across two
+    3. a section over the budget is packed block by block; a block over the
+       budget is split at sentence ends, and a sentence over the budget at
+       token boundaries
+
+Chunks do not overlap, and each one is an exact slice text[start:end] of
+the page text, so its character offsets go into the chunk metadata. Every
+piece of text is tokenized once, so chunking is linear in the page length.
+"""
+
+import logging
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Block labels written by WebsiteScraper._extract_all_content
+PAGE_LABEL = "PAGE:"
+URL_LABEL = "URL:"
+SECTIONS_MARKER = "SECTIONS:"
+CONTENT_MARKER = "CONTENT:"
+ITEMS_MARKER = "FEATURES/ITEMS:"
+TABLES_MARKER = "TABLE DATA:"
+SECTION_MARKERS = (SECTIONS_MARKER, CONTENT_MARKER, ITEMS_MARKER, TABLES_MARKER)
+# Heading blocks look like "[H2] Web Development"
+HEADING_PREFIX = "[H"
+
+BLOCK_SEPARATOR = "\n\n"
+# Tokens charged for joining two blocks
+SEPARATOR_TOKENS = 1
+# A chunk at least this full is closed before a section that doesn't fit;
+# emptier chunks take the start of the section instead
+MIN_FILL_BEFORE_SECTION = 0.5
+# Characters per token assumed when no tokenizer can be loaded
+FALLBACK_CHARS_PER_TOKEN = 4
+
+
+class TextChunk(NamedTuple):
+    """A chunk of a page's text: text == page_text[start:end]."""
+    text: str
+    start: int
+    end: int
+    tokens: int
+
+
+class _Unit(NamedTuple):
+    start: int
+    end: int
+    tokens: int
+
+
+class TokenCounter:
+    """Token counts and token-boundary splits, from a fast tokenizer or a character estimate."""
+
+    def __init__(self, tokenizer=None, name: str = "chars/4"):
+        """
+        Args:
+            tokenizer: Hugging Face fast tokenizer, or None to estimate from characters
+            name: Label for logs and benchmarks
+        """
+        self.name = name
+        self._tokenizer = tokenizer
+        # Fast tokenizers are not safe to call from several threads at once
+        self._lock = threading.Lock()
+
+    def count(self, texts: List[str]) -> List[int]:
+        """Token count of each text (without special tokens)."""
+        if not texts:
+            return []
+        if self._tokenizer is None:
+            return [-(-len(text) // FALLBACK_CHARS_PER_TOKEN) for text in texts]
+        with self._lock:
+            encoded = self._tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def windows(self, text: str, max_tokens: int) -> List[Tuple[int, int, int]]:
+        """
+        Split text into consecutive pieces of at most max_tokens tokens.
+
+        Returns:
+            (start, end, tokens) character spans within text
+        """
+        if self._tokenizer is None:
+            return self._char_windows(text, max_tokens * FALLBACK_CHARS_PER_TOKEN)
+        with self._lock:
+            offsets = self._tokenizer(
+                text, add_special_tokens=False, return_offsets_mapping=True
+            )["offset_mapping"]
+        spans = []
+        for first in range(0, len(offsets), max_tokens):
+            window = offsets[first:first + max_tokens]
+            spans.append((window[0][0], window[-1][1], len(window)))
+        return spans
+
+    @staticmethod
+    def _char_windows(text: str, max_chars: int) -> List[Tuple[int, int, int]]:
+        """Word-boundary pieces of at most max_chars characters."""
+        spans = []
+        start, length = 0, len(text)
+        while start < length:
+            end = min(length, start + max_chars)
+            if end < length:
+                cut = text.rfind(" ", start, end)
+                if cut > start:
+                    end = cut
+            spans.append((start, end, -(-(end - start) // FALLBACK_CHARS_PER_TOKEN)))
+            start = end
+            while start < length and text[start].isspace():
+                start += 1
+        return spans
+
+
+_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """
+    The process-wide counter for CHUNK_TOKENIZER (default RERANK_MODEL).
+    Only the tokenizer files are loaded, not the model. If they can't be
+    loaded, tokens are estimated from characters.
+    """
+    global _counter
+    with _counter_lock:
+        if _counter is None:
+            name = config.CHUNK_TOKENIZER or config.RERANK_MODEL
+            try:
+                from transformers import AutoTokenizer
+                tokenizer = AutoTokenizer.from_pretrained(name)
+                if not tokenizer.is_fast:
+                    raise ValueError("a fast tokenizer is needed for token offsets")
+                _counter = TokenCounter(tokenizer, name)
+                logger.info(f"Chunking with the {name} tokenizer")
+            except Exception as e:
+                logger.warning(f"Chunk tokenizer {name} unavailable, estimating tokens from characters: {e}")
+                _counter = TokenCounter()
+        return _counter
+
+
+def _strip(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Narrow [start, end) to exclude surrounding whitespace."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _blocks(text: str) -> List[Tuple[int, int]]:
+    """Spans of the blank-line separated blocks of text."""
+    spans = []
+    start, length = 0, len(text)
+    while start < length:
+        end = text.find(BLOCK_SEPARATOR, start)
+        if end == -1:
+            end = length
+        span = _strip(text, start, end)
+        if span[0] < span[1]:
+            spans.append(span)
+        start = end + len(BLOCK_SEPARATOR)
+    return spans
+
+
+def _sentences(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """Spans of the sentences (and lines) of text[start:end]."""
+    spans = []
+    piece = start
+    for i in range(start, end - 1):
+        char = text[i]
+        if char == "\n" or (char in ".!?" and text[i + 1] == " "):
+            span = _strip(text, piece, i + 1)
+            if span[0] < span[1]:
+                spans.append(span)
+            piece = i + 1
+    span = _strip(text, piece, end)
+    if span[0] < span[1]:
+        spans.append(span)
+    return spans
+
+
+def starts_section(block: str) -> bool:
+    """Whether a block opens a new section (a section marker or a heading)."""
+    return block in SECTION_MARKERS or block.startswith(HEADING_PREFIX)
+
+
+def _units(text: str, max_tokens: int, counter: TokenCounter) -> List[List[_Unit]]:
+    """Group text into sections of units that each fit in max_tokens."""
+    blocks = _blocks(text)
+    counts = counter.count([text[start:end] for start, end in blocks])
+
+    sections: List[List[_Unit]] = []
+    for (start, end), tokens in zip(blocks, counts):
+        if not sections or starts_section(text[start:end]):
+            sections.append([])
+        if tokens <= max_tokens:
+            sections[-1].append(_Unit(start, end, tokens))
+            continue
+
+        sentences = _sentences(text, start, end)
+        for (s_start, s_end), s_tokens in zip(
+            sentences, counter.count([text[s:e] for s, e in sentences])
+        ):
+            if s_tokens <= max_tokens:
+                sections[-1].append(_Unit(s_start, s_end, s_tokens))
+                continue
+            for w_start, w_end, w_tokens in counter.windows(text[s_start:s_end], max_tokens):
+                sections[-1].append(_Unit(s_start + w_start, s_start + w_end, w_tokens))
+    return sections
+
+
+def chunk_document(
+    text: str,
+    max_tokens: Optional[int] = None,
+    counter: Optional[TokenCounter] = None
+) -> List[TextChunk]:
+    """
+    Split a page's text into chunks along its section structure.
+
+    Args:
+        text: Page text, blocks separated by blank lines
+        max_tokens: Token budget per chunk (default CHUNK_MAX_TOKENS)
+        counter: Token counter (default get_token_counter())
+
+    Returns:
+        Non-overlapping chunks in document order
+    """
+    max_tokens = max_tokens or config.CHUNK_MAX_TOKENS
+    counter = counter or get_token_counter()
+
+    chunks: List[TextChunk] = []
+    current: List[_Unit] = []
+    current_tokens = 0
+
+    def close():
+        nonlocal current, current_tokens
+        if current:
+            start, end = current[0].start, current[-1].end
+            chunks.append(TextChunk(text[start:end], start, end, current_tokens))
+        current, current_tokens = [], 0
+
+    for section in _units(text, max_tokens, counter):
+        section_tokens = sum(unit.tokens for unit in section) + SEPARATOR_TOKENS * (len(section) - 1)
+        if (
+            current
+            and current_tokens + SEPARATOR_TOKENS + section_tokens > max_tokens
+            and current_tokens >= max_tokens * MIN_FILL_BEFORE_SECTION
+        ):
+            close()
+        for position, unit in enumerate(section):
+            cost = unit.tokens + (SEPARATOR_TOKENS if current else 0)
+            if current and current_tokens + cost > max_tokens:
+                # Don't strand the section's marker / heading at the end of a chunk
+                heading = current[-1] if position == 1 and len(current) > 1 else None
+                if heading and heading.tokens + SEPARATOR_TOKENS + unit.tokens <= max_tokens:
+                    current.pop()
+                    current_tokens -= heading.tokens + SEPARATOR_TOKENS
+                else:
+                    heading = None
+                close()
+                if heading:
+                    current, current_tokens = [heading], heading.tokens
+                cost = unit.tokens + (SEPARATOR_TOKENS if current else 0)
+            current.append(unit)
+            current_tokens += cost
+    close()
+    return chunks
@@ -22,8 +22,8 @@ logger = logging.getLogger("cli_chat")
 
 # Import chatbot components
 try:
-    from vector_store import vector_store
     from scraper import WebsiteScraper
+    from ingestion import IngestionPipeline
     from rag_pipeline import process_message
 except ImportError as e:
     print(f"Error importing chatbot components: {e}")
@@ -38,22 +38,12 @@ async def init_chatbot():
     print("📥 Indexing content (checking local translations)...")
     scraper = WebsiteScraper(base_url="http://localhost:3000") 
     
-    # This will use the translation_extractor.py logic I just added
-    documents = scraper.scrape(max_pages=100)
-    
-    if documents:
-        # Clear first to avoid duplicates/stale data
-        try:
-             vector_store.client.recreate_collection(
-                collection_name=vector_store.collection_name,
-                vectors_config=vector_store.client.get_collection(vector_store.collection_name).config.params.vectors
-            )
-        except:
-             pass 
-
-        count = vector_store.add_documents(documents)
-        print(f"✅ Indexed {count} documents correctly from source files!")
-    else:
+    # This will use the translation_extractor.py logic I just added.
+    # Rebuild into a fresh collection to avoid duplicates/stale data
+    try:
+        stats = IngestionPipeline(full=True, max_pages=100, scraper=scraper).run()
+        print(f"✅ Indexed {stats['total']} documents correctly from source files!")
+    except RuntimeError:
         print("⚠️ No documents indexed! Check scraper logic.")
     
     print("------------------------------------------")
@@ -21,6 +21,29 @@ class Config:
     # When enabled, scraper can ingest from local translation files.
     # Keep disabled in production to avoid stale local content overriding live site data.
     USE_TRANSLATION_EXTRACTOR: bool = os.getenv("USE_TRANSLATION_EXTRACTOR", "false").lower() == "true"
+
+    # Crawler
+    # Workers fetching pages in parallel. Each starts its own headless Chrome
+    # (roughly 200 MB of memory) the first time a page needs rendering.
+    # Results do not depend on the number of workers.
+    CRAWL_WORKERS: int = int(os.getenv("CRAWL_WORKERS", "4"))
+    # Fetch pages over plain HTTP first and render only those that look like
+    # an empty SPA shell (no <h1>, or under CRAWL_SPA_MIN_TEXT_CHARS of text)
+    CRAWL_HTTP_FIRST: bool = os.getenv("CRAWL_HTTP_FIRST", "true").lower() == "true"
+    CRAWL_SPA_MIN_TEXT_CHARS: int = int(os.getenv("CRAWL_SPA_MIN_TEXT_CHARS", "200"))
+    # Seed the crawl with the URLs in sitemap.xml (HTTP-first mode only)
+    CRAWL_USE_SITEMAP: bool = os.getenv("CRAWL_USE_SITEMAP", "true").lower() == "true"
+    # Remember ETag / Last-Modified and content hashes per page under
+    # CACHE_DIR/crawl: unchanged pages answer 304 or skip extraction
+    ENABLE_CRAWL_CACHE: bool = os.getenv("ENABLE_CRAWL_CACHE", "true").lower() == "true"
+    # Politeness: concurrent requests per host and minimum gap between their starts
+    CRAWL_HOST_CONCURRENCY: int = int(os.getenv("CRAWL_HOST_CONCURRENCY", "4"))
+    CRAWL_HOST_DELAY_SECONDS: float = float(os.getenv("CRAWL_HOST_DELAY_SECONDS", "0.25"))
+    CRAWL_PAGE_TIMEOUT_SECONDS: float = float(os.getenv("CRAWL_PAGE_TIMEOUT_SECONDS", "30"))
+    # Rendered pages are parsed on this many extraction workers, threads by
+    # default or processes (sidesteps the GIL on large pages)
+    CRAWL_EXTRACT_WORKERS: int = int(os.getenv("CRAWL_EXTRACT_WORKERS", "2"))
+    CRAWL_EXTRACT_PROCESSES: bool = os.getenv("CRAWL_EXTRACT_PROCESSES", "false").lower() == "true"
     
     # CORS Configuration - Restricted to production and local development
     # Override via environment variable for specific deployments
@@ -31,12 +54,31 @@ class Config:
     
     # Model Configuration
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "BAAI/bge-m3")
+    # Inference backend for EMBEDDING_MODEL:
+    #   torch      - full-precision PyTorch (default)
+    #   torch-int8 - PyTorch with dynamically int8-quantized Linear layers
+    #   onnx       - ONNX Runtime export of the model
+    #   onnx-int8  - ONNX Runtime with a dynamically int8-quantized export
+    # The onnx backends need `pip install optimum[onnxruntime]`.
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    # Target instruction set for the onnx-int8 export: arm64, avx2, avx512, avx512_vnni
+    EMBEDDING_ONNX_QUANTIZATION: str = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
     LLM_MODEL: str = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
     
     # RAG Configuration
     MAX_CONTEXT_DOCS: int = int(os.getenv("MAX_CONTEXT_DOCS", "5"))
     RELEVANCE_THRESHOLD: float = float(os.getenv("RELEVANCE_THRESHOLD", "1.5"))
 
+    # Query Embedding Micro-batching
+    # Concurrent /chat queries are collected for up to EMBED_BATCH_MAX_WAIT_MS
+    # (or until EMBED_BATCH_MAX_SIZE queries) and embedded in one forward pass.
+    EMBED_BATCH_MAX_SIZE: int = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+    EMBED_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+    # Queries beyond this many waiting are embedded individually instead
+    EMBED_BATCH_QUEUE_DEPTH: int = int(os.getenv("EMBED_BATCH_QUEUE_DEPTH", "256"))
+    # Recent query embeddings kept in memory (0 disables)
+    EMBED_QUERY_CACHE_SIZE: int = int(os.getenv("EMBED_QUERY_CACHE_SIZE", "256"))
+
     # Re-ranking Configuration
     # Cross-encoder re-ranks a wider candidate pool down to MAX_CONTEXT_DOCS,
     # giving the LLM a tighter, higher-signal context window.
@@ -44,15 +86,122 @@ class Config:
     RERANK_MODEL: str = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
     # Fetch this many candidates from Qdrant, then re-rank down to MAX_CONTEXT_DOCS
     RERANK_CANDIDATE_DOCS: int = int(os.getenv("RERANK_CANDIDATE_DOCS", "25"))
+    # Token ids per chunk and (query, chunk) scores are cached, each in an
+    # LRU of this many entries; both are cleared when the index changes
+    RERANK_TOKEN_CACHE_SIZE: int = int(os.getenv("RERANK_TOKEN_CACHE_SIZE", "4096"))
+    RERANK_SCORE_CACHE_SIZE: int = int(os.getenv("RERANK_SCORE_CACHE_SIZE", "4096"))
+
+    # Chunking
+    # Pages are split at section / heading boundaries and packed up to
+    # CHUNK_MAX_TOKENS tokens, counted with CHUNK_TOKENIZER (default
+    # RERANK_MODEL, whose 512-token window also has to hold the query)
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
+    CHUNK_TOKENIZER: str = os.getenv("CHUNK_TOKENIZER", "")
+
+    # Cross-page Deduplication
+    # Blocks found on DEDUP_BOILERPLATE_MIN_PAGES pages (navigation, footers)
+    # are indexed once; chunks this similar (word-shingle Jaccard) to an
+    # earlier one are dropped. The kept copy lists the pages that shared it.
+    ENABLE_DEDUP: bool = os.getenv("ENABLE_DEDUP", "true").lower() == "true"
+    DEDUP_BOILERPLATE_MIN_PAGES: int = int(os.getenv("DEDUP_BOILERPLATE_MIN_PAGES", "3"))
+    DEDUP_SIMILARITY: float = float(os.getenv("DEDUP_SIMILARITY", "0.9"))
+
+    # Ingestion Pipeline
+    # Crawl, dedup, embedding and upserts run as concurrent stages; each
+    # queue between them holds at most this many pages / chunk batches
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+
+    # Speculative Retrieval
+    # Retrieval and re-ranking on the raw message start alongside message
+    # analysis. The result is reused unless analysis decides no context is
+    # needed or its context_topics change the search query too much.
+    ENABLE_SPECULATIVE_RETRIEVAL: bool = os.getenv("ENABLE_SPECULATIVE_RETRIEVAL", "true").lower() == "true"
+    # Minimum share of the final search query's words already in the raw message
+    SPECULATIVE_MIN_OVERLAP: float = float(os.getenv("SPECULATIVE_MIN_OVERLAP", "0.6"))
+
+    # Response Cache
+    # Answers are reused for questions whose normalized embedding is within
+    # RESPONSE_CACHE_THRESHOLD cosine similarity of a cached one. The cache is
+    # dropped whenever the index changes (/reindex).
+    ENABLE_RESPONSE_CACHE: bool = os.getenv("ENABLE_RESPONSE_CACHE", "true").lower() == "true"
+    RESPONSE_CACHE_THRESHOLD: float = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95"))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+    # Contact / hire / quote messages (by the intent prototypes) are neither
+    # answered from the cache nor cached
+    RESPONSE_CACHE_SKIP_LEAD_INTENT: bool = os.getenv("RESPONSE_CACHE_SKIP_LEAD_INTENT", "true").lower() == "true"
+
+    # Message Analysis
+    # Sentiment (RoBERTa) and intent (LLM) run concurrently; a branch that
+    # exceeds its timeout falls back to neutral sentiment / default intent.
+    SENTIMENT_TIMEOUT_SECONDS: float = float(os.getenv("SENTIMENT_TIMEOUT_SECONDS", "2.0"))
+    INTENT_TIMEOUT_SECONDS: float = float(os.getenv("INTENT_TIMEOUT_SECONDS", "8.0"))
+
+    # Intent Fast Path
+    # A local classifier matches the message embedding against labelled
+    # prototype phrases; confident matches skip the Groq analysis call.
+    ENABLE_INTENT_FASTPATH: bool = os.getenv("ENABLE_INTENT_FASTPATH", "true").lower() == "true"
+    # Minimum cosine similarity to the best prototype
+    INTENT_FASTPATH_THRESHOLD: float = float(os.getenv("INTENT_FASTPATH_THRESHOLD", "0.78"))
+    # Minimum lead of the best intent over the runner-up
+    INTENT_FASTPATH_MARGIN: float = float(os.getenv("INTENT_FASTPATH_MARGIN", "0.04"))
+    # Optional JSON file {"intent": ["example", ...]} replacing the built-in prototypes
+    INTENT_PROTOTYPES_PATH: str = os.getenv("INTENT_PROTOTYPES_PATH", "")
+    # Fraction of fast-path hits also sent to the LLM to measure agreement
+    INTENT_FASTPATH_SHADOW_RATE: float = float(os.getenv("INTENT_FASTPATH_SHADOW_RATE", "0.05"))
 
     # LLM Parameters
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "1024"))
+
+    # LLM Client
+    # OpenAI-compatible chat completions API shared by generation and analysis
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
+    # Max in-flight LLM requests (also the keep-alive connection pool size)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    # Retries on 429 / 5xx / connection errors, with jittered exponential backoff
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+    # Send a backup request when the first is slower than this percentile of
+    # recent latencies (e.g. 95). Costs extra tokens; 0 disables hedging.
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
     
     # Qdrant Configuration (in-memory by default)
     QDRANT_URL: str = os.getenv("QDRANT_URL", ":memory:")
     COLLECTION_NAME: str = os.getenv("COLLECTION_NAME", "nexgenteck_knowledge")
-    
+    # Use gRPC (port QDRANT_GRPC_PORT) instead of REST for an external Qdrant server
+    QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+    QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    # Vector storage backend:
+    #   qdrant - qdrant-client (external server via QDRANT_URL, or ":memory:")
+    #   numpy  - in-process exact search over a normalized float32 matrix;
+    #            faster than Qdrant ":memory:" for small corpora (ignores QDRANT_URL)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+    # Reindexing builds a new versioned collection behind the COLLECTION_NAME
+    # alias; the previous one is dropped this many seconds after the switch.
+    RETIRED_COLLECTION_GRACE_SECONDS: float = float(os.getenv("RETIRED_COLLECTION_GRACE_SECONDS", "10"))
+    # On startup, versioned collections not behind the alias are dropped as
+    # leftovers of interrupted builds. On an external Qdrant shared by several
+    # replicas only those older than this are, so a build in progress on
+    # another replica survives.
+    STALE_BUILD_MAX_AGE_SECONDS: float = float(os.getenv("STALE_BUILD_MAX_AGE_SECONDS", "86400"))
+
+    # Cache Configuration
+    # Root directory for on-disk caches. Mount it as a volume in Docker so
+    # caches survive container restarts.
+    CACHE_DIR: str = os.getenv(
+        "CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+    )
+    # Chunk embeddings are cached by (model, content hash) so unchanged pages
+    # are not re-embedded on every reindex / cold start.
+    ENABLE_EMBEDDING_CACHE: bool = os.getenv("ENABLE_EMBEDDING_CACHE", "true").lower() == "true"
+    # In-memory backends (QDRANT_URL=:memory:, VECTOR_BACKEND=numpy) save each
+    # completed build under CACHE_DIR/index and restore it on startup instead
+    # of re-crawling. Snapshots from another EMBEDDING_MODEL are ignored.
+    ENABLE_INDEX_SNAPSHOT: bool = os.getenv("ENABLE_INDEX_SNAPSHOT", "true").lower() == "true"
+
     @classmethod
     def validate(cls) -> bool:
         """Validate that required configuration is present."""
@@ -0,0 +1,140 @@
+"""
+Persistent crawl cache for the NexGenTeck AI Chatbot.
+
+One entry per page URL, recording what the last crawl saw:
+
+    etag, last_modified  - HTTP validators, sent back as If-None-Match /
+                           If-Modified-Since so an unchanged page costs a 304
+    html_hash            - sha256 of the fetched (or rendered) HTML
+    document_hash        - sha256 of the extracted documents
+    documents, links     - the extraction result, reused without re-parsing
+                           when the page answers 304 or its HTML hash matches
+
+The cache is a single JSON file under CACHE_DIR/crawl, rewritten atomically
+at the end of each crawl. It is tied to the extraction version: when the
+extractor or chunking changes, the old entries are ignored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """sha256 hex digest of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def documents_hash(documents: List[Dict]) -> str:
+    """Order-sensitive hash of a page's extracted documents."""
+    return content_hash(json.dumps(documents, sort_keys=True, ensure_ascii=False))
+
+
+class CrawlCache:
+    """URL -> last crawl result, persisted as JSON."""
+
+    def __init__(self, directory: str, version: str):
+        """
+        Open (or create) the cache.
+
+        Args:
+            directory: Directory holding pages.json
+            version: Extraction version; entries written by another version are dropped
+        """
+        self.version = version
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, "pages.json")
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Crawl cache unreadable, starting empty: {e}")
+            return
+        if data.get("version") != self.version:
+            logger.info("Crawl cache was written by another extractor version, starting empty")
+            return
+        self._entries = data.get("pages", {})
+        logger.info(f"Crawl cache loaded: {len(self._entries)} pages")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Cached entry for a URL, or None."""
+        with self._lock:
+            return self._entries.get(url)
+
+    def put(
+        self,
+        url: str,
+        *,
+        tier: str,
+        html_hash: str,
+        documents: List[Dict],
+        links: List[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> bool:
+        """
+        Record a page's latest crawl result.
+
+        Returns:
+            True if its extracted documents are identical to the cached ones
+        """
+        document_hash = documents_hash(documents)
+        with self._lock:
+            previous = self._entries.get(url)
+            self._entries[url] = {
+                "tier": tier,
+                "etag": etag,
+                "last_modified": last_modified,
+                "html_hash": html_hash,
+                "document_hash": document_hash,
+                "documents": documents,
+                "links": links,
+                "crawled_at": time.time(),
+            }
+        return previous is not None and previous.get("document_hash") == document_hash
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Mark a cached page as seen again, refreshing its validators if given."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return
+            entry["crawled_at"] = time.time()
+            if etag:
+                entry["etag"] = etag
+            if last_modified:
+                entry["last_modified"] = last_modified
+
+    def retain(self, urls: Iterable[str]):
+        """Forget pages not in `urls` (no longer reachable on the site)."""
+        keep = set(urls)
+        with self._lock:
+            self._entries = {url: entry for url, entry in self._entries.items() if url in keep}
+
+    def save(self):
+        """Write the cache atomically."""
+        with self._lock:
+            data = {"version": self.version, "pages": self._entries}
+            tmp_path = f"{self._path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self._path)
+            except OSError as e:
+                logger.warning(f"Failed to save crawl cache: {e}")
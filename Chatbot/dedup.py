@@ -0,0 +1,292 @@
+"""
+Cross-page deduplication of crawled chunks for the NexGenTeck AI Chatbot.
+
+An SPA repeats its navigation, footer and "contact us" blocks on every
+page, and each page's chunks carry them into the index. Those near-identical
+vectors crowd the candidate pool handed to the re-ranker. This stage runs
+between the crawl and indexing, in two passes over the chunks in crawl order:
+
+    1. boilerplate blocks - a block (blank-line separated) found on at least
+       DEDUP_BOILERPLATE_MIN_PAGES pages is kept only where it first
+       appears and removed from the other pages' chunks
+    2. near-duplicate chunks - chunks whose word-shingle sets have Jaccard
+       similarity >= DEDUP_SIMILARITY to an earlier chunk are dropped.
+       Candidates come from MinHash signatures with LSH banding and are
+       confirmed on the exact shingle sets
+
+The first copy is the canonical one. Its metadata lists the other pages
+that shared it ('shared_by'). Page / URL lines and section markers only
+label a chunk, so they are never treated as boilerplate and are left out
+of similarity. A chunk that loses blocks keeps its char_start / char_end
+span in the page text.
+"""
+
+import logging
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from chunking import BLOCK_SEPARATOR, PAGE_LABEL, SECTION_MARKERS, URL_LABEL
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Words per shingle (shorter chunks are a single shingle)
+SHINGLE_WORDS = 5
+# MinHash signature length, split into LSH bands of NUM_PERMUTATIONS // LSH_BANDS rows.
+# 16 bands of 4 rows catch pairs down to ~0.5 Jaccard, well below DEDUP_SIMILARITY.
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Mersenne prime modulus for the permutation hashes
+_PRIME = (1 << 61) - 1
+
+# Fixed seed so the same crawl always yields the same chunks (and point ids)
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def _is_label(block: str) -> bool:
+    """Blocks that only label a chunk: page / URL lines and section markers."""
+    return block in SECTION_MARKERS or block.startswith((PAGE_LABEL, URL_LABEL))
+
+
+def _normalize(block: str) -> str:
+    return " ".join(block.lower().split())
+
+
+def _shingles(blocks: List[str]) -> Set[str]:
+    """Word shingles of a chunk's content blocks."""
+    words = " ".join(_normalize(block) for block in blocks if not _is_label(block)).split()
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(shingles: Set[str]) -> np.ndarray:
+    """MinHash signature (NUM_PERMUTATIONS values) of a non-empty shingle set."""
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _split_blocks(content: str) -> List[str]:
+    return [block.strip() for block in content.split(BLOCK_SEPARATOR) if block.strip()]
+
+
+class Deduplicator:
+    """
+    Streaming deduplication: feed chunks in crawl order, get back those to index.
+
+    Boilerplate is either known up front (deduplicate_documents counts every
+    page first) or learned as pages arrive. In a stream a block becomes
+    boilerplate once it has been seen on min_pages pages, so its copies on
+    the pages before that are still indexed.
+
+    A chunk that was already returned can gain 'shared_by' pages later;
+    revisions() lists those chunks.
+    """
+
+    def __init__(
+        self,
+        min_pages: Optional[int] = None,
+        threshold: Optional[float] = None,
+        boilerplate: Optional[Set[str]] = None
+    ):
+        """
+        Args:
+            min_pages: Pages a block must appear on to count as boilerplate
+                (default DEDUP_BOILERPLATE_MIN_PAGES)
+            threshold: Jaccard similarity for a near-duplicate chunk (default DEDUP_SIMILARITY)
+            boilerplate: Normalized boilerplate blocks, if known up front
+        """
+        self.min_pages = min_pages or config.DEDUP_BOILERPLATE_MIN_PAGES
+        self.threshold = threshold or config.DEDUP_SIMILARITY
+        self._learn = boilerplate is None
+        self._boilerplate: Set[str] = set(boilerplate or ())
+        self._pages_by_block: Dict[str, Set[str]] = defaultdict(set)
+        # Block -> index of the kept chunk holding its canonical copy
+        self._canonical: Dict[str, int] = {}
+        self._kept: List[Dict] = []
+        # Length of each kept chunk's 'shared_by' when it was returned
+        self._returned_shares: List[int] = []
+        self._kept_shingles: List[Set[str]] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        self._chars_in = 0
+        self._counts = {
+            "chunks_in": 0,
+            "boilerplate_removed": 0,
+            "boilerplate_chunks": 0,
+            "near_duplicate_chunks": 0,
+        }
+
+    def _share(self, index: int, source: str):
+        """Record that `source` shared the content of kept chunk `index`."""
+        metadata = self._kept[index]["metadata"]
+        if source and source != metadata.get("source"):
+            shared = metadata.setdefault("shared_by", [])
+            if source not in shared:
+                shared.append(source)
+
+    @staticmethod
+    def _copy(document: Dict) -> Dict:
+        """Detached copy of a kept chunk."""
+        metadata = dict(document["metadata"])
+        if "shared_by" in metadata:
+            metadata["shared_by"] = list(metadata["shared_by"])
+        return {"content": document["content"], "metadata": metadata}
+
+    def _near_duplicate(self, shingles: Set[str]) -> Tuple[Optional[int], List[Tuple[int, bytes]]]:
+        """Index of an earlier kept chunk at least `threshold` similar, and the LSH keys."""
+        if not shingles:
+            return None, []
+        signature = minhash(shingles)
+        rows = NUM_PERMUTATIONS // LSH_BANDS
+        keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+        for index in sorted({index for key in keys for index in self._buckets.get(key, ())}):
+            if _jaccard(shingles, self._kept_shingles[index]) >= self.threshold:
+                return index, keys
+        return None, keys
+
+    def add(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Deduplicate the next chunks (usually one page's).
+
+        Args:
+            documents: Chunks in crawl order ('content' and 'metadata' with 'source')
+
+        Returns:
+            Copies of the chunks to index, with boilerplate blocks removed
+        """
+        returned = []
+        for document in documents:
+            self._counts["chunks_in"] += 1
+            self._chars_in += len(document["content"])
+            metadata = dict(document.get("metadata", {}))
+            source = metadata.get("source", "")
+            blocks = _split_blocks(document["content"])
+            keys = [None if _is_label(block) else _normalize(block) for block in blocks]
+
+            if self._learn:
+                for key in keys:
+                    if key is not None:
+                        pages = self._pages_by_block[key]
+                        pages.add(source)
+                        if len(pages) >= self.min_pages:
+                            self._boilerplate.add(key)
+
+            # Boilerplate blocks are kept only where they first appeared
+            kept_blocks, kept_keys = [], []
+            for block, key in zip(blocks, keys):
+                if key is not None and key in self._boilerplate and key in self._canonical:
+                    self._share(self._canonical[key], source)
+                    self._counts["boilerplate_removed"] += 1
+                    continue
+                kept_blocks.append(block)
+                kept_keys.append(key)
+            if all(key is None for key in kept_keys):
+                self._counts["boilerplate_chunks"] += 1
+                continue
+
+            # Chunks nearly identical to an earlier kept chunk are dropped
+            shingles = _shingles(kept_blocks)
+            duplicate_of, lsh_keys = self._near_duplicate(shingles)
+            if duplicate_of is not None:
+                self._share(duplicate_of, source)
+                for key in kept_keys:
+                    if key is not None:
+                        self._canonical.setdefault(key, duplicate_of)
+                self._counts["near_duplicate_chunks"] += 1
+                continue
+
+            index = len(self._kept)
+            for key in lsh_keys:
+                self._buckets[key].append(index)
+            for key in kept_keys:
+                if key is not None:
+                    self._canonical.setdefault(key, index)
+            kept = {"content": BLOCK_SEPARATOR.join(kept_blocks), "metadata": metadata}
+            self._kept.append(kept)
+            self._kept_shingles.append(shingles)
+            self._returned_shares.append(0)
+            returned.append(self._copy(kept))
+        return returned
+
+    def revisions(self) -> List[Dict]:
+        """
+        Chunks whose 'shared_by' grew after add() returned them.
+
+        Returns:
+            Copies of those chunks as they are now; marks them as returned again
+        """
+        revised = []
+        for index, document in enumerate(self._kept):
+            shares = len(document["metadata"].get("shared_by", []))
+            if shares > self._returned_shares[index]:
+                revised.append(self._copy(document))
+                self._returned_shares[index] = shares
+        return revised
+
+    def documents(self) -> List[Dict]:
+        """Copies of every kept chunk, as they are now."""
+        return [self._copy(document) for document in self._kept]
+
+    def stats(self) -> Dict[str, int]:
+        """Counts for the crawl report."""
+        chunks_out = len(self._kept)
+        return {
+            **self._counts,
+            "boilerplate_blocks": len(self._boilerplate),
+            "chunks_out": chunks_out,
+            "chunks_removed": self._counts["chunks_in"] - chunks_out,
+            "chars_removed": self._chars_in - sum(len(document["content"]) for document in self._kept),
+        }
+
+
+def deduplicate_documents(
+    documents: List[Dict],
+    min_pages: Optional[int] = None,
+    threshold: Optional[float] = None
+) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Remove cross-page boilerplate and near-duplicate chunks from a whole crawl.
+
+    Every page is counted before anything is removed, so only the first
+    copy of a boilerplate block is kept.
+
+    Args:
+        documents: Crawled chunks in crawl order ('content' and 'metadata' with 'source')
+        min_pages: Pages a block must appear on to count as boilerplate
+            (default DEDUP_BOILERPLATE_MIN_PAGES)
+        threshold: Jaccard similarity for a near-duplicate chunk (default DEDUP_SIMILARITY)
+
+    Returns:
+        (kept documents, stats). Documents are copied and never modified in place.
+    """
+    min_pages = min_pages or config.DEDUP_BOILERPLATE_MIN_PAGES
+    pages_by_block: Dict[str, Set[str]] = defaultdict(set)
+    for document in documents:
+        source = document.get("metadata", {}).get("source", "")
+        for block in _split_blocks(document["content"]):
+            if not _is_label(block):
+                pages_by_block[_normalize(block)].add(source)
+    boilerplate = {key for key, pages in pages_by_block.items() if len(pages) >= min_pages}
+
+    deduplicator = Deduplicator(min_pages, threshold, boilerplate=boilerplate)
+    deduplicator.add(documents)
+    kept, stats = deduplicator.documents(), deduplicator.stats()
+    logger.info(
+        f"Deduplicated {stats['chunks_in']} chunks to {stats['chunks_out']}: "
+        f"{stats['boilerplate_blocks']} boilerplate blocks, "
+        f"{stats['near_duplicate_chunks']} near-duplicate chunks"
+    )
+    return kept, stats
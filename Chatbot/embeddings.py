@@ -8,20 +8,271 @@ import os
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 from sentence_transformers import SentenceTransformer
-from typing import List
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import logging
+import threading
 import numpy as np
 
+import metrics
 from config import config
+from utils import clean_text
 
 logger = logging.getLogger(__name__)
 
 
+class EmbeddingCache:
+    """
+    Persistent on-disk cache of chunk embeddings.
+
+    Vectors are appended as raw float32 rows to a memory-mapped file and a
+    small JSON index maps each content key to its row. Keys are derived from
+    the model name and the whitespace-normalized text, so a cache built for
+    one model is never served to another.
+    """
+
+    def __init__(self, directory: str, model_name: str):
+        """
+        Open (or create) the cache for a model.
+
+        Args:
+            directory: Directory holding the cache files
+            model_name: Embedding model the cached vectors belong to
+        """
+        self.model_name = model_name
+        os.makedirs(directory, exist_ok=True)
+
+        slug = hashlib.sha1(model_name.encode("utf-8")).hexdigest()[:12]
+        self._vectors_path = os.path.join(directory, f"{slug}.f32")
+        self._index_path = os.path.join(directory, f"{slug}.json")
+
+        self._lock = threading.Lock()
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    def _load(self):
+        """Load the row index and map the vector file, dropping torn writes."""
+        index = {}
+        if os.path.exists(self._index_path):
+            try:
+                with open(self._index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Embedding cache index unreadable, starting empty: {e}")
+
+        if index.get("model") != self.model_name or not index.get("dim"):
+            index = {}
+
+        dim = int(index.get("dim") or 0)
+        keys = index.get("keys", [])
+        if dim and os.path.exists(self._vectors_path):
+            # Rows are appended before the index is rewritten, so the vector
+            # file may hold orphan rows (or a partial row) after a crash.
+            keys = keys[:os.path.getsize(self._vectors_path) // (dim * 4)]
+        else:
+            keys = []
+
+        self._dim = dim or None
+        self._keys = list(keys)
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._truncate()
+        self._remap()
+        if self._rows:
+            logger.info(f"Embedding cache loaded: {len(self._rows)} vectors ({self.model_name})")
+
+    def _truncate(self):
+        """Cut the vector file back to the rows the index knows about."""
+        size = len(self._keys) * (self._dim or 0) * 4
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(size)
+
+    def _remap(self):
+        """(Re)open the memory map over all rows currently in the index."""
+        if not self._rows:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(len(self._rows), self._dim)
+        )
+
+    def key(self, text: str) -> str:
+        """Build the cache key for a text."""
+        normalized = clean_text(text)
+        return hashlib.sha256(f"{self.model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            keys: Cache keys from key()
+
+        Returns:
+            One entry per key: the cached vector, or None on a miss
+        """
+        with self._lock:
+            found = []
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    found.append(np.array(self._matrix[row]))
+            return found
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """
+        Append new vectors and persist the index.
+
+        Args:
+            keys: Cache keys, one per row of vectors
+            vectors: 2-D float32 array of embeddings
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                logger.warning("Embedding dimension changed; not caching vectors")
+                return
+
+            new_keys = []
+            new_rows = []
+            seen = set()
+            for key, vector in zip(keys, vectors):
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+
+            if not new_keys:
+                return
+
+            try:
+                with open(self._vectors_path, "ab") as f:
+                    f.write(np.stack(new_rows).tobytes())
+
+                tmp_path = self._index_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {"model": self.model_name, "dim": self._dim, "keys": self._keys + new_keys},
+                        f
+                    )
+                os.replace(tmp_path, self._index_path)
+            except OSError as e:
+                logger.warning(f"Failed to persist embedding cache: {e}")
+                self._truncate()
+                return
+
+            for key in new_keys:
+                self._rows[key] = len(self._keys)
+                self._keys.append(key)
+            self._remap()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def stats(self) -> Dict[str, object]:
+        """Return cache size and hit/miss counters."""
+        return {
+            "entries": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def embedding_quantization(backend: str) -> Optional[str]:
+    """
+    Quantization applied by an embedding backend (None for full precision).
+    Vectors from different quantizations are not interchangeable.
+    """
+    if backend == "torch-int8":
+        return "qint8"
+    if backend == "onnx-int8":
+        return f"qint8_{config.EMBEDDING_ONNX_QUANTIZATION}"
+    return None
+
+
+def load_embedding_model(model_name: str, backend: str = "torch") -> SentenceTransformer:
+    """
+    Load a SentenceTransformer on CPU with the requested inference backend.
+    
+    Args:
+        model_name: Hugging Face model id (e.g. BAAI/bge-m3)
+        backend: One of EMBEDDING_BACKENDS
+        
+    Returns:
+        Loaded model exposing the usual encode() API
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}', expected one of {EMBEDDING_BACKENDS}")
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name, backend="onnx", trust_remote_code=True, device='cpu')
+
+    if backend == "onnx-int8":
+        return _load_quantized_onnx_model(model_name)
+
+    model = SentenceTransformer(model_name, trust_remote_code=True, device='cpu')
+
+    if backend == "torch-int8":
+        import torch
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return model
+
+
+def _load_quantized_onnx_model(model_name: str) -> SentenceTransformer:
+    """
+    Load a dynamically int8-quantized ONNX export of a model.
+    The export is built once and kept under CACHE_DIR/onnx.
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    quantization = config.EMBEDDING_ONNX_QUANTIZATION
+    slug = model_name.replace("/", "__")
+    export_dir = os.path.join(config.CACHE_DIR, "onnx", slug)
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        logger.info(f"Exporting int8 ONNX model ({quantization}) to {export_dir}")
+        onnx_model = SentenceTransformer(model_name, backend="onnx", trust_remote_code=True, device='cpu')
+        onnx_model.save(export_dir)
+        export_dynamic_quantized_onnx_model(onnx_model, quantization, export_dir)
+
+    return SentenceTransformer(
+        export_dir,
+        backend="onnx",
+        trust_remote_code=True,
+        device='cpu',
+        model_kwargs={"file_name": file_name}
+    )
+
+
 class EmbeddingManager:
     """Manages text embeddings using BGE-M3 model."""
     
     _instance = None
     _model = None
+    _cache = None
     
     def __new__(cls):
         """Singleton pattern to avoid loading model multiple times."""
@@ -32,18 +283,30 @@ class EmbeddingManager:
     def __init__(self):
         """Initialize the embedding model if not already loaded."""
         if EmbeddingManager._model is None:
-            logger.info(f"Loading embedding model: {config.EMBEDDING_MODEL}")
+            logger.info(f"Loading embedding model: {config.EMBEDDING_MODEL} ({config.EMBEDDING_BACKEND})")
             try:
-                # Force clean download with cache_folder to avoid corruption
-                EmbeddingManager._model = SentenceTransformer(
+                EmbeddingManager._model = load_embedding_model(
                     config.EMBEDDING_MODEL,
-                    trust_remote_code=True,
-                    device='cpu'
+                    config.EMBEDDING_BACKEND
                 )
                 logger.info("Embedding model loaded successfully")
             except Exception as e:
                 logger.error(f"Failed to load embedding model: {e}")
                 raise RuntimeError(f"BAAI/bge-m3 is required. Error: {e}")
+
+        if EmbeddingManager._cache is None and config.ENABLE_EMBEDDING_CACHE:
+            try:
+                # Quantized backends produce slightly different vectors, so
+                # each backend gets its own cache namespace.
+                cache_model = config.EMBEDDING_MODEL
+                if config.EMBEDDING_BACKEND != "torch":
+                    cache_model = f"{cache_model}@{config.EMBEDDING_BACKEND}"
+                EmbeddingManager._cache = EmbeddingCache(
+                    os.path.join(config.CACHE_DIR, "embeddings"),
+                    cache_model
+                )
+            except OSError as e:
+                logger.warning(f"Embedding cache unavailable, embedding without it: {e}")
     
     @property
     def model(self) -> SentenceTransformer:
@@ -66,6 +329,7 @@ class EmbeddingManager:
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts.
+        Texts already in the embedding cache are not sent to the model.
         
         Args:
             texts: List of texts to embed
@@ -75,14 +339,64 @@ class EmbeddingManager:
         """
         if not texts:
             return []
-        
-        logger.info(f"Generating embeddings for {len(texts)} texts")
-        embeddings = self.model.encode(
-            texts, 
-            normalize_embeddings=True,
-            show_progress_bar=len(texts) > 10
+
+        cache = EmbeddingManager._cache
+        if cache is None:
+            return self._encode(texts).tolist()
+
+        keys = [cache.key(text) for text in texts]
+        cached = cache.get_many(keys)
+        miss_positions = [i for i, vector in enumerate(cached) if vector is None]
+
+        logger.info(
+            f"Embedding cache: {len(texts) - len(miss_positions)} hits, "
+            f"{len(miss_positions)} misses"
         )
+
+        if miss_positions:
+            # Identical chunks (e.g. repeated footers) are only encoded once
+            unique = {}
+            for i in miss_positions:
+                unique.setdefault(keys[i], texts[i])
+            fresh = self._encode(list(unique.values()))
+            cache.put_many(list(unique), fresh)
+            by_key = dict(zip(unique, fresh))
+            for i in miss_positions:
+                cached[i] = by_key[keys[i]]
+
+        return [vector.tolist() for vector in cached]
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run the model over a batch of texts."""
+        logger.info(f"Generating embeddings for {len(texts)} texts")
+        with metrics.timer(metrics.MODEL_SECONDS, call="embed_documents"):
+            return self.model.encode(
+                texts, 
+                normalize_embeddings=True,
+                show_progress_bar=len(texts) > 10
+            )
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of search queries in a single forward pass.
+        Queries bypass the chunk embedding cache.
+        
+        Args:
+            texts: Query texts
+            
+        Returns:
+            List of embedding vectors
+        """
+        if not texts:
+            return []
+        with metrics.timer(metrics.MODEL_SECONDS, call="embed_queries"):
+            embeddings = self.model.encode(texts, normalize_embeddings=True)
         return embeddings.tolist()
+
+    def cache_stats(self) -> Dict[str, object]:
+        """Return embedding cache statistics (empty if the cache is disabled)."""
+        cache = EmbeddingManager._cache
+        return cache.stats() if cache is not None else {}
     
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings produced by the model."""
@@ -91,5 +405,169 @@ class EmbeddingManager:
         return len(test_embedding)
 
 
+class QueryEmbeddingBatcher:
+    """
+    Async micro-batching front-end for query embeddings.
+
+    Callers await embed(); queued queries are collected for a few
+    milliseconds (or until the batch is full) and encoded together on a
+    worker thread, so concurrent requests share one forward pass and the
+    event loop is never blocked by the model.
+    """
+
+    def __init__(
+        self,
+        manager: EmbeddingManager,
+        max_batch_size: int = None,
+        max_wait_ms: float = None,
+        max_queue_depth: int = None
+    ):
+        """
+        Configure the batcher. The worker starts lazily on first use.
+
+        Args:
+            manager: Embedding manager that runs the model
+            max_batch_size: Maximum queries per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill
+            max_queue_depth: Maximum queued queries before overflowing
+        """
+        self._manager = manager
+        self.max_batch_size = max(1, max_batch_size or config.EMBED_BATCH_MAX_SIZE)
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else config.EMBED_BATCH_MAX_WAIT_MS
+        self.max_queue_depth = max_queue_depth or config.EMBED_BATCH_QUEUE_DEPTH
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Recently embedded queries, so stages that embed the same text (e.g.
+        # the intent fast path and retrieval) share one forward pass
+        self._recent: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.recent_size = config.EMBED_QUERY_CACHE_SIZE
+
+        self.batches = 0
+        self.queries = 0
+        self.largest_batch = 0
+        self.overflow = 0
+        self.recent_hits = 0
+
+    def _ensure_worker(self) -> asyncio.AbstractEventLoop:
+        """Start the batching worker on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            self._worker = loop.create_task(self._run())
+        return loop
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed a single query, batched with any concurrent callers.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector as list of floats
+        """
+        vector = self._recent.get(text)
+        if vector is not None:
+            self._recent.move_to_end(text)
+            self.recent_hits += 1
+            return vector
+
+        loop = self._ensure_worker()
+        future = loop.create_future()
+        try:
+            self._queue.put_nowait((text, future))
+        except asyncio.QueueFull:
+            # Shed load instead of queueing without bound
+            self.overflow += 1
+            vector = await asyncio.to_thread(self._manager.embed_text, text)
+        else:
+            vector = await future
+
+        self._remember(text, vector)
+        return vector
+
+    def _remember(self, text: str, vector: List[float]):
+        """Keep a query embedding in the small LRU of recent queries."""
+        if self.recent_size <= 0:
+            return
+        self._recent[text] = vector
+        self._recent.move_to_end(text)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one query, then gather more until full or timed out."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # Callers that gave up (e.g. client disconnect) don't need a vector
+        return [(text, future) for text, future in batch if not future.done()]
+
+    async def _run(self):
+        """Worker loop: collect a batch, encode it off-loop, resolve futures."""
+        # Batches serve many requests; don't attribute their time to the
+        # request that happened to start this worker
+        metrics.detach_request()
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+
+            self.batches += 1
+            self.queries += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+            try:
+                vectors = await asyncio.to_thread(
+                    self._manager.embed_queries,
+                    [text for text, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"Batched query embedding failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def status(self) -> Dict[str, object]:
+        """Return batcher configuration and counters (useful for /health)."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch_size": round(self.queries / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "overflow": self.overflow,
+            "recent_hits": self.recent_hits,
+        }
+
+
 # Singleton instance
 embedding_manager = EmbeddingManager()
+query_batcher = QueryEmbeddingBatcher(embedding_manager)
@@ -0,0 +1,327 @@
+"""
+Streaming ingestion pipeline for the NexGenTeck AI Chatbot.
+
+Crawled pages flow to the vector store through bounded queues instead of
+being collected into one list and embedded in one go:
+
+    crawl  -> crawl workers fetch pages and the extraction pool parses and
+              chunks them (scraper.py); pages are handed on in crawl order
+    dedup  -> cross-page boilerplate / near duplicates are removed
+              (dedup.py), chunks already in the index are skipped, and the
+              rest are grouped into INDEX_BATCH_SIZE batches
+    embed  -> batches are embedded, overlapping the network-bound crawl
+    upsert -> batches are written without waiting for the vector store to
+              apply them (wait=False); the last write waits for all of them
+
+Each queue holds at most INGEST_QUEUE_SIZE items, so a slow stage holds back
+the stages before it, and memory is bounded by the queues rather than by
+the size of the site. Every stage reports how many items it handled, its
+throughput, and the time it spent waiting for input or for room downstream.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config import config
+from dedup import Deduplicator
+from embeddings import embedding_manager
+from scraper import WebsiteScraper
+from vector_store import INDEX_BATCH_SIZE, IndexingCancelled, IndexProgress, IndexWriter, vector_store
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue's input
+_DONE = object()
+
+
+class StageStats:
+    """Item count and time accounting for one pipeline stage."""
+
+    def __init__(self, unit: str):
+        self.unit = unit
+        self.items = 0
+        self.busy_seconds = 0.0
+        # Waiting for the previous stage / for room in the next stage's queue
+        self.starved_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "unit": self.unit,
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 2),
+            "per_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds else None,
+            "starved_seconds": round(self.starved_seconds, 2),
+            "blocked_seconds": round(self.blocked_seconds, 2),
+        }
+
+
+class IngestionPipeline:
+    """One crawl-to-index run; each stage runs on its own thread."""
+
+    def __init__(
+        self,
+        full: bool = False,
+        max_pages: int = 100,
+        scraper: Optional[WebsiteScraper] = None,
+        on_page: Optional[Callable[[int], bool]] = None,
+        on_index: Optional[IndexProgress] = None
+    ):
+        """
+        Args:
+            full: Rebuild into a new collection instead of syncing the live one
+            max_pages: Crawl limit
+            scraper: Scraper to crawl with (default: a WebsiteScraper for WEBSITE_URL)
+            on_page: Called with the number of pages visited; returning True cancels
+            on_index: Called as (phase, chunks written, chunks queued) before each
+                batch is embedded or written; returning True cancels. The phase
+                is "crawl" while the crawl is still running.
+        """
+        self.full = full
+        self.max_pages = max_pages
+        self.scraper = scraper or WebsiteScraper()
+        self.on_page = on_page
+        self.on_index = on_index
+        self.deduplicator = Deduplicator() if config.ENABLE_DEDUP else None
+
+        size = max(1, config.INGEST_QUEUE_SIZE)
+        self._pages: queue.Queue = queue.Queue(maxsize=size)
+        self._batches: queue.Queue = queue.Queue(maxsize=size)
+        self._embedded: queue.Queue = queue.Queue(maxsize=size)
+
+        self.stages = {
+            "crawl": StageStats("pages"),
+            "dedup": StageStats("chunks"),
+            "embed": StageStats("chunks"),
+            "upsert": StageStats("chunks"),
+        }
+        self.pages_done = 0
+        self.chunks_queued = 0
+        self.chunks_written = 0
+        self.crawl_report: Dict[str, object] = {}
+
+        self._stop = threading.Event()
+        self._crawl_done = threading.Event()
+        self._cancelled = False
+        self._error: Optional[BaseException] = None
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        """Per-stage throughput (for the reindex job status)."""
+        return {name: stats.to_dict() for name, stats in self.stages.items()}
+
+    # ------------------------------------------------------------------
+    # Queues and control
+    # ------------------------------------------------------------------
+
+    def _put(self, target: queue.Queue, item, stats: StageStats) -> bool:
+        """Put an item, waiting for room; False if the pipeline stopped first."""
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked_seconds += time.perf_counter() - started
+
+    def _get(self, source: queue.Queue, stats: StageStats):
+        """Next item, or _DONE at the end of input or once the pipeline stopped."""
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+        finally:
+            stats.starved_seconds += time.perf_counter() - started
+
+    def _report(self, phase: str) -> bool:
+        """Pass progress to on_index; stops the pipeline if it asks to cancel."""
+        if self.on_index is None:
+            return False
+        if not self._crawl_done.is_set():
+            phase = "crawl"
+        if self.on_index(phase, self.chunks_written, self.chunks_queued):
+            self._cancelled = True
+            self._stop.set()
+            return True
+        return False
+
+    def _run_stage(self, stage: Callable, *args):
+        """Run a stage, stopping the whole pipeline if it fails."""
+        try:
+            stage(*args)
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _crawl(self):
+        stats = self.stages["crawl"]
+
+        def progress(pages: int) -> bool:
+            self.pages_done = pages
+            if self._stop.is_set():
+                return True
+            if self.on_page is not None and self.on_page(pages):
+                self._cancelled = True
+                self._stop.set()
+                return True
+            return False
+
+        def sink(documents: List[Dict[str, str]]):
+            stats.items += 1
+            self._put(self._pages, documents, stats)
+
+        started = time.perf_counter()
+        try:
+            self.scraper.scrape(max_pages=self.max_pages, progress=progress, sink=sink)
+        finally:
+            self.pages_done = max(self.pages_done, len(self.scraper.visited_urls))
+            stats.busy_seconds = time.perf_counter() - started - stats.blocked_seconds
+            self._crawl_done.set()
+            self._put(self._pages, _DONE, stats)
+
+    def _dedup(self, writer: IndexWriter):
+        stats = self.stages["dedup"]
+        ids: List[str] = []
+        pending: List[Dict[str, str]] = []
+        while True:
+            documents = self._get(self._pages, stats)
+            if documents is _DONE:
+                break
+            started = time.perf_counter()
+            stats.items += len(documents)
+            if self.deduplicator is not None:
+                documents = self.deduplicator.add(documents)
+            new_ids, new_documents = writer.select(documents)
+            ids.extend(new_ids)
+            pending.extend(new_documents)
+            self.chunks_queued += len(new_documents)
+            stats.busy_seconds += time.perf_counter() - started
+
+            while len(pending) >= INDEX_BATCH_SIZE:
+                if not self._put(self._batches, (ids[:INDEX_BATCH_SIZE], pending[:INDEX_BATCH_SIZE]), stats):
+                    return
+                ids, pending = ids[INDEX_BATCH_SIZE:], pending[INDEX_BATCH_SIZE:]
+        if pending and not self._put(self._batches, (ids, pending), stats):
+            return
+        self._put(self._batches, _DONE, stats)
+
+    def _embed(self):
+        stats = self.stages["embed"]
+        while True:
+            batch = self._get(self._batches, stats)
+            if batch is _DONE or self._report("embed"):
+                break
+            ids, documents = batch
+            started = time.perf_counter()
+            vectors = embedding_manager.embed_texts([document['content'] for document in documents])
+            stats.items += len(documents)
+            stats.busy_seconds += time.perf_counter() - started
+            if not self._put(self._embedded, (ids, documents, vectors), stats):
+                return
+        self._put(self._embedded, _DONE, stats)
+
+    def _upsert(self, writer: IndexWriter):
+        # One batch is held back so that the final write can wait for the
+        # store to apply every earlier (fire-and-forget) write
+        stats = self.stages["upsert"]
+        held = None
+        while True:
+            batch = self._get(self._embedded, stats)
+            if batch is _DONE:
+                break
+            if held is not None and not self._write(writer, held, wait=False):
+                return
+            held = batch
+        if held is not None and not self._stop.is_set():
+            self._write(writer, held, wait=True)
+
+    def _write(self, writer: IndexWriter, batch, wait: bool) -> bool:
+        if self._report("upsert"):
+            return False
+        ids, documents, vectors = batch
+        stats = self.stages["upsert"]
+        started = time.perf_counter()
+        writer.write(ids, documents, vectors, wait=wait)
+        self.chunks_written += len(ids)
+        stats.items += len(ids)
+        stats.busy_seconds += time.perf_counter() - started
+        return True
+
+    def _apply_revisions(self, writer: IndexWriter):
+        """
+        Pass on chunks that gained 'shared_by' pages after they were queued.
+        Only their payload changes (on commit); nothing is embedded again.
+        """
+        if self.deduplicator is not None:
+            writer.reshare(self.deduplicator.revisions())
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def run(self) -> Dict[str, int]:
+        """
+        Crawl and index (blocking; call from a worker thread).
+
+        Returns:
+            Dict with 'added', 'removed', 'updated', 'unchanged' and 'total' counts
+
+        Raises:
+            IndexingCancelled: If a progress callback asked to stop; the
+                live index is left as it was
+            RuntimeError: If the crawl produced no documents
+        """
+        try:
+            with vector_store.writer(full=self.full) as writer:
+                return self._run(writer)
+        finally:
+            self._report_crawl()
+            logger.info(f"Ingestion stages: {self.status()}")
+
+    def _run(self, writer: IndexWriter) -> Dict[str, int]:
+        # Crawl in this thread; the other stages each get their own
+        threads = [
+            threading.Thread(target=self._run_stage, args=(self._dedup, writer), name="ingest-dedup"),
+            threading.Thread(target=self._run_stage, args=(self._embed,), name="ingest-embed"),
+            threading.Thread(target=self._run_stage, args=(self._upsert, writer), name="ingest-upsert"),
+        ]
+        for thread in threads:
+            thread.start()
+        self._run_stage(self._crawl)
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+        if self._cancelled:
+            raise IndexingCancelled(f"Ingestion stopped after {self.chunks_written} chunks")
+        self._apply_revisions(writer)
+        if not writer.total:
+            raise RuntimeError("Scraping failed; keeping existing knowledge base")
+        return writer.commit()
+
+    def _report_crawl(self):
+        """Crawl report: scraper tiers and timings plus the dedup counts."""
+        self.crawl_report = dict(self.scraper.crawl_report)
+        if self.deduplicator is not None:
+            embed = self.stages["embed"]
+            dedup = self.deduplicator.stats()
+            dedup["estimated_embedding_seconds_saved"] = (
+                round(embed.busy_seconds / embed.items * dedup["chunks_removed"], 2) if embed.items else None
+            )
+            self.crawl_report["dedup"] = dedup
@@ -0,0 +1,232 @@
+"""
+Local embedding-based intent classifier for the NexGenTeck AI Chatbot.
+
+A fast first tier in front of the LLM intent analyzer. The message is
+embedded with the same bge-m3 model used for retrieval (through the query
+batcher, so the vector is reused by the retrieval stage) and compared with
+labelled prototype phrases for each intent. When one intent wins clearly,
+the Groq analysis round trip is skipped; ambiguous messages still go to
+the LLM.
+
+Prototypes are data, not rules: override them with a JSON file via
+INTENT_PROTOTYPES_PATH ({"intent": ["example", ...], ...}).
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+from config import config
+from embeddings import embedding_manager, query_batcher
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PROTOTYPES: Dict[str, List[str]] = {
+    "greeting": [
+        "hi", "hello", "hey there", "good morning", "hello, how are you?",
+        "hi! is anyone there?", "assalam o alaikum", "hola",
+    ],
+    "feedback": [
+        "thanks", "thank you so much", "great, that helps", "awesome, thanks!",
+        "ok cool", "bye", "goodbye, have a nice day",
+    ],
+    "question": [
+        "what services do you offer?", "do you build mobile apps?",
+        "what technologies do you use?", "tell me about your company",
+        "do you offer SEO services?", "what is your pricing?",
+        "do you do video editing?", "can you build AI chatbots?",
+    ],
+    "contact": [
+        "how can I contact you?", "what is your email address?",
+        "I want to talk to your team", "can someone call me?",
+    ],
+    "hire": [
+        "I want to hire you", "I need a developer for my project",
+        "can you build an app for me?", "I'd like to work with you",
+    ],
+    "quote": [
+        "can I get a quote?", "send me an estimate for my project",
+        "I need a price quote for a website",
+    ],
+    "complaint": [
+        "your website is not working", "I'm not happy with your service",
+        "nobody answered my email",
+    ],
+}
+
+# Intents that can be answered without the knowledge base
+NO_CONTEXT_INTENTS = {"greeting", "feedback"}
+LEAD_INTENTS = {"contact", "hire", "quote"}
+
+
+class IntentClassifier:
+    """
+    Nearest-prototype intent classifier over bge-m3 embeddings.
+
+    Keeps counters for the fast-path hit rate and, for a sample of hits
+    (INTENT_FASTPATH_SHADOW_RATE) plus every ambiguous message, how often
+    its best guess agrees with the LLM's label.
+    """
+
+    _instance = None
+    _prototypes = None
+    _matrix = None
+    _labels: List[str] = []
+    _embed_lock = threading.Lock()
+
+    def __new__(cls):
+        """Singleton pattern."""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Load prototypes; their embeddings are computed on first use."""
+        if IntentClassifier._prototypes is None:
+            IntentClassifier._prototypes = self._load_prototypes()
+
+            self.hits = 0
+            self.deferred = 0
+            self.compared = 0
+            self.intent_agreed = 0
+            self.context_agreed = 0
+
+    def _load_prototypes(self) -> Dict[str, List[str]]:
+        """Read prototypes from INTENT_PROTOTYPES_PATH, or use the defaults."""
+        path = config.INTENT_PROTOTYPES_PATH
+        if not path:
+            return DEFAULT_PROTOTYPES
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                prototypes = json.load(f)
+            logger.info(f"Loaded intent prototypes from {path}")
+            return {intent: list(examples) for intent, examples in prototypes.items() if examples}
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load intent prototypes from {path}: {e}, using defaults")
+            return DEFAULT_PROTOTYPES
+
+    def _embed_prototypes(self):
+        """Embed every prototype phrase once (thread-safe, lazy)."""
+        with IntentClassifier._embed_lock:
+            if IntentClassifier._matrix is not None:
+                return
+            labels = []
+            texts = []
+            for intent, examples in IntentClassifier._prototypes.items():
+                for example in examples:
+                    labels.append(intent)
+                    texts.append(example)
+            IntentClassifier._labels = labels
+            IntentClassifier._matrix = np.asarray(
+                embedding_manager.embed_queries(texts), dtype=np.float32
+            )
+            logger.info(
+                f"Intent fast path ready: {len(texts)} prototypes, "
+                f"{len(IntentClassifier._prototypes)} intents"
+            )
+
+    def score(self, vector: List[float]) -> Dict[str, float]:
+        """
+        Best prototype similarity per intent.
+
+        Args:
+            vector: Normalized message embedding
+
+        Returns:
+            Dict of intent -> cosine similarity, highest first
+        """
+        similarities = IntentClassifier._matrix @ np.asarray(vector, dtype=np.float32)
+        scores: Dict[str, float] = {}
+        for label, similarity in zip(IntentClassifier._labels, similarities):
+            scores[label] = max(scores.get(label, -1.0), float(similarity))
+        return dict(sorted(scores.items(), key=lambda item: item[1], reverse=True))
+
+    async def classify(self, message: str, count: bool = True) -> Dict[str, object]:
+        """
+        Classify a message against the prototypes.
+
+        Args:
+            message: User message
+            count: Count the result in the fast-path hit rate (False for
+                lookups that are not an intent analysis, e.g. the response cache)
+
+        Returns:
+            Dict with 'intent' (best guess), 'score', 'margin' and
+            'confident' (True when the fast path may skip the LLM)
+        """
+        if IntentClassifier._matrix is None:
+            await asyncio.to_thread(self._embed_prototypes)
+
+        vector = await query_batcher.embed(message)
+        ranked = list(self.score(vector).items())
+        best_intent, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        margin = best_score - runner_up
+
+        confident = (
+            best_score >= config.INTENT_FASTPATH_THRESHOLD
+            and margin >= config.INTENT_FASTPATH_MARGIN
+        )
+        if count:
+            if confident:
+                self.hits += 1
+            else:
+                self.deferred += 1
+
+        return {
+            "intent": best_intent,
+            "score": best_score,
+            "margin": margin,
+            "confident": confident,
+        }
+
+    def to_analysis(self, prediction: Dict[str, object]) -> Dict[str, object]:
+        """Turn a confident prediction into the LLM analyzer's intent fields."""
+        intent = prediction["intent"]
+        return {
+            "is_greeting": intent == "greeting",
+            "intent": intent,
+            "is_lead_intent": intent in LEAD_INTENTS,
+            "needs_context": intent not in NO_CONTEXT_INTENTS,
+            "context_topics": [],
+            "confidence": round(prediction["score"], 3),
+            "intent_source": "fastpath",
+        }
+
+    def should_shadow(self) -> bool:
+        """Whether to also ask the LLM about a fast-path hit, for accuracy stats."""
+        return random.random() < config.INTENT_FASTPATH_SHADOW_RATE
+
+    def record(self, prediction: Dict[str, object], llm_analysis: Dict[str, object]):
+        """Compare the classifier's best guess with the LLM's label."""
+        self.compared += 1
+        if prediction["intent"] == llm_analysis.get("intent"):
+            self.intent_agreed += 1
+        predicted_context = prediction["intent"] not in NO_CONTEXT_INTENTS
+        if predicted_context == llm_analysis.get("needs_context", True):
+            self.context_agreed += 1
+
+    def status(self) -> Dict[str, object]:
+        """Return fast-path hit rate and agreement with the LLM (useful for /health)."""
+        total = self.hits + self.deferred
+        return {
+            "enabled": config.ENABLE_INTENT_FASTPATH,
+            "threshold": config.INTENT_FASTPATH_THRESHOLD,
+            "margin": config.INTENT_FASTPATH_MARGIN,
+            "hits": self.hits,
+            "deferred_to_llm": self.deferred,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "compared_with_llm": self.compared,
+            "intent_accuracy": round(self.intent_agreed / self.compared, 3) if self.compared else None,
+            "needs_context_accuracy": round(self.context_agreed / self.compared, 3) if self.compared else None,
+        }
+
+
+# Singleton instance
+intent_classifier = IntentClassifier()
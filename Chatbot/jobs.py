@@ -0,0 +1,209 @@
+"""
+Background reindex jobs for the NexGenTeck AI Chatbot.
+
+A reindex (crawl + embedding) takes minutes and is fully synchronous, so
+it runs in a worker thread instead of on the event loop. Each run is a
+ReindexJob that tracks its phase, progress and ETA and can be cancelled
+between pages / embedding batches. The stages run concurrently (see
+ingestion.py), so the phase is the furthest one still running:
+
+    crawl  -> pages are fetched and chunked; deduplicated chunks that are
+              new or changed are already being embedded and written
+    embed  -> the remaining chunks are embedded (in batches)
+    upsert -> the remaining batches are written to the vector store
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ingestion import IngestionPipeline
+from vector_store import IndexingCancelled
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for GET /reindex/{id}
+MAX_JOB_HISTORY = 20
+
+
+class ReindexJob:
+    """State and progress of one reindex run."""
+
+    def __init__(self, full: bool = False, max_pages: int = 100):
+        """
+        Args:
+            full: Rebuild from scratch instead of syncing changed chunks
+            max_pages: Crawl limit
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.full = full
+        self.max_pages = max_pages
+
+        self.state = "queued"  # queued | running | succeeded | failed | cancelled
+        self.phase = "queued"  # crawl | embed | upsert | done
+        self.pages_done = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.result: Optional[Dict] = None
+        # Pages per fetch tier (http / browser), time saved and dedup counts, once crawled
+        self.crawl: Dict[str, object] = {}
+        self._pipeline: Optional[IngestionPipeline] = None
+        self.error: Optional[str] = None
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._crawl_started: Optional[float] = None
+        self._index_started: Optional[float] = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("succeeded", "failed", "cancelled")
+
+    def cancel(self):
+        """Ask the job to stop at the next page or embedding batch."""
+        if not self.finished:
+            self._cancel.set()
+
+    def on_page(self, pages_done: int) -> bool:
+        """Scraper progress callback; returns True to stop the crawl."""
+        self.pages_done = pages_done
+        return self.cancel_requested
+
+    def on_index(self, phase: str, done: int, total: int) -> bool:
+        """Ingestion progress callback; returns True to stop indexing."""
+        if self._index_started is None and phase != "crawl":
+            self._index_started = time.time()
+        self.phase = phase
+        self.chunks_embedded = done
+        self.chunks_total = total
+        return self.cancel_requested
+
+    def eta_seconds(self) -> Optional[float]:
+        """
+        Estimated seconds left in the current phase, from its progress so far.
+        While crawling this is an upper bound (max_pages); the site may be smaller.
+        """
+        now = time.time()
+        if self.phase == "crawl" and self._crawl_started and self.pages_done:
+            per_page = (now - self._crawl_started) / self.pages_done
+            return per_page * max(0, self.max_pages - self.pages_done)
+        if self.phase in ("embed", "upsert") and self._index_started and self.chunks_embedded:
+            per_chunk = (now - self._index_started) / self.chunks_embedded
+            return per_chunk * max(0, self.chunks_total - self.chunks_embedded)
+        return None
+
+    def to_dict(self) -> Dict[str, object]:
+        """Job status for the API."""
+        eta = None if self.finished else self.eta_seconds()
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "phase": self.phase,
+            "full": self.full,
+            "cancel_requested": self.cancel_requested,
+            "pages_done": self.pages_done,
+            "max_pages": self.max_pages,
+            "chunks_total": self.chunks_total,
+            "chunks_embedded": self.chunks_embedded,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round(end - self.started_at, 1) if self.started_at else 0.0,
+            "crawl": self.crawl,
+            # Per-stage items, throughput and time spent waiting on neighbours
+            "pipeline": self._pipeline.status() if self._pipeline else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def run(self):
+        """
+        Execute the job (blocking; call from a worker thread).
+        Outcome is recorded on the job rather than raised.
+        """
+        self.state = "running"
+        self.started_at = time.time()
+        logger.info(f"Reindex job {self.id} started (full={self.full})")
+        try:
+            self.phase = "crawl"
+            self._crawl_started = time.time()
+            # A full run builds into a new collection and switches over once it
+            # is complete, so /chat keeps searching the previous index meanwhile
+            self._pipeline = IngestionPipeline(
+                full=self.full,
+                max_pages=self.max_pages,
+                on_page=self.on_page,
+                on_index=self.on_index
+            )
+            try:
+                stats = self._pipeline.run()
+            finally:
+                self.pages_done = self._pipeline.pages_done
+                self.crawl = self._pipeline.crawl_report
+
+            if self.full:
+                self.result = {"message": f"Re-indexed {stats['total']} documents", "total": stats['total']}
+            else:
+                self.result = {
+                    "message": (
+                        f"Re-indexed {stats['total']} documents "
+                        f"({stats['added']} added, {stats['removed']} removed, "
+                        f"{stats['updated']} updated, {stats['unchanged']} unchanged)"
+                    ),
+                    **stats
+                }
+
+            self.phase = "done"
+            self.state = "succeeded"
+            logger.info(f"Reindex job {self.id} finished: {self.result['message']}")
+
+        except IndexingCancelled:
+            self.state = "cancelled"
+            logger.info(f"Reindex job {self.id} cancelled during {self.phase}")
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Reindex job {self.id} failed: {e}")
+        finally:
+            self.finished_at = time.time()
+
+
+class ReindexJobRegistry:
+    """Recent reindex jobs by id (bounded history)."""
+
+    def __init__(self, max_history: int = MAX_JOB_HISTORY):
+        self.max_history = max_history
+        self._jobs: "OrderedDict[str, ReindexJob]" = OrderedDict()
+
+    def create(self, full: bool = False, max_pages: int = 100) -> ReindexJob:
+        """Register a new queued job, forgetting the oldest finished ones."""
+        job = ReindexJob(full=full, max_pages=max_pages)
+        self._jobs[job.id] = job
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_history:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[ReindexJob]:
+        return self._jobs.get(job_id)
+
+    def active(self) -> Optional[ReindexJob]:
+        """The job that is queued or running, if any."""
+        for job in reversed(self._jobs.values()):
+            if not job.finished:
+                return job
+        return None
+
+
+# Singleton instance
+reindex_jobs = ReindexJobRegistry()
@@ -0,0 +1,369 @@
+"""
+Shared LLM client for the NexGenTeck AI Chatbot.
+
+Both response generation (rag_pipeline.py) and intent analysis
+(sentiment.py) call the chat completions endpoint through one client:
+
+- One pooled httpx.AsyncClient with keep-alive, so requests reuse warm
+  TLS connections instead of opening a new one per message.
+- A semaphore bounding in-flight requests (LLM_MAX_CONCURRENCY).
+- Retries with jittered exponential backoff on 429 / 5xx and transport
+  errors, honouring Retry-After.
+- Optional hedging: if a request has not returned by the
+  LLM_HEDGE_PERCENTILE latency of recent requests, a second identical
+  request is sent and whichever finishes first wins.
+
+The endpoint is any OpenAI-compatible API (Groq by default, LLM_BASE_URL).
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+import metrics
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limits and transient server errors
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Upper bound for a single backoff sleep (seconds)
+RETRY_MAX_DELAY = 8.0
+# Recent request latencies kept for the hedging percentile
+LATENCY_WINDOW = 200
+# Hedging stays off until this many latencies have been observed
+HEDGE_MIN_SAMPLES = 20
+
+
+class LLMError(Exception):
+    """Raised when a chat completion fails (after retries, if retryable)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMClient:
+    """
+    Pooled async client for an OpenAI-compatible chat completions API.
+
+    The HTTP pool and semaphore belong to the event loop that first uses
+    them and are recreated if the client is used from a different loop
+    (e.g. separate asyncio.run() calls in CLI tools).
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        hedge_percentile: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            base_url: API root, e.g. https://api.groq.com/openai/v1 (default LLM_BASE_URL)
+            api_key: Bearer token (default GROQ_API_KEY)
+            model: Model name (default LLM_MODEL)
+            max_concurrency: Max in-flight requests (default LLM_MAX_CONCURRENCY)
+            max_retries: Retries per request (default LLM_MAX_RETRIES)
+            hedge_percentile: Latency percentile that triggers a hedged
+                request; 0 disables hedging (default LLM_HEDGE_PERCENTILE)
+            timeout: Per-request read timeout in seconds (default LLM_TIMEOUT_SECONDS)
+        """
+        self.base_url = (base_url or config.LLM_BASE_URL).rstrip("/")
+        self.api_key = config.GROQ_API_KEY if api_key is None else api_key
+        self.model = model or config.LLM_MODEL
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.hedge_percentile = (
+            config.LLM_HEDGE_PERCENTILE if hedge_percentile is None else hedge_percentile
+        )
+        self.timeout = timeout or config.LLM_TIMEOUT_SECONDS
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.in_flight = 0
+
+    def _http(self) -> httpx.AsyncClient:
+        """The pooled HTTP client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Pooled connections are tied to the loop that opened them
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60.0,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _payload(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, stream: bool) -> Dict:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+
+    @staticmethod
+    def _error(response: httpx.Response) -> LLMError:
+        """Build an LLMError from a non-200 response."""
+        retry_after = None
+        header = response.headers.get("retry-after")
+        if header:
+            try:
+                retry_after = float(header)
+            except ValueError:
+                pass
+        return LLMError(
+            f"LLM endpoint returned HTTP {response.status_code}: {response.text[:200]}",
+            status_code=response.status_code,
+            retry_after=retry_after,
+        )
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before retry number `attempt + 1`, or None if not retryable."""
+        if attempt >= self.max_retries:
+            return None
+        if isinstance(error, LLMError):
+            if error.status_code not in RETRYABLE_STATUS:
+                return None
+            if error.retry_after is not None:
+                return min(error.retry_after, RETRY_MAX_DELAY)
+        # Full jitter: spreads retries from concurrent requests apart
+        return random.uniform(0, min(RETRY_MAX_DELAY, config.LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off."""
+        if not self.hedge_percentile or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    async def _complete_once(self, payload: Dict, purpose: str) -> str:
+        """Send one request and return the completion text."""
+        client = self._http()
+        async with self._semaphore:
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                with metrics.timer(metrics.MODEL_SECONDS, call=f"llm_{purpose}"):
+                    response = await client.post("/chat/completions", json=payload)
+            finally:
+                self.in_flight -= 1
+        if response.status_code != 200:
+            raise self._error(response)
+        self._latencies.append(time.perf_counter() - started)
+        return response.json()["choices"][0]["message"].get("content") or ""
+
+    async def _complete(self, payload: Dict, purpose: str) -> str:
+        """Send a request, retrying transient failures."""
+        attempt = 0
+        while True:
+            try:
+                return await self._complete_once(payload, purpose)
+            except (LLMError, httpx.TransportError) as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                self.retries += 1
+                attempt += 1
+                logger.warning(f"LLM request failed ({e}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _complete_hedged(self, payload: Dict, purpose: str, delay: float) -> str:
+        """Send a request and a backup copy if the first is slower than `delay`."""
+        primary = asyncio.create_task(self._complete(payload, purpose))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # Don't add load when every connection is already busy
+            if done or self._semaphore.locked():
+                return await primary
+
+            self.hedged += 1
+            backup = asyncio.create_task(self._complete(payload, purpose))
+            tasks.add(backup)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both copies failed; surface the original request's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        purpose: str = "generation"
+    ) -> str:
+        """
+        Create a chat completion.
+
+        Args:
+            messages: OpenAI-style messages ({"role": ..., "content": ...})
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            purpose: Label for latency metrics (e.g. "generation", "intent")
+
+        Returns:
+            Completion text
+
+        Raises:
+            LLMError: If the request fails after retries
+        """
+        payload = self._payload(messages, temperature, max_tokens, stream=False)
+        self.requests += 1
+        try:
+            delay = self._hedge_delay()
+            if delay is None:
+                return await self._complete(payload, purpose)
+            return await self._complete_hedged(payload, purpose, delay)
+        except httpx.TransportError as e:
+            self.failures += 1
+            metrics.ERRORS.inc(component="llm")
+            raise LLMError(f"LLM request failed: {e!r}") from e
+        except LLMError:
+            self.failures += 1
+            metrics.ERRORS.inc(component="llm")
+            raise
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        purpose: str = "generation"
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion.
+
+        Failures before the first token are retried like chat(); once text
+        has been yielded the error is raised to the caller. Streams are
+        never hedged.
+
+        Args:
+            messages: OpenAI-style messages ({"role": ..., "content": ...})
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            purpose: Label for latency metrics
+
+        Yields:
+            Text fragments as they arrive
+
+        Raises:
+            LLMError: If the request fails
+        """
+        payload = self._payload(messages, temperature, max_tokens, stream=True)
+        self.requests += 1
+        attempt = 0
+        while True:
+            produced = False
+            try:
+                client = self._http()
+                async with self._semaphore:
+                    self.in_flight += 1
+                    started = time.perf_counter()
+                    try:
+                        async with client.stream("POST", "/chat/completions", json=payload) as response:
+                            if response.status_code != 200:
+                                await response.aread()
+                                raise self._error(response)
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                choices = json.loads(data).get("choices") or [{}]
+                                text = choices[0].get("delta", {}).get("content")
+                                if text:
+                                    produced = True
+                                    yield text
+                    finally:
+                        self.in_flight -= 1
+                        elapsed = time.perf_counter() - started
+                        metrics.MODEL_SECONDS.observe(elapsed, call=f"llm_{purpose}_stream")
+                        metrics.record_timing(f"llm_{purpose}_stream", elapsed)
+                return
+            except (LLMError, httpx.TransportError) as e:
+                delay = None if produced else self._retry_delay(e, attempt)
+                if delay is None:
+                    self.failures += 1
+                    metrics.ERRORS.inc(component="llm")
+                    if isinstance(e, LLMError):
+                        raise
+                    raise LLMError(f"LLM stream failed: {e!r}") from e
+                self.retries += 1
+                attempt += 1
+                logger.warning(f"LLM stream failed ({e}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def status(self) -> Dict[str, object]:
+        """Return request, retry and hedging counters (useful for /health)."""
+        ordered = sorted(self._latencies)
+
+        def percentile_ms(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 1)
+
+        hedge_delay = self._hedge_delay()
+        return {
+            "base_url": self.base_url,
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+            "latency_p50_ms": percentile_ms(50),
+            "latency_p95_ms": percentile_ms(95),
+        }
+
+    async def aclose(self):
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instance
+llm_client = LLMClient()
@@ -20,18 +20,28 @@ FULLY SOFTCODED APPROACH:
 - LLM decides intent, sentiment, and context needs
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, field_validator
 from contextlib import asynccontextmanager
 import logging
 import asyncio
+import json
+import time
 
+import metrics
 from config import config
 from scraper import WebsiteScraper
 from vector_store import vector_store
-from rag_pipeline import process_message
+from rag_pipeline import process_message, speculation_status, stream_message
 from reranker import reranker
+from embeddings import embedding_manager, query_batcher
+from intent_classifier import intent_classifier
+from sentiment import llm_analyzer
+from jobs import ReindexJob, reindex_jobs
+from llm_client import llm_client
+from response_cache import response_cache
 
 # Configure logging
 logging.basicConfig(
@@ -43,6 +53,13 @@ logger = logging.getLogger(__name__)
 # Global reindex lock to prevent concurrent reindex operations
 _reindex_lock = asyncio.Lock()
 _is_reindexing = False
+# References to fire-and-forget tasks so they aren't garbage collected
+_background_tasks = set()
+# Where the served knowledge base came from (reported by /readyz):
+# "empty" -> "fallback" while the first crawl runs -> "website";
+# "persisted" / "snapshot" when an index from a previous run was reused at startup
+_knowledge_base = {"source": "empty", "build_job_id": None}
+_started_at = time.time()
 
 
 class ChatRequest(BaseModel):
@@ -82,13 +99,20 @@ class HealthResponse(BaseModel):
     message: str
     documents_count: int
     reranker: dict = {}
+    embeddings: dict = {}
+    intent_fastpath: dict = {}
+    llm: dict = {}
+    response_cache: dict = {}
+    speculative_retrieval: dict = {}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan handler.
-    Initializes the knowledge base on startup by scraping the ENTIRE website.
+    Starts serving immediately: an index persisted by a previous run is
+    reused as is; otherwise the knowledge base is built in the background
+    (see initialize_knowledge_base) and /readyz reports its progress.
     """
     logger.info("Starting NexGenTeck AI Chatbot (Fully Softcoded)")
     
@@ -99,40 +123,59 @@ async def lifespan(app: FastAPI):
         logger.error(f"Configuration error: {e}")
         raise
     
-    # Initialize knowledge base if empty - scrape entire website
     if not vector_store.is_initialized():
-        logger.info("Knowledge base is empty, scraping ENTIRE website...")
-        await initialize_knowledge_base()
+        logger.info("Knowledge base is empty, building it in the background")
+        _spawn(initialize_knowledge_base())
     else:
+        _knowledge_base["source"] = "snapshot" if vector_store.restored_snapshot else "persisted"
         logger.info(f"Knowledge base already has {vector_store.count()} documents")
     
     yield
     
     logger.info("Shutting down NexGenTeck AI Chatbot")
+    # Let a crawl still running in its worker thread stop at the next page
+    active = reindex_jobs.active()
+    if active is not None:
+        active.cancel()
+    await vector_store.aclose()
+    await llm_client.aclose()
 
 
-async def initialize_knowledge_base() -> int:
+def _spawn(coroutine) -> asyncio.Task:
+    """Run a coroutine as a background task, keeping a reference to it."""
+    task = asyncio.create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def initialize_knowledge_base():
     """
-    Scrape the ENTIRE website and populate the vector store.
-    This is the ONLY source of information for the chatbot.
+    Build the knowledge base on first start without blocking startup.
+    
+    The fallback content is indexed first, so /chat can answer basic
+    questions within seconds. The ENTIRE website is then scraped as a
+    regular reindex job (visible at GET /reindex/{job_id}), whose sync
+    replaces the fallback chunks with the site's content.
     """
+    global _is_reindexing
+    
+    # Claim the reindex slot up front so POST /reindex reports this job as busy
+    _is_reindexing = True
+    job = reindex_jobs.create(full=False, max_pages=100)
+    _knowledge_base["build_job_id"] = job.id
+    
     try:
-        scraper = WebsiteScraper()
-        # Scrape up to 100 pages for comprehensive coverage
-        documents = scraper.scrape(max_pages=100)
-
-        if documents:
-            count = vector_store.add_documents(documents)
-            logger.info(f"Indexed {count} documents from website")
-            return count
-        
-        logger.warning("No documents scraped, using fallback content")
-        return 0
-            
+        fallback = WebsiteScraper()._get_fallback_content()
+        if await asyncio.to_thread(vector_store.add_documents, fallback):
+            _knowledge_base["source"] = "fallback"
     except Exception as e:
-        logger.error(f"Failed to initialize knowledge base: {e}")
-        # The fallback content will be used automatically
-        return 0
+        # Not fatal: the crawl below may still succeed
+        logger.error(f"Failed to index fallback content: {e}")
+        metrics.ERRORS.inc(component="startup")
+    
+    await _run_reindex_job(job)
+    logger.info(f"Initial knowledge base build {job.state}: {vector_store.count()} documents")
 
 
 # Create FastAPI app
@@ -143,6 +186,52 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Gauges read at scrape time
+metrics.INDEX_DOCUMENTS.set_function(vector_store.count)
+metrics.INDEX_VERSION.set_function(lambda: vector_store.index_version)
+metrics.REINDEX_IN_PROGRESS.set_function(lambda: int(_is_reindexing))
+metrics.LLM_IN_FLIGHT.set_function(lambda: llm_client.in_flight)
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """
+    Record request latency, and return per-stage timings as a
+    Server-Timing header when the client sends X-Debug-Timings: 1.
+    
+    call_next returns once the headers are ready, so for server-sent
+    event streams the latency is recorded when the body finishes, and
+    the timings come in the stream's `done` event instead of the header.
+    """
+    timings = metrics.start_request()
+    started = time.perf_counter()
+    response = await call_next(request)
+    
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        body = response.body_iterator
+        
+        async def observe_when_finished():
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        
+        response.body_iterator = observe_when_finished()
+        return response
+    
+    elapsed = time.perf_counter() - started
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+    
+    if request.headers.get("x-debug-timings") == "1":
+        timings["total"] = elapsed
+        response.headers["Server-Timing"] = metrics.server_timing(timings)
+    return response
+
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -171,6 +260,76 @@ async def health_check():
         message="All systems operational",
         documents_count=vector_store.count(),
         reranker=reranker.status(),
+        embeddings={
+            "cache": embedding_manager.cache_stats(),
+            "query_batcher": query_batcher.status(),
+        },
+        intent_fastpath=intent_classifier.status(),
+        llm=llm_client.status(),
+        response_cache=response_cache.status(),
+        speculative_retrieval=speculation_status(),
+    )
+
+
+@app.get("/livez")
+async def liveness():
+    """
+    Liveness probe: 200 whenever the event loop is responsive, including
+    while the knowledge base is still being built.
+    """
+    return {
+        "status": "alive",
+        "uptime_seconds": round(time.time() - _started_at, 1),
+    }
+
+
+@app.get("/readyz")
+async def readiness():
+    """
+    Readiness probe: 200 once the knowledge base has documents to answer
+    from, 503 before that.
+    
+    'models' shows which models loaded. The re-ranker and sentiment model
+    are optional: if one failed to load it is False here and the pipeline
+    falls back without it. Fallback or persisted content counts as ready;
+    'knowledge_base.build' shows the progress of the website crawl that
+    replaces it.
+    """
+    models = {
+        "embeddings": embedding_manager.model is not None,
+        "reranker": reranker.is_available,
+        "sentiment": llm_analyzer.sentiment_model_loaded,
+    }
+    documents = vector_store.count()
+    ready = documents > 0
+    
+    build = None
+    if _knowledge_base["build_job_id"]:
+        job = reindex_jobs.get(_knowledge_base["build_job_id"])
+        build = job.to_dict() if job is not None else None
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "starting",
+            "models": models,
+            "knowledge_base": {
+                "source": _knowledge_base["source"],
+                "documents": documents,
+                "index_version": vector_store.index_version,
+                "reindexing": _is_reindexing,
+                "build": build,
+            },
+        },
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus metrics: stage / model latency histograms, fallbacks, errors, index gauges."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
     )
 
 
@@ -200,59 +359,122 @@ async def chat(request: ChatRequest):
         
     except Exception as e:
         logger.error(f"Error processing message: {e}")
+        metrics.ERRORS.inc(component="chat")
         raise HTTPException(
             status_code=500,
             detail="I'm having trouble processing your request. Please try again."
         )
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Process a chat message and stream the response as server-sent events.
+    
+    Event types:
+    - stage: a pipeline stage finished (analysis, retrieval, rerank)
+    - token: the next fragment of the generated answer
+    - done:  final timings, including time-to-first-token (ttft_ms)
+    """
+    if _is_reindexing:
+        logger.warning("Chat request received while reindexing is in progress")
+    
+    logger.info(f"Received streaming message: {request.message[:100]}...")
+    
+    async def event_source():
+        async for event in stream_message(request.message):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @app.post("/reindex")
-async def reindex_knowledge_base():
+async def reindex_knowledge_base(full: bool = False):
     """
-    Re-scrape website and update knowledge base.
-    Useful for updating content after website changes.
-    Uses a lock to prevent concurrent reindex operations.
+    Start a background job that re-scrapes the website and updates the
+    knowledge base. Returns immediately with a job id; poll
+    GET /reindex/{job_id} for progress.
+    
+    By default only new or changed chunks are embedded and chunks that
+    disappeared are deleted; pass ?full=true to rebuild from scratch.
+    Only one reindex runs at a time.
     """
     global _is_reindexing
     
     # Check if already reindexing
     if _is_reindexing:
+        active = reindex_jobs.active()
         return {
             "status": "busy",
-            "message": "Reindexing is already in progress. Please wait."
+            "message": "Reindexing is already in progress. Please wait.",
+            "job_id": active.id if active else None,
         }
     
     logger.info("Re-indexing knowledge base")
     
+    # Claim the single-flight flag before yielding to the event loop
+    _is_reindexing = True
+    job = reindex_jobs.create(full=full, max_pages=100)
+    _spawn(_run_reindex_job(job))
+    
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "message": "Re-indexing started",
+            "job_id": job.id,
+            "status_url": f"/reindex/{job.id}",
+        },
+    )
+
+
+async def _run_reindex_job(job: ReindexJob):
+    """Run a reindex job in a worker thread under the reindex lock."""
+    global _is_reindexing
+    
     async with _reindex_lock:
         _is_reindexing = True
         try:
-            # Scrape first to avoid downtime if scraping fails
-            scraper = WebsiteScraper()
-            documents = scraper.scrape(max_pages=100)
-
-            if not documents:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Scraping failed; keeping existing knowledge base"
-                )
-
-            # Clear existing data only after successful scrape
-            vector_store.clear()
-            count = vector_store.add_documents(documents)
-
-            return {
-                "status": "success",
-                "message": f"Re-indexed {count} documents"
-            }
-            
-        except Exception as e:
-            logger.error(f"Re-indexing failed: {e}")
-            raise HTTPException(status_code=500, detail=str(e))
+            # Crawling and embedding are blocking; keep them off the event loop
+            await asyncio.to_thread(job.run)
+            if job.state == "failed":
+                metrics.ERRORS.inc(component="reindex")
+            elif job.state == "succeeded" and job.pages_done:
+                _knowledge_base["source"] = "website"
         finally:
             _is_reindexing = False
 
 
+@app.get("/reindex/{job_id}")
+async def reindex_status(job_id: str):
+    """Phase, pages crawled, chunks embedded and ETA of a reindex job."""
+    job = reindex_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown reindex job")
+    return job.to_dict()
+
+
+@app.delete("/reindex/{job_id}")
+async def cancel_reindex(job_id: str):
+    """
+    Cancel a reindex job. It stops at the next page or embedding batch;
+    the live index is left as it was before the job started.
+    """
+    job = reindex_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown reindex job")
+    job.cancel()
+    return job.to_dict()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,257 @@
+"""
+Prometheus metrics and per-request stage timings for the NexGenTeck AI Chatbot.
+
+A small self-contained registry (counters, gauges, histograms) rendered in
+the Prometheus text exposition format by the /metrics endpoint, so no
+extra dependency is needed.
+
+Code paths time themselves with timer():
+
+    with timer(STAGE_SECONDS, stage="rerank_context"):
+        ...
+
+which records into the histogram and, while a request is being traced
+(start_request()), into that request's timings. main.py returns those as
+a Server-Timing header when the client sends X-Debug-Timings: 1.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds: from a cache hit up to a slow LLM call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Timings of the request being handled (None when not tracing)
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, set directly or read from a callback."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the (unlabelled) value from `function` at scrape time."""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            try:
+                return [(self.name, {}, float(self._function()))]
+            except Exception:
+                return []
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values (seconds)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_request_seconds", "HTTP request latency.", ("endpoint",)
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_stage_seconds", "RAG pipeline node latency.", ("stage",)
+))
+MODEL_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_model_call_seconds", "Model and LLM call latency.", ("call",)
+))
+FALLBACKS = REGISTRY.register(Counter(
+    "chatbot_fallbacks_total", "Times a stage fell back to a default result.", ("stage",)
+))
+ERRORS = REGISTRY.register(Counter(
+    "chatbot_errors_total", "Errors by component.", ("component",)
+))
+INDEX_DOCUMENTS = REGISTRY.register(Gauge(
+    "chatbot_index_documents", "Chunks in the active vector collection."
+))
+INDEX_VERSION = REGISTRY.register(Gauge(
+    "chatbot_index_version", "Changes whenever the indexed content changes."
+))
+REINDEX_IN_PROGRESS = REGISTRY.register(Gauge(
+    "chatbot_reindex_in_progress", "1 while a reindex is running."
+))
+LLM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "chatbot_llm_in_flight", "LLM requests currently in flight."
+))
+
+
+def start_request() -> Dict[str, float]:
+    """Start collecting stage timings for the current request."""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def detach_request():
+    """Stop attributing timings in this context to a request (for long-lived workers)."""
+    _request_timings.set(None)
+
+
+def record_timing(name: str, seconds: float):
+    """Add a duration to the current request's timings, if one is being traced."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timer(histogram: Histogram, **labels) -> Iterator[None]:
+    """Time a block into a histogram and the current request's timings."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, **labels)
+        record_timing("_".join(str(value) for value in labels.values()), elapsed)
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """Format timings as a Server-Timing header value (milliseconds)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
@@ -4,16 +4,19 @@ Fully softcoded - uses LLM for all interpretation.
 The chatbot is trained on website content and uses that as context for all responses.
 """
 
-from typing import Dict, List, TypedDict
+from typing import AsyncIterator, Dict, List, Optional, TypedDict
 from langgraph.graph import StateGraph, END
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
+import asyncio
 import logging
+import time
 
+import metrics
 from config import config
+from llm_client import llm_client
 from vector_store import vector_store
 from sentiment import llm_analyzer
 from reranker import reranker
+from response_cache import CacheLookup, response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +31,18 @@ class ChatState(TypedDict):
     context: List[str]
     response: str
     error: str
+    # Retrieval started alongside analysis, if it can be reused
+    speculation: Optional[Dict]
+
+
+# How often speculative retrieval was used or wasted
+speculation_stats = {
+    "started": 0,
+    "used": 0,
+    "discarded_no_context": 0,
+    "rerun_query_drift": 0,
+    "failed": 0,
+}
 
 
 async def analyze_message(state: ChatState) -> ChatState:
@@ -43,22 +58,122 @@ async def analyze_message(state: ChatState) -> ChatState:
     """
     logger.info("Analyzing message with LLM")
     
+    # Most messages need context, so retrieval on the raw message can start
+    # now instead of waiting for the analysis round trip.
+    speculation = None
+    if config.ENABLE_SPECULATIVE_RETRIEVAL:
+        speculation = asyncio.create_task(_speculative_retrieval(state['message']))
+        speculation_stats["started"] += 1
+    
     try:
         analysis = await llm_analyzer.analyze(state['message'])
         state['analysis'] = analysis
         logger.info(f"LLM determined: greeting={analysis.get('is_greeting')}, needs_context={analysis.get('needs_context')}")
     except Exception as e:
         logger.error(f"Analysis error: {e}")
+        metrics.FALLBACKS.inc(stage="analyze")
         state['analysis'] = {
             'is_greeting': False,
             'needs_context': True,
             'intent': 'general',
             'sentiment': 'neutral'
         }
+    except asyncio.CancelledError:
+        if speculation is not None:
+            _discard_speculation(speculation)
+        raise
+    
+    if speculation is not None:
+        state['speculation'] = await _resolve_speculation(speculation, state)
     
     return state
 
 
+async def _speculative_retrieval(message: str) -> Dict:
+    """Retrieve and re-rank using the raw message, before analysis finishes."""
+    candidates = await vector_store.asearch(query=message, n_results=_candidate_count())
+    reranked = await asyncio.to_thread(
+        reranker.rerank,
+        query=message,
+        candidates=candidates,
+        top_n=config.MAX_CONTEXT_DOCS,
+    )
+    return {"candidates": candidates, "context": _format_context(reranked)}
+
+
+def _discard_speculation(task: asyncio.Task):
+    """Cancel a speculative retrieval; its outcome is still retrieved once it ends."""
+    task.cancel()
+    task.add_done_callback(_log_discarded_speculation)
+
+
+def _log_discarded_speculation(task: asyncio.Task):
+    # Reading the exception keeps asyncio from reporting it as never retrieved
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug(f"Discarded speculative retrieval failed: {task.exception()}")
+
+
+def _query_overlap(message: str, search_query: str) -> float:
+    """Share of the search query's words that already appear in the message."""
+    message_words = set(message.lower().split())
+    query_words = set(search_query.lower().split())
+    if not query_words:
+        return 1.0
+    return len(message_words & query_words) / len(query_words)
+
+
+async def _resolve_speculation(task: asyncio.Task, state: ChatState) -> Optional[Dict]:
+    """
+    Decide whether speculative retrieval can stand in for the real one.
+    
+    Args:
+        task: Running _speculative_retrieval task
+        state: Pipeline state with the finished analysis
+        
+    Returns:
+        Dict with 'candidates' and 'context', or None if the work was wasted
+    """
+    analysis = state['analysis']
+    
+    if not llm_analyzer.should_retrieve_context(analysis):
+        _discard_speculation(task)
+        speculation_stats["discarded_no_context"] += 1
+        return None
+    
+    search_query = llm_analyzer.get_search_query(state['message'], analysis)
+    if _query_overlap(state['message'], search_query) < config.SPECULATIVE_MIN_OVERLAP:
+        _discard_speculation(task)
+        speculation_stats["rerun_query_drift"] += 1
+        logger.info("Analysis topics changed the search query, re-running retrieval")
+        return None
+    
+    try:
+        result = await task
+    except Exception as e:
+        logger.error(f"Speculative retrieval error: {e}")
+        speculation_stats["failed"] += 1
+        return None
+    
+    speculation_stats["used"] += 1
+    return result
+
+
+def speculation_status() -> Dict[str, object]:
+    """Return speculative retrieval counters (useful for /health)."""
+    started = speculation_stats["started"]
+    wasted = (
+        speculation_stats["discarded_no_context"]
+        + speculation_stats["rerun_query_drift"]
+        + speculation_stats["failed"]
+    )
+    return {
+        "enabled": config.ENABLE_SPECULATIVE_RETRIEVAL,
+        **speculation_stats,
+        "wasted": wasted,
+        "wasted_rate": round(wasted / started, 3) if started else 0.0,
+    }
+
+
 def should_retrieve(state: ChatState) -> str:
     """
     Route based on LLM's decision about whether context is needed.
@@ -94,6 +209,12 @@ async def retrieve_context(state: ChatState) -> ChatState:
     """
     logger.info("[Stage 1/2] Bi-encoder retrieval from Qdrant")
 
+    speculation = state.get('speculation')
+    if speculation:
+        state['candidates'] = speculation['candidates']
+        logger.info("[Stage 1/2] Reusing %d speculatively retrieved candidates", len(state['candidates']))
+        return state
+
     try:
         # Build search query using LLM-identified topics
         search_query = llm_analyzer.get_search_query(
@@ -101,16 +222,9 @@ async def retrieve_context(state: ChatState) -> ChatState:
             state['analysis']
         )
 
-        # Fetch a wider candidate pool when re-ranking is enabled
-        candidate_count = (
-            config.RERANK_CANDIDATE_DOCS
-            if config.ENABLE_RERANKING
-            else config.MAX_CONTEXT_DOCS
-        )
-
-        results = vector_store.search(
+        results = await vector_store.asearch(
             query=search_query,
-            n_results=candidate_count
+            n_results=_candidate_count()
         )
 
         state['candidates'] = results
@@ -122,11 +236,21 @@ async def retrieve_context(state: ChatState) -> ChatState:
 
     except Exception as exc:
         logger.error(f"Context retrieval error: {exc}")
+        metrics.FALLBACKS.inc(stage="retrieve_context")
         state['candidates'] = []
 
     return state
 
 
+def _candidate_count() -> int:
+    """Fetch a wider candidate pool when re-ranking is enabled."""
+    return (
+        config.RERANK_CANDIDATE_DOCS
+        if config.ENABLE_RERANKING
+        else config.MAX_CONTEXT_DOCS
+    )
+
+
 async def rerank_context(state: ChatState) -> ChatState:
     """
     Stage 2 of 2-stage retrieval: cross-encoder re-ranking.
@@ -149,6 +273,12 @@ async def rerank_context(state: ChatState) -> ChatState:
 
     candidates = state.get('candidates', [])
 
+    speculation = state.get('speculation')
+    if speculation:
+        state['context'] = speculation['context']
+        logger.info("[Stage 2/2] Reusing %d speculatively re-ranked docs", len(state['context']))
+        return state
+
     try:
         # Re-rank and trim to MAX_CONTEXT_DOCS
         reranked = reranker.rerank(
@@ -157,14 +287,7 @@ async def rerank_context(state: ChatState) -> ChatState:
             top_n=config.MAX_CONTEXT_DOCS,
         )
 
-        # Format for the LLM prompt
-        context = []
-        for doc, score, metadata in reranked:
-            source = metadata.get('source', 'website')
-            # Include cross-encoder score in debug log, not in prompt
-            logger.debug("[rerank] score=%.3f  source=%s  preview=%s", score, source, doc[:80])
-            context.append(f"[Source: {source}]\n{doc}")
-
+        context = _format_context(reranked)
         state['context'] = context
         logger.info(
             "[Stage 2/2] Re-ranking complete: %d candidates → %d final docs for LLM",
@@ -174,6 +297,7 @@ async def rerank_context(state: ChatState) -> ChatState:
 
     except Exception as exc:
         logger.error(f"Re-ranking error: {exc} — using raw candidates")
+        metrics.FALLBACKS.inc(stage="rerank_context")
         # Graceful fallback: use bi-encoder order trimmed to MAX_CONTEXT_DOCS
         state['context'] = [
             f"[Source: {meta.get('source', 'website')}]\n{doc}"
@@ -183,6 +307,17 @@ async def rerank_context(state: ChatState) -> ChatState:
     return state
 
 
+def _format_context(reranked: List[tuple]) -> List[str]:
+    """Format re-ranked (doc, score, metadata) tuples for the LLM prompt."""
+    context = []
+    for doc, score, metadata in reranked:
+        source = metadata.get('source', 'website')
+        # Include cross-encoder score in debug log, not in prompt
+        logger.debug("[rerank] score=%.3f  source=%s  preview=%s", score, source, doc[:80])
+        context.append(f"[Source: {source}]\n{doc}")
+    return context
+
+
 async def generate_response(state: ChatState) -> ChatState:
     """
     Generate a response using Groq LLM with website context.
@@ -197,36 +332,40 @@ async def generate_response(state: ChatState) -> ChatState:
     logger.info("Generating LLM response using website context")
     
     try:
-        # Initialize Groq client
-        llm = ChatGroq(
-            api_key=config.GROQ_API_KEY,
-            model=config.LLM_MODEL,
+        state['response'] = await llm_client.chat(
+            build_messages(state),
             temperature=config.LLM_TEMPERATURE,
             max_tokens=config.LLM_MAX_TOKENS
         )
         
-        # Build system prompt with website context
-        system_prompt = build_system_prompt(state['context'], state['analysis'])
-        
-        # Generate response
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=state['message'])
-        ]
-        
-        response = llm.invoke(messages)
-        state['response'] = response.content
-        
         logger.info("Response generated successfully")
         
     except Exception as e:
         logger.error(f"LLM generation error: {e}")
+        metrics.FALLBACKS.inc(stage="generate_response")
         state['error'] = str(e)
         state['response'] = get_fallback_response()
     
     return state
 
 
+def build_messages(state: ChatState) -> List[Dict[str, str]]:
+    """
+    Build the chat messages for response generation.
+    
+    Args:
+        state: Pipeline state with 'message', 'context' and 'analysis'
+        
+    Returns:
+        System prompt (with website context) followed by the user message
+    """
+    system_prompt = build_system_prompt(state['context'], state['analysis'])
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": state['message']}
+    ]
+
+
 def build_system_prompt(context: List[str], analysis: Dict) -> str:
     """
     Build the AgenticRAG system prompt with website context.
@@ -363,11 +502,23 @@ def get_fallback_response() -> str:
     )
 
 
-def build_rag_pipeline() -> StateGraph:
+def _timed(stage: str, node):
+    """Wrap a pipeline node so its latency is recorded per stage."""
+    async def run(state: ChatState) -> ChatState:
+        with metrics.timer(metrics.STAGE_SECONDS, stage=stage):
+            return await node(state)
+    return run
+
+
+def build_rag_pipeline(include_generation: bool = True) -> StateGraph:
     """
     Build the LangGraph RAG pipeline.
     Fully LLM-driven with no hardcoded routing.
     
+    Args:
+        include_generation: If False, the graph stops after retrieval so
+            the caller can stream generation itself (see stream_message)
+    
     Returns:
         Compiled state graph
     """
@@ -375,10 +526,12 @@ def build_rag_pipeline() -> StateGraph:
     workflow = StateGraph(ChatState)
     
     # Add nodes
-    workflow.add_node("analyze", analyze_message)
-    workflow.add_node("retrieve_context", retrieve_context)   # Stage 1: bi-encoder
-    workflow.add_node("rerank_context", rerank_context)       # Stage 2: cross-encoder
-    workflow.add_node("generate_response", generate_response)
+    workflow.add_node("analyze", _timed("analyze", analyze_message))
+    workflow.add_node("retrieve_context", _timed("retrieve_context", retrieve_context))   # Stage 1: bi-encoder
+    workflow.add_node("rerank_context", _timed("rerank_context", rerank_context))         # Stage 2: cross-encoder
+    if include_generation:
+        workflow.add_node("generate_response", _timed("generate_response", generate_response))
+    generate = "generate_response" if include_generation else END
 
     # Set entry point
     workflow.set_entry_point("analyze")
@@ -389,20 +542,36 @@ def build_rag_pipeline() -> StateGraph:
         should_retrieve,
         {
             "retrieve_context": "retrieve_context",
-            "generate_response": "generate_response"
+            "generate_response": generate
         }
     )
 
     # 2-stage retrieval → generate
     workflow.add_edge("retrieve_context", "rerank_context")
-    workflow.add_edge("rerank_context", "generate_response")
-    workflow.add_edge("generate_response", END)
+    workflow.add_edge("rerank_context", generate)
+    if include_generation:
+        workflow.add_edge("generate_response", END)
     
     return workflow.compile()
 
 
-# Create the pipeline instance
+# Create the pipeline instances
 rag_pipeline = build_rag_pipeline()
+# Same graph without the generation node, used for streaming responses
+retrieval_pipeline = build_rag_pipeline(include_generation=False)
+
+
+def _initial_state(message: str) -> ChatState:
+    """Empty pipeline state for a new message."""
+    return {
+        'message': message,
+        'analysis': {},
+        'candidates': [],
+        'context': [],
+        'response': '',
+        'error': '',
+        'speculation': None
+    }
 
 
 async def process_message(message: str) -> str:
@@ -418,20 +587,130 @@ async def process_message(message: str) -> str:
     """
     logger.info(f"Processing message: {message[:50]}...")
     
+    # Repeated questions are answered from the semantic cache
+    cached = await _cache_lookup(message)
+    if cached.response is not None:
+        logger.info("Answered from response cache")
+        return cached.response
+    
     # Initialize state
-    initial_state: ChatState = {
-        'message': message,
-        'analysis': {},
-        'candidates': [],
-        'context': [],
-        'response': '',
-        'error': ''
-    }
+    initial_state = _initial_state(message)
     
     # Run the pipeline
     try:
         result = await rag_pipeline.ainvoke(initial_state)
-        return result.get('response', get_fallback_response())
+        response = result.get('response', get_fallback_response())
+        if not result.get('error'):
+            response_cache.store(cached, response, result.get('analysis', {}))
+        return response
     except Exception as e:
         logger.error(f"Pipeline error: {e}")
+        metrics.ERRORS.inc(component="pipeline")
         return get_fallback_response()
+
+
+async def _cache_lookup(message: str):
+    """Response cache lookup that treats cache errors as a miss."""
+    try:
+        return await response_cache.lookup(message)
+    except Exception as e:
+        logger.error(f"Response cache error: {e}")
+        metrics.ERRORS.inc(component="response_cache")
+        return CacheLookup(message, None, vector_store.index_version, None)
+
+
+def _stage_event(node: str, state: ChatState, elapsed_ms: float) -> Dict:
+    """Describe a finished pipeline node as a stream event."""
+    if node == "analyze":
+        analysis = state.get('analysis', {})
+        data = {
+            "stage": "analysis",
+            "intent": analysis.get('intent', 'general'),
+            "needs_context": analysis.get('needs_context', True),
+        }
+    elif node == "retrieve_context":
+        data = {"stage": "retrieval", "candidates": len(state.get('candidates', []))}
+    else:
+        data = {"stage": "rerank", "documents": len(state.get('context', []))}
+    data["elapsed_ms"] = round(elapsed_ms, 1)
+    return {"event": "stage", "data": data}
+
+
+async def stream_message(message: str) -> AsyncIterator[Dict]:
+    """
+    Process a user message and stream the response as it is generated.
+    
+    Runs the same analyze → retrieve → rerank graph as process_message,
+    then streams LLM tokens through the shared LLM client.
+    
+    Args:
+        message: User's message
+        
+    Yields:
+        Events as {"event": name, "data": dict}:
+        - "stage" once per finished pipeline node (analysis, retrieval, rerank),
+          or a single "cache" stage when the answer comes from the response cache
+        - "token" for each generated text fragment
+        - "done" with time-to-first-token and total latency
+    """
+    logger.info(f"Streaming message: {message[:50]}...")
+    started = time.perf_counter()
+    state = _initial_state(message)
+    
+    def elapsed_ms() -> float:
+        return (time.perf_counter() - started) * 1000
+    
+    cached = await _cache_lookup(message)
+    if cached.response is not None:
+        logger.info("Answered from response cache")
+        yield {"event": "stage", "data": {"stage": "cache", "elapsed_ms": round(elapsed_ms(), 1)}}
+        ttft_ms = elapsed_ms()
+        yield {"event": "token", "data": {"text": cached.response}}
+        yield {"event": "done", "data": {"ttft_ms": round(ttft_ms, 1), "total_ms": round(elapsed_ms(), 1)}}
+        return
+    
+    try:
+        async for update in retrieval_pipeline.astream(state, stream_mode="updates"):
+            for node, node_state in update.items():
+                state.update(node_state or {})
+                yield _stage_event(node, state, elapsed_ms())
+    except Exception as e:
+        logger.error(f"Pipeline error: {e}")
+    
+    ttft_ms = None
+    produced = False
+    failed = False
+    parts = []
+    generation_started = time.perf_counter()
+    try:
+        async for text in llm_client.stream(
+            build_messages(state),
+            temperature=config.LLM_TEMPERATURE,
+            max_tokens=config.LLM_MAX_TOKENS
+        ):
+            if ttft_ms is None:
+                ttft_ms = elapsed_ms()
+                logger.info(f"Time to first token: {ttft_ms:.0f} ms")
+            produced = True
+            parts.append(text)
+            yield {"event": "token", "data": {"text": text}}
+    except Exception as e:
+        logger.error(f"LLM streaming error: {e}")
+        metrics.FALLBACKS.inc(stage="generate_response")
+        failed = True
+        if not produced:
+            ttft_ms = elapsed_ms()
+            yield {"event": "token", "data": {"text": get_fallback_response()}}
+    
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - generation_started, stage="generate_response")
+    
+    if produced and not failed:
+        response_cache.store(cached, "".join(parts), state.get('analysis', {}))
+    
+    yield {
+        "event": "done",
+        "data": {
+            "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+            "total_ms": round(elapsed_ms(), 1),
+        }
+    }
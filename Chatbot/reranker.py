@@ -20,19 +20,102 @@ Result:  LLM receives a tight, high-signal context window → better answers.
 Flow:
     Qdrant  →  top-K candidates  →  CrossEncoderReranker  →  top-N final docs
                 (e.g. 25)                                       (e.g. 5)
+
+Caching
+-------
+The same popular chunks are candidates for almost every query, so:
+    - each chunk is tokenized once; its token ids are kept in an LRU keyed
+      by content hash, and per request only the query is tokenized
+    - scores are kept in an LRU keyed by (normalized query, chunk hash), so
+      a repeated question only runs the model for new candidates
+Both caches are cleared whenever the index changes (VectorStore.on_index_change).
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Dict, List, Tuple
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 from sentence_transformers import CrossEncoder
 
+import metrics
 from config import config
+from vector_store import vector_store
 
 logger = logging.getLogger(__name__)
 
+# Token limit of a (query, chunk) pair, special tokens included
+RERANK_MAX_LENGTH = 512
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def _truncate_pair(first: List[int], second: List[int], budget: int) -> Tuple[List[int], List[int]]:
+    """
+    Fit two token sequences into `budget` tokens the way the fast tokenizers'
+    "longest_first" truncation does: the shorter one is kept whole if it can
+    be, otherwise both get half.
+    """
+    if len(first) + len(second) <= budget:
+        return first, second
+    n_short, n_long = sorted((len(first), len(second)))
+    n_long = n_short if n_short > budget else max(n_short, budget - n_short)
+    if n_short + n_long > budget:
+        n_short = budget // 2
+        n_long = n_short + budget % 2
+    if len(first) > len(second):
+        return first[:n_long], second[:n_short]
+    return first[:n_short], second[:n_long]
+
+
+class _LRU:
+    """Bounded least-recently-used mapping with hit / miss counts (not thread-safe)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
 
 class CrossEncoderReranker:
     """
@@ -59,6 +142,13 @@ class CrossEncoderReranker:
     def __init__(self) -> None:
         if CrossEncoderReranker._model is None:
             self._load_model()
+        if getattr(self, "_scores", None) is None:
+            self._lock = threading.Lock()
+            # chunk hash -> token ids; (normalized query, chunk hash) -> score
+            self._tokens = _LRU(config.RERANK_TOKEN_CACHE_SIZE)
+            self._scores = _LRU(config.RERANK_SCORE_CACHE_SIZE)
+            self.invalidations = 0
+            vector_store.on_index_change(self.invalidate)
 
     # ------------------------------------------------------------------
     # Initialisation
@@ -74,7 +164,7 @@ class CrossEncoderReranker:
             logger.info(f"Loading cross-encoder re-ranker: {config.RERANK_MODEL}")
             CrossEncoderReranker._model = CrossEncoder(
                 config.RERANK_MODEL,
-                max_length=512,
+                max_length=RERANK_MAX_LENGTH,
             )
             logger.info("Cross-encoder re-ranker ready ✓")
         except Exception as exc:
@@ -121,16 +211,7 @@ class CrossEncoderReranker:
             return candidates[:top_n]
 
         try:
-            # Build (query, document) sentence pairs for the cross-encoder
-            pairs: List[Tuple[str, str]] = [
-                (query, content) for content, _dist, _meta in candidates
-            ]
-
-            # Batch-score all pairs in a single forward pass
-            scores: List[float] = CrossEncoderReranker._model.predict(
-                pairs,
-                show_progress_bar=False,
-            ).tolist()
+            scores = self._cached_scores(query, [content for content, _dist, _meta in candidates])
 
             # Attach scores back to candidates
             scored: List[Tuple[str, float, Dict]] = [
@@ -154,8 +235,86 @@ class CrossEncoderReranker:
 
         except Exception as exc:
             logger.error("Re-ranking failed (%s) — falling back to bi-encoder order", exc)
+            metrics.FALLBACKS.inc(stage="cross_encoder")
             return candidates[:top_n]
 
+    # ------------------------------------------------------------------
+    # Scoring and caches
+    # ------------------------------------------------------------------
+
+    def _cached_scores(self, query: str, contents: List[str]) -> List[float]:
+        """Scores of (query, content) pairs, running the model only for uncached pairs."""
+        query = _normalize_query(query)
+        hashes = [_content_hash(content) for content in contents]
+        with self._lock:
+            scores: List[Optional[float]] = [self._scores.get((query, h)) for h in hashes]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if not missing:
+            return scores
+
+        # Identical chunks in the pool are scored once
+        unique = list(dict.fromkeys(hashes[i] for i in missing))
+        content_by_hash = {hashes[i]: contents[i] for i in missing}
+        with metrics.timer(metrics.MODEL_SECONDS, call="cross_encoder"):
+            computed = dict(zip(unique, self._predict(query, [content_by_hash[h] for h in unique])))
+
+        with self._lock:
+            for h, score in computed.items():
+                self._scores.put((query, h), score)
+        for i in missing:
+            scores[i] = computed[hashes[i]]
+        return scores
+
+    def _chunk_ids(self, content: str, tokenizer) -> List[int]:
+        """Token ids of a chunk (no special tokens), tokenized once per index version."""
+        key = _content_hash(content)
+        with self._lock:
+            ids = self._tokens.get(key)
+        if ids is None:
+            ids = tokenizer(content.strip(), add_special_tokens=False)["input_ids"][:RERANK_MAX_LENGTH]
+            with self._lock:
+                self._tokens.put(key, ids)
+        return ids
+
+    def _predict(self, query: str, contents: List[str]) -> List[float]:
+        """
+        Score (query, content) pairs in one forward pass.
+
+        Same inputs as CrossEncoder.predict, except that chunk token ids come
+        from the cache: the pairs are assembled from ids (special tokens,
+        token types, "longest_first" truncation) and padded into one batch.
+        """
+        import torch
+
+        model = CrossEncoderReranker._model
+        tokenizer = model.tokenizer
+        query_ids = tokenizer(query.strip(), add_special_tokens=False)["input_ids"]
+        budget = RERANK_MAX_LENGTH - tokenizer.num_special_tokens_to_add(pair=True)
+
+        features = []
+        for content in contents:
+            first, second = _truncate_pair(query_ids, self._chunk_ids(content, tokenizer), budget)
+            pair = {"input_ids": tokenizer.build_inputs_with_special_tokens(first, second)}
+            if "token_type_ids" in tokenizer.model_input_names:
+                pair["token_type_ids"] = tokenizer.create_token_type_ids_from_sequences(first, second)
+            features.append(pair)
+
+        batch = tokenizer.pad(features, padding=True, return_tensors="pt")
+        batch = {name: tensor.to(model.model.device) for name, tensor in batch.items()}
+        model.model.eval()
+        with torch.no_grad():
+            logits = model.model(**batch, return_dict=True).logits
+            scores = model.default_activation_function(logits)
+        return scores[:, 0].tolist()
+
+    def invalidate(self, version: int = None):
+        """Drop both caches (called when the index changes)."""
+        with self._lock:
+            self._tokens.clear()
+            self._scores.clear()
+            self.invalidations += 1
+        logger.debug(f"Re-ranker caches cleared (index version {version})")
+
     # ------------------------------------------------------------------
     # Utility
     # ------------------------------------------------------------------
@@ -173,6 +332,9 @@ class CrossEncoderReranker:
             "loaded": self.is_available,
             "candidate_pool": config.RERANK_CANDIDATE_DOCS,
             "final_top_n": config.MAX_CONTEXT_DOCS,
+            "token_cache": self._tokens.stats(),
+            "score_cache": self._scores.stats(),
+            "cache_invalidations": self.invalidations,
         }
 
 
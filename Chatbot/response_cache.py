@@ -0,0 +1,235 @@
+"""
+Semantic response cache for the NexGenTeck AI Chatbot.
+
+Visitors ask the same few questions over and over. Answers are cached by
+the embedding of the normalized message: a new message whose embedding is
+within RESPONSE_CACHE_THRESHOLD cosine similarity of a cached question gets
+the stored answer without running the RAG pipeline.
+
+Messages the intent prototypes (intent_classifier.py) place in a lead
+intent bypass the cache when RESPONSE_CACHE_SKIP_LEAD_INTENT is set: a
+visitor asking to be contacted must never get a stored generic answer.
+
+Entries are evicted least-recently-used beyond RESPONSE_CACHE_MAX_ENTRIES
+and expire after RESPONSE_CACHE_TTL_SECONDS. The whole cache is dropped
+whenever the vector store's content changes (see
+VectorStore.on_index_change), so answers never outlive the index they
+were generated from.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from config import config
+from embeddings import query_batcher
+from intent_classifier import LEAD_INTENTS, intent_classifier
+from vector_store import vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalize a message for cache lookup: lowercase, collapse whitespace
+    and drop trailing punctuation, so "What services do you offer?" and
+    "what services do you offer" share an entry.
+    """
+    return ' '.join(message.lower().split()).rstrip('?!. ')
+
+
+class CacheLookup(NamedTuple):
+    """Result of ResponseCache.lookup; pass it back to store() on a miss."""
+    key: str
+    vector: Optional[np.ndarray]
+    index_version: int
+    response: Optional[str]
+
+
+class _Entry(NamedTuple):
+    vector: np.ndarray
+    response: str
+    created: float
+
+
+class ResponseCache:
+    """LRU + TTL cache of answers keyed by normalized message embedding."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        threshold: Optional[float] = None
+    ):
+        """
+        Args:
+            max_entries: Entry limit (default RESPONSE_CACHE_MAX_ENTRIES)
+            ttl_seconds: Entry lifetime (default RESPONSE_CACHE_TTL_SECONDS)
+            threshold: Minimum cosine similarity for a semantic hit
+                (default RESPONSE_CACHE_THRESHOLD)
+        """
+        self.max_entries = max_entries or config.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or config.RESPONSE_CACHE_TTL_SECONDS
+        self.threshold = threshold or config.RESPONSE_CACHE_THRESHOLD
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Stacked entry vectors for the semantic scan, rebuilt after changes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped_lead = 0
+        self.bypassed_lead = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        vector_store.on_index_change(self.invalidate)
+
+    @property
+    def enabled(self) -> bool:
+        return config.ENABLE_RESPONSE_CACHE
+
+    def _live(self, key: str, now: float) -> Optional[_Entry]:
+        """Return an unexpired entry (marking it recently used), dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry.created > self.ttl_seconds:
+            del self._entries[key]
+            self._matrix = None
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, vector: np.ndarray, now: float) -> Optional[_Entry]:
+        """Most similar cached question at or above the threshold."""
+        if not self._entries:
+            return None
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries)
+            self._matrix = np.stack([self._entries[key].vector for key in self._matrix_keys])
+        similarities = self._matrix @ vector
+        for row in np.argsort(-similarities):
+            if similarities[row] < self.threshold:
+                return None
+            entry = self._live(self._matrix_keys[row], now)
+            if entry is not None:
+                return entry
+        return None
+
+    async def lookup(self, message: str) -> CacheLookup:
+        """
+        Look a message up, exact normalized match first, then by embedding.
+        A likely lead message (see RESPONSE_CACHE_SKIP_LEAD_INTENT) is a miss
+        without a lookup, and its answer is not stored.
+
+        Args:
+            message: User message
+
+        Returns:
+            CacheLookup whose 'response' is the cached answer, or None on a miss
+        """
+        version = vector_store.index_version
+        key = normalize_message(message)
+        if not self.enabled:
+            return CacheLookup(key, None, version, None)
+        if config.RESPONSE_CACHE_SKIP_LEAD_INTENT:
+            # Same call as the analysis fast path, so the embedding is reused
+            prediction = await intent_classifier.classify(message, count=False)
+            if prediction["intent"] in LEAD_INTENTS:
+                self.bypassed_lead += 1
+                return CacheLookup(key, None, version, None)
+
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            if entry is not None:
+                self.exact_hits += 1
+                return CacheLookup(key, entry.vector, version, entry.response)
+
+        vector = np.asarray(await query_batcher.embed(key), dtype=np.float32)
+
+        with self._lock:
+            entry = self._nearest(vector, time.monotonic())
+            if entry is not None:
+                self.semantic_hits += 1
+                return CacheLookup(key, vector, version, entry.response)
+            self.misses += 1
+        return CacheLookup(key, vector, version, None)
+
+    def store(self, lookup: CacheLookup, response: str, analysis: Dict):
+        """
+        Cache the answer generated after a miss.
+
+        Lead-intent answers are not cached when RESPONSE_CACHE_SKIP_LEAD_INTENT
+        is set: those replies acknowledge the specific visitor's details.
+        Answers generated against an index that has since changed are dropped.
+
+        Args:
+            lookup: The miss returned by lookup()
+            response: Generated answer
+            analysis: Message analysis from the pipeline
+        """
+        if not self.enabled or lookup.vector is None or lookup.response is not None:
+            return
+        if config.RESPONSE_CACHE_SKIP_LEAD_INTENT and (
+            analysis.get('is_lead_intent') or analysis.get('intent') in LEAD_INTENTS
+        ):
+            self.skipped_lead += 1
+            return
+
+        with self._lock:
+            if lookup.index_version != vector_store.index_version:
+                return
+            self._entries[lookup.key] = _Entry(lookup.vector, response, time.monotonic())
+            self._entries.move_to_end(lookup.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+            self.stores += 1
+
+    def invalidate(self, index_version: int = None):
+        """Drop every entry (registered as a vector store index-change listener)."""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._matrix = None
+            self.invalidations += 1
+        if dropped:
+            logger.info(f"Response cache invalidated ({dropped} entries, index version {index_version})")
+
+    def status(self) -> Dict[str, object]:
+        """Return hit/miss counters (useful for /health)."""
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "skipped_lead_intent": self.skipped_lead,
+            "bypassed_lead_intent": self.bypassed_lead,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "index_version": vector_store.index_version,
+        }
+
+
+# Singleton instance
+response_cache = ResponseCache()
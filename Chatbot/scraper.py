@@ -4,11 +4,17 @@ Crawls the entire NexGenTeck website and extracts ALL content for the knowledge
 This is the ONLY source of information for the chatbot.
 """
 
-from bs4 import BeautifulSoup
-from typing import List, Dict, Set
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, NamedTuple, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 import logging
 import os
+import threading
+import time
+import httpx
+import lxml.html
+from lxml import etree
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options as ChromeOptions
@@ -16,10 +22,435 @@ from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
 from config import config
-from utils import clean_text, chunk_text
+from chunking import (
+    CONTENT_MARKER, ITEMS_MARKER, PAGE_LABEL, SECTIONS_MARKER, TABLES_MARKER, URL_LABEL,
+    chunk_document, get_token_counter
+)
+from crawl_cache import CrawlCache, content_hash
+from utils import clean_text
 
 logger = logging.getLogger(__name__)
 
+CRAWLER_USER_AGENT = "NexGenTeckChatbot/1.0 (+knowledge base crawler)"
+# Upper bound on sitemap files read (index files included)
+MAX_SITEMAP_FILES = 10
+# Bump when extraction or chunking code changes, so cached pages are re-extracted
+# (chunker settings are part of the cache version on their own, see _crawl_cache_version)
+EXTRACTION_VERSION = "2"
+
+
+# Elements whose content never reaches the knowledge base
+SKIPPED_TAGS = frozenset({'script', 'style', 'noscript', 'iframe'})
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+# Containers whose own (first direct) text is kept, for modern websites
+TEXT_CONTAINER_TAGS = frozenset({'span', 'div', 'section', 'article'})
+
+
+class PageContent(NamedTuple):
+    """Everything extracted from one page, each list in document order."""
+    title: str
+    description: str
+    headings: List[str]
+    paragraphs: List[str]
+    list_items: List[str]
+    other_content: List[str]
+    tables: List[str]
+    hrefs: List[str]
+
+
+def _first_direct_string(element) -> Optional[str]:
+    """
+    The element's first direct child string, skipping removed elements
+    (their tail text still counts). Comments count as strings.
+    """
+    if element.text is not None:
+        return element.text
+    for child in element:
+        if not isinstance(child.tag, str) and child.text is not None:
+            return child.text
+        if child.tail is not None:
+            return child.tail
+    return None
+
+
+def collect_page_content(html: str) -> Optional[PageContent]:
+    """
+    Collect a page's title, description, headings, paragraphs, list items,
+    container text, table rows and links in a single walk over the DOM.
+    
+    Script, style, noscript and iframe subtrees are skipped (and dropped
+    before any text is read). Elements are matched during the walk; their
+    text is read afterwards, so nested matches keep their full text.
+    
+    Args:
+        html: Page source
+        
+    Returns:
+        PageContent (empty if the HTML has no document at all)
+    """
+    try:
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # str input with an XML encoding declaration
+            root = lxml.html.document_fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        return PageContent("", "", [], [], [], [], [], [])
+
+    title = None
+    description = None
+    headings = []
+    paragraphs = []
+    list_items = []
+    other_content = []
+    hrefs = []
+    table_rows: Dict[object, List[List[str]]] = {}
+    row_cells: Dict[object, List[str]] = {}
+    cells = []
+    skipped = []
+
+    walker = etree.iterwalk(root, events=('start',))
+    for _, element in walker:
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+        if tag in SKIPPED_TAGS:
+            skipped.append(element)
+            walker.skip_subtree()
+        elif tag in HEADING_TAGS or tag in ('p', 'li'):
+            (headings if tag in HEADING_TAGS else paragraphs if tag == 'p' else list_items).append(element)
+        elif tag in TEXT_CONTAINER_TAGS:
+            text = _first_direct_string(element)
+            if text:
+                text = clean_text(text)
+                if len(text) > 30:
+                    other_content.append(text)
+        elif tag == 'table':
+            table_rows[element] = []
+        elif tag == 'tr':
+            # A row belongs to every enclosing table, and its cells to every enclosing row
+            row = row_cells[element] = []
+            for table in element.iterancestors('table'):
+                table_rows[table].append(row)
+        elif tag in ('td', 'th'):
+            cells.append(element)
+        elif tag == 'title' and title is None:
+            title = element
+        elif tag == 'meta' and description is None and element.get('name') == 'description':
+            description = element.get('content', '')
+        elif tag == 'a' and 'href' in element.attrib:
+            hrefs.append(element.get('href'))
+
+    for element in skipped:
+        element.drop_tree()
+
+    def text_of(element) -> str:
+        return clean_text(element.text_content())
+
+    for cell in cells:
+        text = text_of(cell)
+        for row in cell.iterancestors('tr'):
+            row_cells[row].append(text)
+
+    tables = []
+    for rows in table_rows.values():
+        lines = [' | '.join(row) for row in rows if row]
+        if lines:
+            tables.append('\n'.join(lines))
+
+    heading_texts = []
+    for heading in headings:
+        text = text_of(heading)
+        if text and len(text) > 2:
+            heading_texts.append(f"[{heading.tag.upper()}] {text}")
+
+    return PageContent(
+        title=text_of(title) if title is not None else "",
+        description=description or '',
+        headings=heading_texts,
+        paragraphs=[text for text in map(text_of, paragraphs) if len(text) > 15],
+        list_items=[f"• {text}" for text in map(text_of, list_items) if len(text) > 10],
+        other_content=other_content,
+        tables=tables,
+        hrefs=hrefs,
+    )
+
+
+def extract_page(html: str, url: str, base_url: str) -> Tuple[List[Dict[str, str]], List[str]]:
+    """
+    Turn a rendered page into chunked documents and same-site links.
+    A module-level function so it can run in a process pool.
+    
+    Args:
+        html: Rendered page source
+        url: URL of the page
+        base_url: Site root, used to resolve relative links
+        
+    Returns:
+        (documents, links) with links in page order, fragments removed
+    """
+    page = collect_page_content(html)
+    return WebsiteScraper._extract_all_content(page, url), resolve_links(page.hrefs, base_url)
+
+
+def resolve_links(hrefs: List[str], base_url: str) -> List[str]:
+    """Same-site absolute URLs for a page's hrefs, in order."""
+    base_domain = urlparse(base_url).netloc
+    links = []
+    for href in hrefs:
+        href = href.strip()
+        if not href or href.startswith('mailto:') or href.startswith('tel:'):
+            continue
+
+        # Preserve GitHub Pages subpaths like "/NGT/" when joining.
+        if href.startswith('http://') or href.startswith('https://'):
+            next_url = href
+        else:
+            next_url = urljoin(base_url.rstrip('/') + '/', href.lstrip('/'))
+        parsed = urlparse(next_url)
+        if parsed.netloc != base_domain:
+            continue
+
+        # Remove fragment to avoid duplicates
+        links.append(parsed._replace(fragment="").geturl())
+    return links
+
+
+def looks_like_spa_shell(html: str, min_text_chars: int = None) -> bool:
+    """
+    Heuristic for a client-rendered page that plain HTTP can't see: no
+    <h1>, or hardly any visible text once scripts and styles are removed.
+    
+    Args:
+        html: Page source as served over HTTP
+        min_text_chars: Visible-text threshold (default CRAWL_SPA_MIN_TEXT_CHARS)
+    """
+    if min_text_chars is None:
+        min_text_chars = config.CRAWL_SPA_MIN_TEXT_CHARS
+    try:
+        root = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return True
+    for element in root.xpath('//script|//style|//noscript|//template'):
+        element.drop_tree()
+    if not root.xpath('//h1'):
+        return True
+    text = ' '.join(root.text_content().split())
+    return len(text) < min_text_chars
+
+
+class _CrawlReport:
+    """Thread-safe per-tier page counts and fetch times for one crawl."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = {"http": 0, "browser": 0, "failed": 0}
+        self.seconds = {"http": 0.0, "browser": 0.0}
+        self.escalated = 0
+        self.sitemap_urls = 0
+        self.not_modified = 0
+        self.extractions_skipped = 0
+        self.unchanged_urls: Set[str] = set()
+    
+    def add_time(self, tier: str, seconds: float):
+        with self._lock:
+            self.seconds[tier] += seconds
+    
+    def page(self, tier: str):
+        with self._lock:
+            self.pages[tier] += 1
+    
+    def escalate(self):
+        with self._lock:
+            self.escalated += 1
+    
+    def reused(self, url: str, not_modified: bool):
+        """A cached extraction was reused (HTTP 304 or identical HTML)."""
+        with self._lock:
+            self.extractions_skipped += 1
+            self.not_modified += int(not_modified)
+            self.unchanged_urls.add(url)
+    
+    def unchanged(self, url: str):
+        """The page was re-extracted but produced the same documents."""
+        with self._lock:
+            self.unchanged_urls.add(url)
+    
+    def to_dict(self) -> Dict[str, object]:
+        """
+        Pages served by each tier and the estimated worker time saved: what
+        the HTTP-served pages would have cost in the browser (at the average
+        rendering time measured in this crawl), minus all HTTP time spent.
+        """
+        with self._lock:
+            saved = None
+            if self.pages["browser"]:
+                per_render = self.seconds["browser"] / self.pages["browser"]
+                saved = round(self.pages["http"] * per_render - self.seconds["http"], 1)
+            return {
+                "pages_http": self.pages["http"],
+                "pages_browser": self.pages["browser"],
+                "pages_failed": self.pages["failed"],
+                "escalated_to_browser": self.escalated,
+                "sitemap_urls": self.sitemap_urls,
+                "pages_not_modified": self.not_modified,
+                "extractions_skipped": self.extractions_skipped,
+                "pages_unchanged": len(self.unchanged_urls),
+                "http_seconds": round(self.seconds["http"], 1),
+                "browser_seconds": round(self.seconds["browser"], 1),
+                "estimated_seconds_saved": saved,
+            }
+
+
+class _CrawlFrontier:
+    """
+    Shared, deduplicated crawl frontier with a deterministic order.
+    
+    URLs are handed out in breadth-first (FIFO) order, but a page's results
+    are committed only after every earlier page's, and only committed pages
+    add links to the frontier. Which pages are crawled, and the order of
+    their documents, is therefore the same as a serial crawl's, however many
+    workers fetch concurrently.
+    
+    Committed documents are collected in `documents`, or handed to `sink`
+    page by page. The sink is called in commit order with the frontier
+    locked, so a sink that blocks holds the crawl back.
+    """
+    
+    def __init__(
+        self,
+        start_urls: List[str],
+        max_pages: int,
+        sink: Optional[Callable[[List[Dict[str, str]]], None]] = None
+    ):
+        self.max_pages = max_pages
+        self.urls: List[str] = list(dict.fromkeys(start_urls))
+        self.documents: List[Dict[str, str]] = []
+        self.document_count = 0
+        self._sink = sink
+        self._seen: Set[str] = set(self.urls)
+        self._dispatched = 0
+        self._committed = 0
+        self._pending: Dict[int, Tuple[List[Dict[str, str]], List[str]]] = {}
+        self._stopped = False
+        self._cond = threading.Condition()
+    
+    @property
+    def pages_done(self) -> int:
+        return self._committed
+    
+    @property
+    def dispatched_urls(self) -> List[str]:
+        return self.urls[:self._dispatched]
+    
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+    
+    def take(self) -> Optional[Tuple[int, str]]:
+        """
+        Next (position, url) to fetch; blocks while only in-flight pages
+        can still add URLs. Returns None when the crawl is over.
+        """
+        with self._cond:
+            while True:
+                if self._stopped or self._dispatched >= self.max_pages:
+                    return None
+                if self._dispatched < len(self.urls):
+                    position = self._dispatched
+                    self._dispatched += 1
+                    return position, self.urls[position]
+                if self._committed >= self._dispatched:
+                    return None
+                self._cond.wait()
+    
+    def complete(self, position: int, documents: List[Dict[str, str]], links: List[str]):
+        """
+        Record a page's results; commits every page now complete in order.
+        Only the first call for a position counts, so a worker can always
+        complete a page on its way out.
+        """
+        with self._cond:
+            if position < self._committed or position in self._pending:
+                return
+            self._pending[position] = (documents, links)
+            try:
+                while self._committed in self._pending:
+                    documents, links = self._pending.pop(self._committed)
+                    # Committed even if the sink fails, or later pages would wait forever
+                    self._committed += 1
+                    self.document_count += len(documents)
+                    for link in links:
+                        if link not in self._seen:
+                            self._seen.add(link)
+                            self.urls.append(link)
+                    if self._sink is None:
+                        self.documents.extend(documents)
+                    elif documents:
+                        self._sink(documents)
+            finally:
+                self._cond.notify_all()
+    
+    def stop(self):
+        """Hand out no more URLs (pages already fetched are still committed)."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class _HostThrottle:
+    """Per-host politeness: a concurrency cap and a minimum gap between request starts."""
+    
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+    
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Hold one of the host's slots while fetching url."""
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(self.max_concurrent))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def _crawl_cache_version() -> str:
+    """
+    Version of cached extractions: EXTRACTION_VERSION plus the chunker
+    settings (token budget and tokenizer, or the character estimate it
+    falls back to), since cached pages hold their chunks.
+    """
+    return f"{EXTRACTION_VERSION}:{config.CHUNK_MAX_TOKENS}:{get_token_counter().name}"
+
+
+class _FetchedPage(NamedTuple):
+    """Plain-HTTP fetch result; html is None when the server answered 304."""
+    html: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+class _CrawlRun(NamedTuple):
+    """Shared state of one crawl, handed to every worker."""
+    frontier: _CrawlFrontier
+    throttle: _HostThrottle
+    extractor: Executor
+    report: _CrawlReport
+    client: Optional[httpx.Client]
+    cache: Optional[CrawlCache]
+    progress: Optional[Callable[[int], bool]]
+
 
 class WebsiteScraper:
     """
@@ -37,8 +468,24 @@ class WebsiteScraper:
         self.base_url = base_url or config.WEBSITE_URL
         self.visited_urls: Set[str] = set()
         self.documents: List[Dict[str, str]] = []
+        # Pages per fetch tier and time saved by the HTTP tier (last crawl)
+        self.crawl_report: Dict[str, object] = {}
+        # Documents handed to a scrape() sink instead of collected
+        self.documents_streamed = 0
+        # Pages whose documents are identical to the previous crawl's
+        self.unchanged_urls: Set[str] = set()
+        
+        # Chrome is only started once a page needs rendering
+        self._browser_lock = threading.Lock()
+        self._browser_service: Optional[ChromeService] = None
+        self._browser_error: Optional[Exception] = None
         
-    def scrape(self, max_pages: int = 100) -> List[Dict[str, str]]:
+    def scrape(
+        self,
+        max_pages: int = 100,
+        progress: Optional[Callable[[int], bool]] = None,
+        sink: Optional[Callable[[List[Dict[str, str]]], None]] = None
+    ) -> List[Dict[str, str]]:
         """
         Scrape the ENTIRE website and extract ALL content.
         For local development, uses translation files directly.
@@ -46,9 +493,15 @@ class WebsiteScraper:
         
         Args:
             max_pages: Maximum number of pages to scrape
+            progress: Optional callback called with the number of pages
+                visited before each page load; returning True stops the crawl
+            sink: Optional callback receiving each page's documents, in
+                crawl order, as soon as the page is committed; they are
+                then not collected (fallback content also goes to the sink)
             
         Returns:
-            List of documents with 'content' and 'metadata' keys
+            List of documents with 'content' and 'metadata' keys (empty
+            when a sink received them)
         """
         logger.info(f"Starting comprehensive scrape of {self.base_url}")
         
@@ -63,18 +516,18 @@ class WebsiteScraper:
                     from translation_extractor import get_translation_based_content
                     self.documents = get_translation_based_content()
                     logger.info(f"Loaded {len(self.documents)} documents from translations")
-                    return self.documents
+                    return self._hand_over(sink)
                 except Exception as e:
                     logger.warning(f"Translation extractor failed: {e}, falling back to source scraping")
         
         # Crawl with a JS-capable browser so SPA content is rendered
         try:
-            self._crawl_site(max_pages=max_pages)
+            self._crawl_site(max_pages=max_pages, progress=progress, sink=sink)
         except Exception as e:
             logger.error(f"Rendered scraping failed: {e}")
 
         # If scraping produced nothing, provide a fallback so the bot still works.
-        if not self.documents:
+        if not self.documents and not self.documents_streamed:
             logger.warning("No documents extracted from scraping; falling back to safe defaults")
             if config.USE_TRANSLATION_EXTRACTOR:
                 try:
@@ -87,199 +540,458 @@ class WebsiteScraper:
             if not self.documents:
                 self.documents = self._get_fallback_content()
                 
-        logger.info(f"Scraped {len(self.visited_urls)} pages, created {len(self.documents)} documents")
+        logger.info(
+            f"Scraped {len(self.visited_urls)} pages, "
+            f"created {len(self.documents) + self.documents_streamed} documents"
+        )
+        return self._hand_over(sink)
+    
+    def _hand_over(self, sink: Optional[Callable[[List[Dict[str, str]]], None]]) -> List[Dict[str, str]]:
+        """Pass collected documents (translations / fallback) to the sink, if any."""
+        if sink is None or not self.documents:
+            return self.documents
+        sink(self.documents)
+        self.documents_streamed += len(self.documents)
+        self.documents = []
         return self.documents
     
-    def _crawl_site(self, max_pages: int) -> None:
+    def _crawl_site(
+        self,
+        max_pages: int,
+        progress: Optional[Callable[[int], bool]] = None,
+        sink: Optional[Callable[[List[Dict[str, str]]], None]] = None
+    ) -> None:
         """
-        Crawl the site with a JS-capable browser to fully render SPA content.
+        Crawl the site, rendering in headless Chrome only where needed.
+        
+        The frontier is seeded with the start URL plus sitemap.xml entries.
+        CRAWL_WORKERS workers pull pages from it (politeness limits per host
+        apply) and fetch each over plain HTTP first, through one pooled
+        client; pages that look like an empty SPA shell are escalated to
+        the worker's Chrome. Pages are parsed on a separate extraction pool.
+        Output does not depend on the number of workers.
+        
+        With the crawl cache, HTTP requests are conditional, and pages that
+        answer 304 or whose HTML is unchanged reuse their cached extraction.
         """
-        base_domain = urlparse(self.base_url).netloc
-        queue: List[str] = [self.base_url]
+        workers = max(1, config.CRAWL_WORKERS)
+        report = _CrawlReport()
+        throttle = _HostThrottle(config.CRAWL_HOST_CONCURRENCY, config.CRAWL_HOST_DELAY_SECONDS)
+        cache = self._open_crawl_cache()
 
-        chrome_options = ChromeOptions()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--remote-debugging-port=9222")
+        client = None
+        start_urls = [self.base_url]
+        if config.CRAWL_HTTP_FIRST:
+            client = httpx.Client(
+                timeout=config.CRAWL_PAGE_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                headers={"User-Agent": CRAWLER_USER_AGENT},
+                limits=httpx.Limits(max_connections=workers, max_keepalive_connections=workers),
+            )
+            if config.CRAWL_USE_SITEMAP:
+                sitemap_urls = self._sitemap_urls(client)
+                report.sitemap_urls = len(sitemap_urls)
+                start_urls.extend(sitemap_urls)
+        frontier = _CrawlFrontier(start_urls, max_pages, sink)
 
-        # Use system chromium if available (set via CHROME_BIN env var in Docker),
-        # otherwise fall back to webdriver-manager auto-download for local dev.
-        chrome_bin = os.environ.get("CHROME_BIN")
-        chromedriver_path = os.environ.get("CHROMEDRIVER_PATH")
+        extract_workers = max(1, config.CRAWL_EXTRACT_WORKERS)
+        if config.CRAWL_EXTRACT_PROCESSES:
+            extractor = ProcessPoolExecutor(max_workers=extract_workers)
+        else:
+            extractor = ThreadPoolExecutor(max_workers=extract_workers, thread_name_prefix="extract")
 
-        if chrome_bin:
-            chrome_options.binary_location = chrome_bin
+        run = _CrawlRun(frontier, throttle, extractor, report, client, cache, progress)
+        try:
+            # The crawl pool shuts down first; the extractor then drains pending pages
+            with extractor, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl") as pool:
+                futures = [pool.submit(self._crawl_worker, index, run) for index in range(workers)]
+                errors = [future.exception() for future in futures]
+        finally:
+            if client is not None:
+                client.close()
 
-        if chromedriver_path:
-            service = ChromeService(executable_path=chromedriver_path)
-        else:
-            service = ChromeService(ChromeDriverManager().install())
+        self.visited_urls.update(frontier.dispatched_urls)
+        self.documents.extend(frontier.documents)
+        if sink is not None:
+            self.documents_streamed += frontier.document_count
+        self.unchanged_urls = set(report.unchanged_urls)
+        self.crawl_report = report.to_dict()
+        logger.info(f"Crawl report: {self.crawl_report}")
+
+        if cache is not None:
+            # A complete crawl tells which pages are gone; a stopped one doesn't
+            if not frontier.stopped:
+                cache.retain(frontier.dispatched_urls)
+            cache.save()
 
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        for error in errors:
+            if error is not None:
+                raise error
 
+    def _open_crawl_cache(self) -> Optional[CrawlCache]:
+        """The on-disk crawl cache, or None if disabled or unavailable."""
+        if not config.ENABLE_CRAWL_CACHE:
+            return None
         try:
-            while queue and len(self.visited_urls) < max_pages:
-                url = queue.pop(0)
-                if url in self.visited_urls:
-                    continue
+            return CrawlCache(os.path.join(config.CACHE_DIR, "crawl"), _crawl_cache_version())
+        except OSError as e:
+            logger.warning(f"Crawl cache unavailable, crawling without it: {e}")
+            return None
 
-                self.visited_urls.add(url)
-                logger.info(f"Processing: {url}")
+    def _crawl_worker(self, index: int, run: _CrawlRun) -> None:
+        """One worker: fetch frontier pages until the crawl is over."""
+        driver = None
+        try:
+            while True:
+                if run.progress is not None and run.progress(run.frontier.pages_done):
+                    logger.info("Crawl stopped early on request")
+                    run.frontier.stop()
+                    return
 
+                task = run.frontier.take()
+                if task is None:
+                    return
+                position, url = task
+                logger.info(f"Processing: {url}")
+                # Set once the extraction pool owns the page (it commits it)
+                handed_off = False
                 try:
-                    driver.get(url)
-                    WebDriverWait(driver, 30).until(
-                        lambda d: d.execute_script("return document.readyState") == "complete"
+                    cached = run.cache.get(url) if run.cache is not None else None
+                    html = None
+                    tier = "http"
+                    fetched = _FetchedPage(None)
+                    if run.client is not None:
+                        # Validators only mean something for pages served over HTTP last time
+                        conditional = cached if cached is not None and cached.get("tier") == "http" else None
+                        fetched = self._fetch_page(run, url, conditional) or fetched
+                        if fetched.not_modified:
+                            run.report.page("http")
+                            self._reuse_page(run, position, url, cached, not_modified=True)
+                            continue
+                        html = fetched.html
+                    if html is None:
+                        tier = "browser"
+                        if driver is None:
+                            driver = self._start_browser(index)
+                        if driver is not None:
+                            html = self._render_page(driver, run.throttle, url, run.report)
+
+                    if html is None:
+                        run.report.page("failed")
+                        continue
+                    run.report.page(tier)
+
+                    html_hash = content_hash(html)
+                    if cached is not None and cached.get("html_hash") == html_hash:
+                        run.cache.touch(url, fetched.etag, fetched.last_modified)
+                        self._reuse_page(run, position, url, cached, not_modified=False)
+                        continue
+
+                    future = run.extractor.submit(extract_page, html, url, self.base_url)
+                    page = {
+                        "tier": tier,
+                        "html_hash": html_hash,
+                        "etag": fetched.etag,
+                        "last_modified": fetched.last_modified,
+                    }
+                    future.add_done_callback(
+                        lambda done, position=position, url=url, page=page:
+                            self._complete_page(run, position, url, page, done)
                     )
-                    html = driver.page_source
+                    handed_off = True
                 except Exception as e:
-                    logger.warning(f"Failed to load {url}: {e}")
-                    continue
+                    logger.warning(f"Failed to crawl {url}: {e}")
+                    run.report.page("failed")
+                finally:
+                    # Always commit (a no-op if already committed), or every later
+                    # page and every idle worker would wait for this one forever
+                    if not handed_off:
+                        run.frontier.complete(position, [], [])
+        except BaseException:
+            # Release the other workers before this one goes down
+            run.frontier.stop()
+            raise
+        finally:
+            if driver is not None:
+                driver.quit()
 
-                soup = BeautifulSoup(html, 'lxml')
-                self._extract_all_content(soup, url)
+    @staticmethod
+    def _reuse_page(run: _CrawlRun, position: int, url: str, cached: Dict, not_modified: bool):
+        """Commit a page from its cached extraction, marking it unchanged."""
+        run.report.reused(url, not_modified)
+        run.frontier.complete(position, cached["documents"], cached["links"])
 
-                # Discover new links dynamically from rendered HTML
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href', '').strip()
-                    if not href or href.startswith('mailto:') or href.startswith('tel:'):
-                        continue
+    @staticmethod
+    def _complete_page(run: _CrawlRun, position: int, url: str, page: Dict, future: Future):
+        """Commit an extraction result (an empty page if extraction failed) and cache it."""
+        documents, links = [], []
+        try:
+            documents, links = future.result()
+            if run.cache is not None and run.cache.put(url, documents=documents, links=links, **page):
+                run.report.unchanged(url)
+        except Exception as e:
+            logger.warning(f"Failed to extract {url}: {e}")
+        finally:
+            # Always commit, or later pages would wait for this one forever
+            run.frontier.complete(position, documents, links)
 
-                    # Preserve GitHub Pages subpaths like "/NGT/" when joining.
-                    if href.startswith('http://') or href.startswith('https://'):
-                        next_url = href
-                    else:
-                        next_url = urljoin(self.base_url.rstrip('/') + '/', href.lstrip('/'))
-                    parsed = urlparse(next_url)
-                    if parsed.netloc != base_domain:
-                        continue
+    def _fetch_page(self, run: _CrawlRun, url: str, cached: Optional[Dict] = None) -> Optional[_FetchedPage]:
+        """
+        Fetch a page over plain HTTP, conditionally when `cached` has validators.
+        
+        Returns:
+            The page (not_modified and no html on a 304), or None if
+            the page needs the browser (request failed, not HTML, or an
+            empty SPA shell)
+        """
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
 
-                    # Remove fragment to avoid duplicates
-                    normalized = parsed._replace(fragment="").geturl()
-                    if normalized not in self.visited_urls:
-                        queue.append(normalized)
+        started = time.perf_counter()
+        try:
+            with run.throttle.slot(url):
+                response = run.client.get(url, headers=headers)
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+            # ValueError covers URLs / cached validators that can't be encoded
+            logger.info(f"HTTP fetch failed for {url} ({e}), rendering instead")
+            run.report.escalate()
+            return None
         finally:
-            driver.quit()
+            run.report.add_time("http", time.perf_counter() - started)
+
+        if response.status_code == 304 and cached is not None:
+            return _FetchedPage(None, not_modified=True)
+
+        content_type = response.headers.get("content-type", "")
+        if response.status_code != 200 or "html" not in content_type:
+            logger.info(f"HTTP fetch of {url} returned {response.status_code} {content_type}, rendering instead")
+            run.report.escalate()
+            return None
+
+        html = response.text
+        if looks_like_spa_shell(html):
+            logger.info(f"{url} looks like an SPA shell, rendering instead")
+            run.report.escalate()
+            return None
+        return _FetchedPage(html, response.headers.get("etag"), response.headers.get("last-modified"))
+
+    def _render_page(
+        self,
+        driver: webdriver.Chrome,
+        throttle: _HostThrottle,
+        url: str,
+        report: _CrawlReport
+    ) -> Optional[str]:
+        """Load a page in Chrome; returns the rendered HTML, or None on failure."""
+        started = time.perf_counter()
+        try:
+            with throttle.slot(url):
+                driver.get(url)
+                WebDriverWait(driver, config.CRAWL_PAGE_TIMEOUT_SECONDS).until(
+                    lambda d: d.execute_script("return document.readyState") == "complete"
+                )
+                return driver.page_source
+        except Exception as e:
+            logger.warning(f"Failed to load {url}: {e}")
+            return None
+        finally:
+            report.add_time("browser", time.perf_counter() - started)
+
+    def _sitemap_urls(self, client: httpx.Client) -> List[str]:
+        """
+        Page URLs listed in the site's sitemaps (sitemap.xml under the base
+        URL plus any named in robots.txt), same-site only, in file order.
+        Sitemap index files are followed; missing sitemaps are not an error.
+        """
+        sitemaps = [urljoin(self.base_url.rstrip('/') + '/', 'sitemap.xml')]
+        try:
+            robots = client.get(urljoin(self.base_url, '/robots.txt'))
+            if robots.status_code == 200:
+                for line in robots.text.splitlines():
+                    if line.lower().startswith('sitemap:'):
+                        sitemaps.append(line.split(':', 1)[1].strip())
+        except httpx.HTTPError:
+            pass
+
+        base_domain = urlparse(self.base_url).netloc
+        parser = etree.XMLParser(resolve_entities=False, no_network=True)
+        pages: List[str] = []
+        fetched: Set[str] = set()
+        while sitemaps and len(fetched) < MAX_SITEMAP_FILES:
+            sitemap_url = sitemaps.pop(0)
+            if sitemap_url in fetched:
+                continue
+            fetched.add(sitemap_url)
+            try:
+                response = client.get(sitemap_url)
+                if response.status_code != 200:
+                    continue
+                root = etree.fromstring(response.content, parser)
+            except (httpx.HTTPError, etree.XMLSyntaxError) as e:
+                logger.info(f"Skipping sitemap {sitemap_url}: {e}")
+                continue
+
+            locations = [loc.text.strip() for loc in root.iter('{*}loc') if loc.text]
+            if root.tag.endswith('sitemapindex'):
+                sitemaps.extend(locations)
+                continue
+            for location in locations:
+                parsed = urlparse(location)
+                if parsed.netloc == base_domain:
+                    pages.append(parsed._replace(fragment="").geturl())
+
+        if pages:
+            logger.info(f"Sitemap lists {len(pages)} pages")
+        return list(dict.fromkeys(pages))
+
+    def _start_browser(self, index: int) -> Optional[webdriver.Chrome]:
+        """
+        Start worker `index`'s Chrome for its first page that needs
+        rendering. Returns None (for every worker) once Chrome failed to start.
+        """
+        with self._browser_lock:
+            if self._browser_error is not None:
+                return None
+            try:
+                if self._browser_service is None:
+                    self._browser_service = self._chrome_service()
+            except Exception as e:
+                logger.error(f"Chrome is unavailable, pages needing rendering will be skipped: {e}")
+                self._browser_error = e
+                return None
+        try:
+            return self._create_driver(self._browser_service, index)
+        except Exception as e:
+            logger.error(f"Crawl worker {index} could not start Chrome: {e}")
+            with self._browser_lock:
+                self._browser_error = e
+            return None
+
+    def _chrome_service(self) -> ChromeService:
+        """Chromedriver service shared by all crawl workers."""
+        # Use system chromium if available (set via CHROME_BIN env var in Docker),
+        # otherwise fall back to webdriver-manager auto-download for local dev.
+        chromedriver_path = os.environ.get("CHROMEDRIVER_PATH")
+        if chromedriver_path:
+            return ChromeService(executable_path=chromedriver_path)
+        return ChromeService(ChromeDriverManager().install())
+
+    def _create_driver(self, service: ChromeService, index: int = 0) -> webdriver.Chrome:
+        """Start a headless Chrome for crawl worker `index`."""
+        chrome_options = ChromeOptions()
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-extensions")
+        # One debugging port per browser so workers don't collide
+        chrome_options.add_argument(f"--remote-debugging-port={9222 + index}")
+
+        chrome_bin = os.environ.get("CHROME_BIN")
+        if chrome_bin:
+            chrome_options.binary_location = chrome_bin
+
+        return webdriver.Chrome(service=service, options=chrome_options)
     
-    def _extract_all_content(self, soup: BeautifulSoup, url: str):
+    @staticmethod
+    def _page_text(page: PageContent, url: str) -> str:
         """
-        Extract ALL relevant content from a page.
+        Assemble ALL of a page's relevant content into one labelled text.
         This is comprehensive - we want all the website information.
         
         Args:
-            soup: BeautifulSoup object
+            page: Content collected by collect_page_content
             url: URL of the page
+            
+        Returns:
+            Blank-line separated blocks, grouped under section markers
         """
-        # Remove elements that don't contain useful content
-        for element in soup(['script', 'style', 'noscript', 'iframe']):
-            element.decompose()
-        
-        # Extract page title
-        title = soup.find('title')
-        title_text = clean_text(title.get_text()) if title else ""
-        
-        # Extract meta description
-        meta_desc = soup.find('meta', {'name': 'description'})
-        meta_desc_text = meta_desc.get('content', '') if meta_desc else ''
-        
-        # Extract all headings
-        headings = []
-        for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            text = clean_text(h.get_text())
-            if text and len(text) > 2:
-                level = h.name  # h1, h2, etc.
-                headings.append(f"[{level.upper()}] {text}")
-        
-        # Extract all paragraphs
-        paragraphs = []
-        for p in soup.find_all('p'):
-            text = clean_text(p.get_text())
-            if text and len(text) > 15:  # Skip very short paragraphs
-                paragraphs.append(text)
-        
-        # Extract list items (services, features, benefits, etc.)
-        list_items = []
-        for li in soup.find_all('li'):
-            text = clean_text(li.get_text())
-            if text and len(text) > 10:
-                list_items.append(f"• {text}")
-        
-        # Extract spans and divs with substantial text (for modern websites)
-        other_content = []
-        for elem in soup.find_all(['span', 'div', 'section', 'article']):
-            # Only direct text, not nested
-            direct_text = elem.find(string=True, recursive=False)
-            if direct_text:
-                text = clean_text(str(direct_text))
-                if text and len(text) > 30:
-                    other_content.append(text)
-        
-        # Extract table content
-        tables = []
-        for table in soup.find_all('table'):
-            rows = []
-            for tr in table.find_all('tr'):
-                cells = [clean_text(td.get_text()) for td in tr.find_all(['td', 'th'])]
-                if cells:
-                    rows.append(' | '.join(cells))
-            if rows:
-                tables.append('\n'.join(rows))
+        title_text = page.title
+        meta_desc_text = page.description
+        headings = page.headings
+        paragraphs = page.paragraphs
+        list_items = page.list_items
+        other_content = page.other_content
+        tables = page.tables
         
         # Build comprehensive document for this page
         content_parts = []
         
         # Page identification
-        content_parts.append(f"PAGE: {title_text}")
-        content_parts.append(f"URL: {url}")
+        content_parts.append(f"{PAGE_LABEL} {title_text}")
+        content_parts.append(f"{URL_LABEL} {url}")
         
         if meta_desc_text:
             content_parts.append(f"DESCRIPTION: {meta_desc_text}")
         
         # All headings provide structure
         if headings:
-            content_parts.append("SECTIONS:")
+            content_parts.append(SECTIONS_MARKER)
             content_parts.extend(headings)
         
         # Main content
         if paragraphs:
-            content_parts.append("CONTENT:")
+            content_parts.append(CONTENT_MARKER)
             content_parts.extend(paragraphs)
         
         # Lists contain important features/services
         if list_items:
-            content_parts.append("FEATURES/ITEMS:")
+            content_parts.append(ITEMS_MARKER)
             content_parts.extend(list_items[:30])  # Limit to prevent too much
         
         # Other content
         if other_content:
-            unique_other = list(set(other_content))[:20]
+            # dict.fromkeys dedupes while keeping document order, so chunk
+            # contents (and their point ids) are stable between crawls
+            unique_other = list(dict.fromkeys(other_content))[:20]
             content_parts.extend(unique_other)
         
         # Tables
         if tables:
-            content_parts.append("TABLE DATA:")
+            content_parts.append(TABLES_MARKER)
             content_parts.extend(tables[:5])
         
         # Combine all content
-        full_content = "\n\n".join(content_parts)
+        return "\n\n".join(content_parts)
+    
+    @staticmethod
+    def _extract_all_content(page: PageContent, url: str) -> List[Dict[str, str]]:
+        """
+        Build a page's documents: its text, chunked along section boundaries.
+        
+        Args:
+            page: Content collected by collect_page_content
+            url: URL of the page
+            
+        Returns:
+            The page's chunked documents
+        """
+        full_content = WebsiteScraper._page_text(page, url)
         
+        documents = []
         if full_content and len(full_content) > 50:
             # Chunk the content for better retrieval
-            chunks = chunk_text(full_content, chunk_size=800, overlap=100)
+            chunks = chunk_document(full_content)
             
             for i, chunk in enumerate(chunks):
-                self.documents.append({
-                    'content': chunk,
+                documents.append({
+                    'content': chunk.text,
                     'metadata': {
                         'source': url,
-                        'title': title_text,
+                        'title': page.title,
                         'chunk_index': i,
-                        'total_chunks': len(chunks)
+                        'total_chunks': len(chunks),
+                        # Position in the page text, and size in CHUNK_TOKENIZER tokens
+                        'char_start': chunk.start,
+                        'char_end': chunk.end,
+                        'token_count': chunk.tokens
                     }
                 })
+        return documents
     
     def _get_fallback_content(self) -> List[Dict[str, str]]:
         """
@@ -8,13 +8,15 @@ This is a hybrid approach: RoBERTa for sentiment, LLM for intent.
 """
 
 from transformers import pipeline
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
-from typing import Dict
+from typing import Awaitable, Dict
+import asyncio
 import logging
 import json
 
+import metrics
 from config import config
+from intent_classifier import intent_classifier
+from llm_client import llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +29,9 @@ class LLMAnalyzer:
     """
     
     _instance = None
-    _llm = None
     _sentiment_model = None
+    # Background LLM comparisons for fast-path accuracy stats
+    _shadow_tasks = set()
     
     def __new__(cls):
         """Singleton pattern."""
@@ -37,22 +40,7 @@ class LLMAnalyzer:
         return cls._instance
     
     def __init__(self):
-        """Initialize the LLM and RoBERTa models."""
-        # Initialize LLM for intent detection
-        if LLMAnalyzer._llm is None:
-            logger.info("Initializing LLM analyzer")
-            try:
-                LLMAnalyzer._llm = ChatGroq(
-                    api_key=config.GROQ_API_KEY,
-                    model=config.LLM_MODEL,
-                    temperature=0.1,  # Low temperature for consistent analysis
-                    max_tokens=256
-                )
-                logger.info("LLM analyzer initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize LLM analyzer: {e}")
-                LLMAnalyzer._llm = None
-        
+        """Initialize the RoBERTa model (LLM calls go through the shared llm_client)."""
         # Initialize RoBERTa for sentiment analysis
         if LLMAnalyzer._sentiment_model is None:
             logger.info("Initializing RoBERTa sentiment model")
@@ -105,17 +93,44 @@ class LLMAnalyzer:
             'confidence': 0.5
         }
         
-        # Step 1: RoBERTa sentiment analysis
-        sentiment_result = self._analyze_sentiment_roberta(message)
+        # RoBERTa sentiment (worker thread) and LLM intent (async Groq call)
+        # are independent, so run them concurrently; each branch falls back
+        # to its default if it exceeds its timeout.
+        sentiment_result, intent_result = await asyncio.gather(
+            self._with_timeout(
+                asyncio.to_thread(self._analyze_sentiment_roberta, message),
+                config.SENTIMENT_TIMEOUT_SECONDS,
+                self._get_default_sentiment,
+                "RoBERTa sentiment"
+            ),
+            self._with_timeout(
+                self._analyze_intent(message),
+                config.INTENT_TIMEOUT_SECONDS,
+                self._get_default_intent,
+                "LLM intent"
+            ),
+        )
         result.update(sentiment_result)
-        
-        # Step 2: LLM intent analysis (softcoded - no hardcoded patterns)
-        intent_result = await self._analyze_intent_llm(message)
         result.update(intent_result)
         
         logger.info(f"Analysis: sentiment={result['sentiment']}, intent={result['intent']}, needs_context={result['needs_context']}")
         return result
     
+    async def _with_timeout(
+        self,
+        awaitable: Awaitable[Dict[str, any]],
+        timeout: float,
+        default,
+        branch: str
+    ) -> Dict[str, any]:
+        """Await one analysis branch, returning default() if it takes too long."""
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{branch} analysis timed out after {timeout}s, using default")
+            metrics.FALLBACKS.inc(stage=f"{branch.split()[-1]}_timeout")
+            return default()
+    
     def _analyze_sentiment_roberta(self, message: str) -> Dict[str, any]:
         """
         Analyze sentiment using RoBERTa model.
@@ -128,11 +143,12 @@ class LLMAnalyzer:
             Dict with 'sentiment' and 'sentiment_score'
         """
         if LLMAnalyzer._sentiment_model is None:
-            return {'sentiment': 'neutral', 'sentiment_score': 0.5}
+            return self._get_default_sentiment()
         
         try:
             # Truncate to model's max length
-            results = LLMAnalyzer._sentiment_model(message[:512])
+            with metrics.timer(metrics.MODEL_SECONDS, call="roberta_sentiment"):
+                results = LLMAnalyzer._sentiment_model(message[:512])
             
             if results and results[0]:
                 # Find the highest scoring sentiment
@@ -160,7 +176,47 @@ class LLMAnalyzer:
         except Exception as e:
             logger.error(f"RoBERTa sentiment analysis error: {e}")
         
-        return {'sentiment': 'neutral', 'sentiment_score': 0.5}
+        return self._get_default_sentiment()
+    
+    async def _analyze_intent(self, message: str) -> Dict[str, any]:
+        """
+        Analyze intent, trying the local embedding classifier first.
+        Confident fast-path matches skip the LLM; ambiguous messages are
+        sent to the LLM and its label is used to track classifier accuracy.
+        
+        Args:
+            message: Text to analyze
+            
+        Returns:
+            Dict with intent analysis results
+        """
+        if not config.ENABLE_INTENT_FASTPATH:
+            return await self._analyze_intent_llm(message)
+        
+        try:
+            prediction = await intent_classifier.classify(message)
+        except Exception as e:
+            logger.error(f"Intent fast path error: {e}")
+            return await self._analyze_intent_llm(message)
+        
+        if prediction['confident']:
+            logger.info(f"Intent fast path: {prediction['intent']} (score={prediction['score']:.3f})")
+            if intent_classifier.should_shadow():
+                task = asyncio.create_task(self._shadow_intent(message, prediction))
+                LLMAnalyzer._shadow_tasks.add(task)
+                task.add_done_callback(LLMAnalyzer._shadow_tasks.discard)
+            return intent_classifier.to_analysis(prediction)
+        
+        analysis = await self._analyze_intent_llm(message)
+        if analysis.get('intent_source') == 'llm':
+            intent_classifier.record(prediction, analysis)
+        return analysis
+    
+    async def _shadow_intent(self, message: str, prediction: Dict[str, any]):
+        """Ask the LLM about a fast-path hit in the background, for accuracy stats."""
+        analysis = await self._analyze_intent_llm(message)
+        if analysis.get('intent_source') == 'llm':
+            intent_classifier.record(prediction, analysis)
     
     async def _analyze_intent_llm(self, message: str) -> Dict[str, any]:
         """
@@ -173,9 +229,6 @@ class LLMAnalyzer:
         Returns:
             Dict with intent analysis results
         """
-        if LLMAnalyzer._llm is None:
-            return self._get_default_intent()
-        
         try:
             analysis_prompt = """You are an intelligent message analyzer for a business website chatbot (NexGenTeck - a tech company).
 
@@ -207,16 +260,22 @@ Respond ONLY with valid JSON in this exact format:
     "contact_data": null or {"name": "...", "email": "...", "phone": "...", "project": "..."}
 }"""
             
-            response = LLMAnalyzer._llm.invoke([
-                SystemMessage(content=analysis_prompt),
-                HumanMessage(content=f"Analyze this message: \"{message}\"")
-            ])
+            response = await llm_client.chat(
+                [
+                    {"role": "system", "content": analysis_prompt},
+                    {"role": "user", "content": f"Analyze this message: \"{message}\""}
+                ],
+                temperature=0.1,  # Low temperature for consistent analysis
+                max_tokens=256,
+                purpose="intent"
+            )
             
             # Parse JSON response
-            return self._parse_intent_response(response.content)
+            return self._parse_intent_response(response)
             
         except Exception as e:
             logger.error(f"LLM intent analysis error: {e}")
+            metrics.FALLBACKS.inc(stage="intent")
             return self._get_default_intent()
     
     def _parse_intent_response(self, response: str) -> Dict[str, any]:
@@ -237,13 +296,18 @@ Respond ONLY with valid JSON in this exact format:
                 "intent": result.get("intent", "general"),
                 "needs_context": result.get("needs_context", True),
                 "context_topics": result.get("context_topics", []),
-                "confidence": 0.9
+                "confidence": 0.9,
+                "intent_source": "llm"
             }
             
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to parse LLM response as JSON: {e}")
             return self._get_default_intent()
     
+    def _get_default_sentiment(self) -> Dict[str, any]:
+        """Return neutral sentiment when RoBERTa is unavailable or too slow."""
+        return {'sentiment': 'neutral', 'sentiment_score': 0.5}
+    
     def _get_default_intent(self) -> Dict[str, any]:
         """Return default intent when LLM fails."""
         return {
@@ -251,7 +315,8 @@ Respond ONLY with valid JSON in this exact format:
             "intent": "general",
             "needs_context": True,
             "context_topics": [],
-            "confidence": 0.5
+            "confidence": 0.5,
+            "intent_source": "default"
         }
     
     def should_retrieve_context(self, analysis: Dict) -> bool:
@@ -266,6 +331,11 @@ Respond ONLY with valid JSON in this exact format:
             return f"{message} {' '.join(topics)}"
         
         return message
+    
+    @property
+    def sentiment_model_loaded(self) -> bool:
+        """True if the RoBERTa sentiment model is loaded."""
+        return LLMAnalyzer._sentiment_model is not None
 
 
 # Singleton instance
@@ -0,0 +1,184 @@
+"""
+On-disk snapshots of the vector index for the NexGenTeck AI Chatbot.
+
+With an in-memory backend (QDRANT_URL=:memory: or VECTOR_BACKEND=numpy) the
+index is lost on every restart. After each successful build VectorStore
+saves the active collection under CACHE_DIR/index:
+
+    manifest.json          - embedding model, backend and quantization,
+                             dimension, point count, build time and the
+                             names of the two data files
+    vectors-<build>.f32    - row-major float32 matrix (count x dimension),
+                             opened with np.memmap on startup
+    payloads-<build>.json  - point ids and payloads, in row order
+
+The data files are written first and the manifest is replaced atomically
+last, so a crash mid-save leaves the previous snapshot intact. A snapshot
+built with another embedding model, backend or quantization (their vectors
+are not interchangeable), or whose files don't match its manifest, is
+refused and the index is rebuilt as usual.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the file layout changes; older snapshots are refused
+SNAPSHOT_FORMAT = 2
+
+
+class IndexSnapshot:
+    """The latest saved index in one directory."""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Directory holding the manifest and data files
+        """
+        self.directory = directory
+        self._manifest_path = os.path.join(directory, "manifest.json")
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self._manifest_path)
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Index snapshot manifest unreadable: {e}")
+            return None
+
+    def save(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict],
+        model: str,
+        backend: str = "torch",
+        quantization: Optional[str] = None
+    ) -> Dict:
+        """
+        Write a snapshot, replacing the previous one.
+
+        Args:
+            ids: Point ids, in row order
+            vectors: (len(ids), dim) normalized vectors
+            payloads: Point payloads, in row order
+            model: Embedding model the vectors come from
+            backend: Embedding backend (EMBEDDING_BACKEND) that produced them
+            quantization: Quantization of that backend, if any
+
+        Returns:
+            The new manifest
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        build = time.time_ns()
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "model": model,
+            "backend": backend,
+            "quantization": quantization,
+            "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+            "count": len(ids),
+            "built_at": build / 1e9,
+            "vectors": f"vectors-{build}.f32",
+            "payloads": f"payloads-{build}.json",
+        }
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            vectors.tofile(os.path.join(self.directory, manifest["vectors"]))
+            with open(os.path.join(self.directory, manifest["payloads"]), "w", encoding="utf-8") as f:
+                json.dump({"ids": ids, "payloads": payloads}, f, ensure_ascii=False, separators=(",", ":"))
+
+            tmp_path = f"{self._manifest_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, self._manifest_path)
+            self._remove_data_files(keep=(manifest["vectors"], manifest["payloads"]))
+        logger.info(f"Saved index snapshot: {len(ids)} documents ({vectors.nbytes / 2**20:.1f} MiB of vectors)")
+        return manifest
+
+    def load(
+        self,
+        model: str,
+        backend: str = "torch",
+        quantization: Optional[str] = None
+    ) -> Optional[Tuple[Dict, List[str], np.ndarray, List[Dict]]]:
+        """
+        Open the snapshot if it was built with `model` on `backend` with
+        `quantization`.
+
+        The vectors are memory-mapped copy-on-write: nothing is read until
+        it is searched, and writes to the array never reach the file.
+
+        Returns:
+            (manifest, ids, vectors, payloads), or None if there is no
+            usable snapshot
+        """
+        with self._lock:
+            manifest = self._read_manifest()
+            if manifest is None:
+                return None
+            if manifest.get("format") != SNAPSHOT_FORMAT:
+                logger.warning(f"Ignoring index snapshot in format {manifest.get('format')}")
+                return None
+            if manifest.get("model") != model:
+                logger.warning(
+                    f"Ignoring index snapshot built with {manifest.get('model')}, "
+                    f"the embedding model is now {model}"
+                )
+                return None
+            built_with = (manifest.get("backend"), manifest.get("quantization"))
+            if built_with != (backend, quantization):
+                logger.warning(
+                    f"Ignoring index snapshot built with the {built_with[0]} backend "
+                    f"(quantization {built_with[1]}), the embedding backend is now "
+                    f"{backend} (quantization {quantization})"
+                )
+                return None
+
+            try:
+                count, dim = int(manifest["count"]), int(manifest["dim"])
+                vectors_path = os.path.join(self.directory, manifest["vectors"])
+                if count == 0 or os.path.getsize(vectors_path) != count * dim * 4:
+                    raise ValueError("vector file does not match the manifest")
+                with open(os.path.join(self.directory, manifest["payloads"]), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                ids, payloads = data["ids"], data["payloads"]
+                if len(ids) != count or len(payloads) != count:
+                    raise ValueError("payload file does not match the manifest")
+                vectors = np.memmap(vectors_path, dtype=np.float32, mode="c", shape=(count, dim))
+            except (OSError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable index snapshot: {e}")
+                return None
+        return manifest, ids, vectors, payloads
+
+    def remove(self):
+        """Delete the snapshot."""
+        with self._lock:
+            try:
+                os.remove(self._manifest_path)
+            except FileNotFoundError:
+                pass
+            self._remove_data_files(keep=())
+
+    def _remove_data_files(self, keep: Tuple[str, ...]):
+        """Delete data files of earlier snapshots."""
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+            if name.startswith(("vectors-", "payloads-")) and name not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError as e:
+                    # Still mapped by a restored collection (Windows); retried next save
+                    logger.debug(f"Could not remove old snapshot file {name}: {e}")
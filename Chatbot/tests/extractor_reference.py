@@ -0,0 +1,95 @@
+"""
+The previous BeautifulSoup page extractor and a set of synthetic pages,
+shared by the extractor tests and the extractor benchmark (benchmarks.py).
+"""
+
+from typing import Dict
+
+from bs4 import BeautifulSoup
+
+from scraper import PageContent
+from utils import clean_text
+
+
+def legacy_page_content(html: str) -> PageContent:
+    """
+    The previous BeautifulSoup extractor (one find_all pass per field),
+    kept as the reference the single-pass extractor must match.
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    for element in soup(['script', 'style', 'noscript', 'iframe']):
+        element.decompose()
+
+    title = soup.find('title')
+    meta_desc = soup.find('meta', {'name': 'description'})
+
+    headings = []
+    for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        text = clean_text(h.get_text())
+        if text and len(text) > 2:
+            headings.append(f"[{h.name.upper()}] {text}")
+
+    paragraphs = [clean_text(p.get_text()) for p in soup.find_all('p')]
+    list_items = [clean_text(li.get_text()) for li in soup.find_all('li')]
+
+    other_content = []
+    for elem in soup.find_all(['span', 'div', 'section', 'article']):
+        direct_text = elem.find(string=True, recursive=False)
+        if direct_text:
+            text = clean_text(str(direct_text))
+            if text and len(text) > 30:
+                other_content.append(text)
+
+    tables = []
+    for table in soup.find_all('table'):
+        rows = []
+        for tr in table.find_all('tr'):
+            cells = [clean_text(td.get_text()) for td in tr.find_all(['td', 'th'])]
+            if cells:
+                rows.append(' | '.join(cells))
+        if rows:
+            tables.append('\n'.join(rows))
+
+    return PageContent(
+        title=clean_text(title.get_text()) if title else "",
+        description=meta_desc.get('content', '') if meta_desc else '',
+        headings=headings,
+        paragraphs=[text for text in paragraphs if text and len(text) > 15],
+        list_items=[f"• {text}" for text in list_items if text and len(text) > 10],
+        other_content=other_content,
+        tables=tables,
+        hrefs=[link.get('href', '') for link in soup.find_all('a', href=True)],
+    )
+
+
+def synthetic_pages() -> Dict[str, str]:
+    """Pages exercising the extractor's edge cases, plus a large SPA-like DOM."""
+    cards = "".join(
+        f'<div class="card"><!-- card {i} --><span>Service card number {i} with a long enough description</span>'
+        f'<div>\n  <script>track({i})</script>Rendered text after a script in card {i} of the grid</div>'
+        f'<ul><li>Feature {i}a is included in this plan</li><li>Feature {i}b <b>bold</b> part two</li></ul>'
+        f'<a href="/services/{i}#top">More</a></div>'
+        for i in range(1500)
+    )
+    return {
+        "edge-cases": """<!DOCTYPE html><html><head><title> Edge   cases </title>
+            <meta name="description" content="  Raw, uncleaned   description ">
+            <style>p { color: red }</style><script>var x = "<p>not a paragraph</p>";</script></head>
+            <body><noscript><p>Enable JavaScript to use this site, please</p><a href="/nojs">x</a></noscript>
+            <h1>Main <span>heading</span></h1><h2>ab</h2><h3>Nested <h4>inner heading</h4></h3>
+            <p>Short one</p><p>A paragraph with <script>evil()</script>inline script removed from it.</p>
+            <ul><li>Top level item with <ul><li>a nested list item inside</li></ul></li></ul>
+            <div><!-- a comment that is long enough to be kept as direct text --><p>x</p></div>
+            <div>   <span>whitespace first, so this div is skipped entirely</span> trailing text here long</div>
+            <section>Section direct text that is comfortably over thirty characters</section>
+            <table><tr><th>Plan</th><th>Price</th></tr><tr><td>Basic</td><td>$10
+              <table><tr><td>inner</td><td>cell</td></tr></table></td></tr><tr></tr></table>
+            <iframe src="/frame"><p>frame fallback paragraph text here</p></iframe>
+            <svg><title>svg title</title></svg>
+            <a href="  /about  ">About</a><a href="mailto:x@y.z">Mail</a><a href="">Empty</a><a>No href</a>
+            <a href="https://elsewhere.example/page">Out</a><a href="/contact#form">Contact</a>
+            <p>Entities &amp; non&nbsp;breaking spaces &copy; are decoded here</p></body></html>""",
+        "no-title": "<html><body><div>Only a div with more than thirty characters of text</div></body></html>",
+        "empty": "",
+        "spa-grid": f"<html><head><title>Services</title></head><body><div id='root'>{cards}</div></body></html>",
+    }
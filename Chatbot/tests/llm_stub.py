@@ -0,0 +1,105 @@
+"""
+Stand-in for an OpenAI-compatible chat completions server, shared by the
+LLM client tests and the llm-client benchmark (benchmarks.py).
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class StandInLLMServer:
+    """
+    Local OpenAI-compatible /chat/completions server for exercising the LLM
+    client without calling Groq.
+
+    Every reply echoes the last user message. Latency has a configurable
+    slow tail and a fraction of requests fail with 429 or 503. The outcome
+    of the next requests can also be queued in `script`, in order: an HTTP
+    status to fail with (429 comes with Retry-After: `retry_after`) or
+    "slow" for a reply delayed by the tail latency.
+    """
+
+    def __init__(self, latency_ms: float = 20, tail_ms: float = 400,
+                 tail_rate: float = 0.05, error_rate: float = 0.0, seed: int = 0):
+        self.connections = set()
+        self.requests = 0
+        self.script = deque()
+        self.retry_after = "0.05"
+        rng = random.Random(seed)
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the request (e.g. a losing hedge)
+                    pass
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _chunk(self, data: str):
+                body = data.encode()
+                self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with lock:
+                    server.connections.add(self.client_address)
+                    server.requests += 1
+                    roll = rng.random()
+                    slow = rng.random() < tail_rate
+                    scripted = server.script.popleft() if server.script else None
+                if scripted == "slow":
+                    slow = True
+                elif scripted == 429 or (scripted is None and roll < error_rate / 2):
+                    return self._send(429, b'{"error": "rate limited"}', {"Retry-After": server.retry_after})
+                elif scripted is not None or roll < error_rate:
+                    return self._send(scripted or 503, b'{"error": "unavailable"}')
+
+                time.sleep((latency_ms + (tail_ms if slow else 0)) / 1000)
+                reply = f"echo: {payload['messages'][-1]['content']}"
+
+                if not payload.get("stream"):
+                    body = {"choices": [{"message": {"role": "assistant", "content": reply}}]}
+                    return self._send(200, json.dumps(body).encode(), {"Content-Type": "application/json"})
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for word in reply.split(" "):
+                    delta = {"choices": [{"delta": {"content": word + " "}}]}
+                    self._chunk(f"data: {json.dumps(delta)}\n\n")
+                self._chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def reset(self):
+        self.connections = set()
+        self.requests = 0
+        self.script.clear()
+
+    def close(self):
+        self.httpd.shutdown()
@@ -0,0 +1,58 @@
+"""
+Parity tests for the single-pass lxml page extractor against the previous
+BeautifulSoup extractor in extractor_reference.py.
+
+Run from the Chatbot directory:
+    python -m unittest discover -s tests
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASE_URL = "https://example.com/NGT/"
+
+
+@unittest.skipUnless(importlib.util.find_spec("bs4"), "beautifulsoup4 not installed")
+class ExtractorParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from extractor_reference import legacy_page_content, synthetic_pages
+
+        cls.legacy_page_content = staticmethod(legacy_page_content)
+        cls.pages = synthetic_pages()
+
+    def test_collect_page_content_matches_reference(self):
+        from scraper import collect_page_content
+
+        for name, html in self.pages.items():
+            expected = self.legacy_page_content(html)
+            actual = collect_page_content(html)
+            for field in expected._fields:
+                with self.subTest(page=name, field=field):
+                    self.assertEqual(getattr(actual, field), getattr(expected, field))
+
+    def test_extract_page_matches_reference(self):
+        from scraper import WebsiteScraper, extract_page, resolve_links
+
+        for name, html in self.pages.items():
+            url = BASE_URL + name
+            expected = self.legacy_page_content(html)
+            documents, links = extract_page(html, url, BASE_URL)
+            with self.subTest(page=name):
+                self.assertEqual(documents, WebsiteScraper._extract_all_content(expected, url))
+                self.assertEqual(links, resolve_links(expected.hrefs, BASE_URL))
+
+    def test_edge_case_links(self):
+        from scraper import extract_page
+
+        _, links = extract_page(self.pages["edge-cases"], BASE_URL + "edge-cases", BASE_URL)
+        self.assertEqual(links, ["https://example.com/NGT/about", "https://example.com/NGT/contact"])
+
+
+if __name__ == "__main__":
+    unittest.main()
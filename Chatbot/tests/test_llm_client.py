@@ -0,0 +1,128 @@
+"""
+Tests for the shared LLM client, against the local stand-in server in
+llm_stub.py (no network access or API key needed).
+
+Run from the Chatbot directory:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_stub import StandInLLMServer  # noqa: E402
+from config import config  # noqa: E402
+from llm_client import HEDGE_MIN_SAMPLES, LLMClient, LLMError  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "What services do you offer?"}]
+
+
+class LLMClientTest(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInLLMServer(latency_ms=5, tail_ms=1000, tail_rate=0.0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def setUp(self):
+        self.server.reset()
+        self.server.retry_after = "0.05"
+        # Backoff without Retry-After is then at most a few milliseconds
+        self._retry_base = config.LLM_RETRY_BASE_SECONDS
+        config.LLM_RETRY_BASE_SECONDS = 0.001
+
+    async def asyncTearDown(self):
+        config.LLM_RETRY_BASE_SECONDS = self._retry_base
+        await self.client.aclose()
+
+    def _client(self, **kwargs) -> LLMClient:
+        options = {"max_retries": 2, "hedge_percentile": 0, "max_concurrency": 4}
+        options.update(kwargs)
+        self.client = LLMClient(base_url=self.server.url, api_key="test", model="stand-in", **options)
+        return self.client
+
+    async def test_chat_returns_completion(self):
+        client = self._client()
+        reply = await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertEqual(reply, "echo: What services do you offer?")
+        self.assertEqual((client.requests, client.retries, client.failures), (1, 0, 0))
+
+    async def test_retries_rate_limit_and_server_errors(self):
+        client = self._client()
+        self.server.script.extend([429, 503])
+        reply = await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertEqual(reply, "echo: What services do you offer?")
+        self.assertEqual(client.retries, 2)
+        self.assertEqual(self.server.requests, 3)
+
+    async def test_gives_up_after_max_retries(self):
+        client = self._client(max_retries=1)
+        self.server.script.extend([502, 500])
+        with self.assertRaises(LLMError) as raised:
+            await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertEqual(raised.exception.status_code, 500)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(client.failures, 1)
+
+    async def test_client_errors_are_not_retried(self):
+        client = self._client()
+        self.server.script.append(400)
+        with self.assertRaises(LLMError) as raised:
+            await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertEqual(raised.exception.status_code, 400)
+        self.assertEqual((client.retries, self.server.requests), (0, 1))
+
+    async def test_honours_retry_after(self):
+        client = self._client()
+        self.server.retry_after = "0.3"
+        self.server.script.append(429)
+        started = time.perf_counter()
+        await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.3)
+        self.assertEqual(client.retries, 1)
+
+    async def test_hedges_only_after_min_samples(self):
+        client = self._client(hedge_percentile=50)
+        for _ in range(HEDGE_MIN_SAMPLES - 1):
+            await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertIsNone(client._hedge_delay())
+
+        # Still too few samples: a slow request is simply waited for
+        self.server.script.append("slow")
+        started = time.perf_counter()
+        await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertGreaterEqual(time.perf_counter() - started, 1.0)
+        self.assertEqual(client.hedged, 0)
+
+        # From HEDGE_MIN_SAMPLES on, a backup request overtakes the slow one
+        self.assertIsNotNone(client._hedge_delay())
+        self.server.script.append("slow")
+        requests = self.server.requests
+        started = time.perf_counter()
+        reply = await client.chat(MESSAGES, temperature=0, max_tokens=16)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(reply, "echo: What services do you offer?")
+        self.assertEqual((client.hedged, client.hedge_wins), (1, 1))
+        self.assertEqual(self.server.requests, requests + 2)
+
+    async def test_stream_parses_server_sent_events(self):
+        client = self._client()
+        fragments = [text async for text in client.stream(MESSAGES, temperature=0, max_tokens=16)]
+        self.assertEqual(fragments, ["echo: ", "What ", "services ", "do ", "you ", "offer? "])
+
+    async def test_stream_retries_before_first_token(self):
+        client = self._client()
+        self.server.script.append(503)
+        fragments = [text async for text in client.stream(MESSAGES, temperature=0, max_tokens=16)]
+        self.assertEqual("".join(fragments), "echo: What services do you offer? ")
+        self.assertEqual((client.retries, self.server.requests), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
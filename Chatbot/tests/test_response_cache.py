@@ -0,0 +1,75 @@
+"""
+Tests for the semantic response cache's lead-intent handling.
+
+Embeddings and intent predictions are stubbed, but importing the cache
+still needs the embedding stack (sentence-transformers) installed.
+
+Run from the Chatbot directory:
+    python -m unittest discover -s tests
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUESTION = "What web services do you offer?"
+LEAD = "I'd like to hire you for a website, here's my email: jane@example.com"
+ANSWER = "We build websites, mobile apps and AI chatbots."
+
+
+@unittest.skipUnless(importlib.util.find_spec("sentence_transformers"), "embedding stack not installed")
+class ResponseCacheLeadIntentTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        import response_cache
+        from config import config
+        from intent_classifier import intent_classifier
+
+        self.config = config
+        self.cache = response_cache.ResponseCache(max_entries=8, ttl_seconds=60, threshold=0.9)
+
+        # Every message embeds to the same vector, so any two are a semantic match
+        embed = mock.patch.object(response_cache.query_batcher, "embed", mock.AsyncMock(return_value=[1.0, 0.0, 0.0]))
+        classify = mock.patch.object(intent_classifier, "classify", mock.AsyncMock(side_effect=self._classify))
+        for patcher in (embed, classify):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    async def _classify(message, count=True):
+        intent = "hire" if message == LEAD else "question"
+        return {"intent": intent, "score": 0.9, "margin": 0.2, "confident": True}
+
+    async def _cache_answer(self):
+        lookup = await self.cache.lookup(QUESTION)
+        self.assertIsNone(lookup.response)
+        self.cache.store(lookup, ANSWER, {"intent": "question", "is_lead_intent": False})
+
+    async def test_similar_question_is_served_from_cache(self):
+        await self._cache_answer()
+        lookup = await self.cache.lookup("what web services do you provide")
+        self.assertEqual(lookup.response, ANSWER)
+
+    async def test_lead_message_is_not_served_from_cache(self):
+        await self._cache_answer()
+        lookup = await self.cache.lookup(LEAD)
+        self.assertIsNone(lookup.response)
+        self.assertEqual(self.cache.bypassed_lead, 1)
+
+        # Nor is its answer stored
+        self.cache.store(lookup, "Thanks, our team will email you.", {"intent": "hire", "is_lead_intent": True})
+        self.assertEqual(self.cache.stores, 1)
+
+    async def test_lead_message_uses_cache_when_skip_is_off(self):
+        await self._cache_answer()
+        with mock.patch.object(self.config, "RESPONSE_CACHE_SKIP_LEAD_INTENT", False):
+            lookup = await self.cache.lookup(LEAD)
+        self.assertEqual(lookup.response, ANSWER)
+
+
+if __name__ == "__main__":
+    unittest.main()
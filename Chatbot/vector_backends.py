@@ -0,0 +1,474 @@
+"""
+Storage backends behind VectorStore.
+
+Two interchangeable backends implement the same small collection API:
+
+- QdrantBackend: qdrant-client, either against an external Qdrant server
+  or qdrant-client's pure-Python ":memory:" local mode.
+- NumpyBackend: exact cosine search over one contiguous, normalized
+  float32 matrix per collection. Top-k is a single matmul followed by
+  argpartition, which is much faster than Qdrant's local mode for the few
+  thousand chunks the website scraper produces.
+
+Select with VECTOR_BACKEND=qdrant|numpy.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Distance,
+    PointIdsList,
+    PointStruct,
+    VectorParams,
+)
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class SearchHit(NamedTuple):
+    """A single search result: point id, cosine similarity and payload."""
+    id: str
+    score: float
+    payload: Dict
+
+
+class QdrantBackend:
+    """
+    Collection storage backed by a Qdrant client.
+
+    Writes and admin calls use the blocking client. For an external server,
+    searches can also go through one shared AsyncQdrantClient (a pooled
+    HTTP or gRPC connection) so the event loop never waits on the network.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        in_memory: bool,
+        async_client: Optional[AsyncQdrantClient] = None
+    ):
+        """
+        Args:
+            client: Connected Qdrant client
+            in_memory: True if the client runs qdrant-client's local mode
+            async_client: Async client for the same server (None in local mode,
+                where an async client would have its own separate storage)
+        """
+        self.client = client
+        self.in_memory = in_memory
+        self.async_client = async_client
+
+    def create_collection(self, name: str, dim: int):
+        """Create a cosine collection with the given vector dimension."""
+        self.client.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+        )
+
+    def delete_collection(self, name: str):
+        """Delete a collection and all of its points."""
+        self.client.delete_collection(name)
+
+    def collection_exists(self, name: str) -> bool:
+        """True if a concrete collection (not an alias) has this name."""
+        return name in self.list_collections()
+
+    def list_collections(self) -> List[str]:
+        """Names of all concrete collections."""
+        return [c.name for c in self.client.get_collections().collections]
+
+    def get_alias(self, alias: str) -> Optional[str]:
+        """Collection an alias points to, or None if the alias doesn't exist."""
+        for description in self.client.get_aliases().aliases:
+            if description.alias_name == alias:
+                return description.collection_name
+        return None
+
+    def set_alias(self, alias: str, name: str):
+        """Point an alias at a collection in a single atomic alias update."""
+        operations = []
+        if self.get_alias(alias) is not None:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+        operations.append(
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=name, alias_name=alias))
+        )
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+
+    def upsert(
+        self,
+        name: str,
+        ids: List[str],
+        vectors: List[List[float]],
+        payloads: List[Dict],
+        wait: bool = True
+    ):
+        """
+        Insert or overwrite points.
+
+        With wait=False the call returns once Qdrant has queued the write.
+        Writes to a collection are applied in order, so a later wait=True
+        write (or delete) also waits for the earlier ones.
+        """
+        points = [
+            PointStruct(id=point_id, vector=vector, payload=payload)
+            for point_id, vector, payload in zip(ids, vectors, payloads)
+        ]
+        self.client.upsert(collection_name=name, points=points, wait=wait)
+
+    def delete(self, name: str, ids: List[str]):
+        """Delete points by id."""
+        if ids:
+            self.client.delete(collection_name=name, points_selector=PointIdsList(points=ids))
+
+    def set_payload(self, name: str, ids: List[str], payload: Dict, wait: bool = True):
+        """Set payload keys of existing points (vectors untouched); keys set to None are removed."""
+        if not ids:
+            return
+        values = {key: value for key, value in payload.items() if value is not None}
+        removed = [key for key, value in payload.items() if value is None]
+        if values:
+            self.client.set_payload(collection_name=name, payload=values, points=ids, wait=wait)
+        if removed:
+            self.client.delete_payload(collection_name=name, keys=removed, points=ids, wait=wait)
+
+    def list_ids(self, name: str) -> List[str]:
+        """Ids of every point in a collection."""
+        return list(self.list_payload_values(name, None))
+
+    def list_payload_values(self, name: str, key: Optional[str]) -> Dict[str, object]:
+        """Every point id of a collection, mapped to one payload value (None if unset or no key)."""
+        values = {}
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=name,
+                limit=1000,
+                offset=offset,
+                with_payload=[key] if key else False,
+                with_vectors=False
+            )
+            for record in records:
+                values[str(record.id)] = (record.payload or {}).get(key) if key else None
+            if offset is None:
+                return values
+
+    def export(self, name: str) -> Tuple[List[str], np.ndarray, List[Dict]]:
+        """Every point of a collection as (ids, (n, dim) float32 vectors, payloads)."""
+        ids, vectors, payloads = [], [], []
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=name,
+                limit=1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            for record in records:
+                ids.append(str(record.id))
+                vectors.append(record.vector)
+                payloads.append(record.payload or {})
+            if offset is None:
+                return ids, np.asarray(vectors, dtype=np.float32), payloads
+
+    def load_collection(self, name: str, ids: List[str], vectors: np.ndarray, payloads: List[Dict]):
+        """Create a collection holding the given points (e.g. from a snapshot)."""
+        self.create_collection(name, int(vectors.shape[1]))
+        for start in range(0, len(ids), 1000):
+            self.upsert(
+                name,
+                ids[start:start + 1000],
+                vectors[start:start + 1000].tolist(),
+                payloads[start:start + 1000]
+            )
+
+    def search(self, name: str, vector: List[float], limit: int) -> List[SearchHit]:
+        """Return the top `limit` points by cosine similarity."""
+        results = self.client.search(
+            collection_name=name,
+            query_vector=vector,
+            limit=limit
+        )
+        return [SearchHit(str(hit.id), hit.score, hit.payload or {}) for hit in results]
+
+    async def asearch(self, name: str, vector: List[float], limit: int) -> List[SearchHit]:
+        """Async search: native async client if available, else a worker thread."""
+        if self.async_client is None:
+            return await asyncio.to_thread(self.search, name, vector, limit)
+        results = await self.async_client.search(
+            collection_name=name,
+            query_vector=vector,
+            limit=limit
+        )
+        return [SearchHit(str(hit.id), hit.score, hit.payload or {}) for hit in results]
+
+    def count(self, name: str) -> int:
+        """Number of points in a collection."""
+        return self.client.get_collection(name).points_count
+
+    async def aclose(self):
+        """Close the pooled async connection."""
+        if self.async_client is not None:
+            await self.async_client.close()
+
+
+class _NumpyCollection:
+    """Row-major storage for one NumpyBackend collection."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        # Rows [0, size) are live; capacity grows geometrically on insert
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.size = 0
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.payloads: List[Dict] = []
+
+    def _reserve(self, needed: int):
+        """Grow the matrix so it can hold `needed` rows."""
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        grown = np.zeros((max(needed, capacity * 2, 64), self.dim), dtype=np.float32)
+        grown[:self.size] = self.matrix[:self.size]
+        self.matrix = grown
+
+
+class NumpyBackend:
+    """Exact in-process cosine search over normalized float32 matrices."""
+
+    in_memory = True
+    client = None
+
+    def __init__(self):
+        self._collections: Dict[str, _NumpyCollection] = {}
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str) -> _NumpyCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            raise KeyError(f"Collection '{name}' not found")
+        return collection
+
+    def create_collection(self, name: str, dim: int):
+        """Create an empty collection; fails if it already exists."""
+        with self._lock:
+            if name in self._collections:
+                raise ValueError(f"Collection '{name}' already exists")
+            self._collections[name] = _NumpyCollection(dim)
+
+    def delete_collection(self, name: str):
+        """Delete a collection, its points and any aliases pointing at it."""
+        with self._lock:
+            self._collections.pop(name, None)
+            for alias in [a for a, target in self._aliases.items() if target == name]:
+                del self._aliases[alias]
+
+    def collection_exists(self, name: str) -> bool:
+        """True if a concrete collection (not an alias) has this name."""
+        with self._lock:
+            return name in self._collections
+
+    def list_collections(self) -> List[str]:
+        """Names of all concrete collections."""
+        with self._lock:
+            return list(self._collections)
+
+    def get_alias(self, alias: str) -> Optional[str]:
+        """Collection an alias points to, or None if the alias doesn't exist."""
+        with self._lock:
+            return self._aliases.get(alias)
+
+    def set_alias(self, alias: str, name: str):
+        """Point an alias at a collection."""
+        with self._lock:
+            self._get(name)
+            self._aliases[alias] = name
+
+    def upsert(
+        self,
+        name: str,
+        ids: List[str],
+        vectors: List[List[float]],
+        payloads: List[Dict],
+        wait: bool = True
+    ):
+        """
+        Insert or overwrite points. Vectors are L2-normalized on the way in.
+        Writes are always applied immediately; `wait` is accepted for
+        interface parity with QdrantBackend.
+        """
+        if not ids:
+            return
+        block = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block = block / np.maximum(norms, 1e-12)
+
+        with self._lock:
+            collection = self._get(name)
+            collection._reserve(collection.size + len(ids))
+            for point_id, vector, payload in zip(ids, block, payloads):
+                row = collection.rows.get(point_id)
+                if row is None:
+                    row = collection.size
+                    collection.size += 1
+                    collection.rows[point_id] = row
+                    collection.ids.append(point_id)
+                    collection.payloads.append(payload)
+                else:
+                    collection.payloads[row] = payload
+                collection.matrix[row] = vector
+
+    def delete(self, name: str, ids: List[str]):
+        """Delete points by id, moving the last row into each freed slot."""
+        with self._lock:
+            collection = self._get(name)
+            for point_id in ids:
+                row = collection.rows.pop(point_id, None)
+                if row is None:
+                    continue
+                last = collection.size - 1
+                if row != last:
+                    moved_id = collection.ids[last]
+                    collection.matrix[row] = collection.matrix[last]
+                    collection.ids[row] = moved_id
+                    collection.payloads[row] = collection.payloads[last]
+                    collection.rows[moved_id] = row
+                collection.ids.pop()
+                collection.payloads.pop()
+                collection.size = last
+
+    def set_payload(self, name: str, ids: List[str], payload: Dict, wait: bool = True):
+        """Set payload keys of existing points (vectors untouched); keys set to None are removed."""
+        with self._lock:
+            collection = self._get(name)
+            for point_id in ids:
+                row = collection.rows.get(point_id)
+                if row is None:
+                    continue
+                # Replaced, not mutated: search hits already handed out keep their payload
+                updated = {**collection.payloads[row], **payload}
+                collection.payloads[row] = {key: value for key, value in updated.items() if value is not None}
+
+    def list_ids(self, name: str) -> List[str]:
+        """Ids of every point in a collection."""
+        with self._lock:
+            return list(self._get(name).ids)
+
+    def list_payload_values(self, name: str, key: Optional[str]) -> Dict[str, object]:
+        """Every point id of a collection, mapped to one payload value (None if unset or no key)."""
+        with self._lock:
+            collection = self._get(name)
+            return {
+                point_id: payload.get(key) if key else None
+                for point_id, payload in zip(collection.ids, collection.payloads)
+            }
+
+    def export(self, name: str) -> Tuple[List[str], np.ndarray, List[Dict]]:
+        """Every point of a collection as (ids, (n, dim) float32 vectors, payloads)."""
+        with self._lock:
+            collection = self._get(name)
+            return list(collection.ids), collection.matrix[:collection.size].copy(), list(collection.payloads)
+
+    def load_collection(self, name: str, ids: List[str], vectors: np.ndarray, payloads: List[Dict]):
+        """
+        Create a collection holding the given points (e.g. from a snapshot).
+        The vectors must already be normalized. The array is used as is, so
+        a memory-mapped one is paged in by the first search, not at startup.
+        """
+        collection = _NumpyCollection(int(vectors.shape[1]))
+        collection.matrix = vectors
+        collection.size = len(ids)
+        collection.ids = list(ids)
+        collection.rows = {point_id: row for row, point_id in enumerate(collection.ids)}
+        collection.payloads = list(payloads)
+        with self._lock:
+            if name in self._collections:
+                raise ValueError(f"Collection '{name}' already exists")
+            self._collections[name] = collection
+
+    def search(self, name: str, vector: List[float], limit: int) -> List[SearchHit]:
+        """Return the top `limit` points by cosine similarity."""
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        with self._lock:
+            collection = self._get(name)
+            size = collection.size
+            if size == 0 or limit <= 0:
+                return []
+            scores = collection.matrix[:size] @ query
+
+            k = min(limit, size)
+            if k < size:
+                top = np.argpartition(scores, size - k)[size - k:]
+            else:
+                top = np.arange(size)
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                SearchHit(collection.ids[row], float(scores[row]), collection.payloads[row])
+                for row in top
+            ]
+
+    async def asearch(self, name: str, vector: List[float], limit: int) -> List[SearchHit]:
+        """Async search; a single matmul is cheap enough to run inline."""
+        return self.search(name, vector, limit)
+
+    def count(self, name: str) -> int:
+        """Number of points in a collection."""
+        with self._lock:
+            return self._get(name).size
+
+    async def aclose(self):
+        """Nothing to release for the in-process backend."""
+
+
+def create_backend():
+    """
+    Build the storage backend selected by VECTOR_BACKEND / QDRANT_URL.
+
+    Returns:
+        QdrantBackend or NumpyBackend
+    """
+    if config.VECTOR_BACKEND == "numpy":
+        logger.info("Initializing NumPy exact-search vector backend (in-memory)")
+        return NumpyBackend()
+
+    qdrant_url = config.QDRANT_URL
+    if qdrant_url == ":memory:" or not qdrant_url:
+        # Use in-memory Qdrant - no external server needed
+        logger.info("Initializing Qdrant (in-memory mode)")
+        return QdrantBackend(QdrantClient(":memory:"), in_memory=True)
+
+    # Connect to external Qdrant server (self-hosted open source)
+    logger.info(f"Connecting to external Qdrant server at {qdrant_url}")
+    try:
+        connection = {
+            "url": qdrant_url,
+            "prefer_grpc": config.QDRANT_PREFER_GRPC,
+            "grpc_port": config.QDRANT_GRPC_PORT,
+        }
+        client = QdrantClient(**connection)
+        async_client = AsyncQdrantClient(**connection)
+        logger.info(
+            "Connected to external Qdrant server successfully "
+            f"({'gRPC' if config.QDRANT_PREFER_GRPC else 'REST'})"
+        )
+        return QdrantBackend(client, in_memory=False, async_client=async_client)
+    except Exception as e:
+        logger.error(f"Failed to connect to Qdrant server: {e}")
+        logger.info("Falling back to in-memory mode")
+        return QdrantBackend(QdrantClient(":memory:"), in_memory=True)
@@ -1,28 +1,235 @@
 """
 Vector store manager using Qdrant.
 Handles storage and retrieval of document embeddings.
-Uses in-memory Qdrant for simplicity (no external server needed).
+Uses in-memory Qdrant for simplicity (no external server needed),
+or the NumPy exact-search backend when VECTOR_BACKEND=numpy.
 """
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from typing import List, Dict, Tuple
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Optional, Set, Tuple
+import hashlib
 import logging
+import os
+import threading
+import time
 import uuid
 
 from config import config
-from embeddings import embedding_manager
+from embeddings import embedding_manager, embedding_quantization, query_batcher
+from snapshot import IndexSnapshot
+from vector_backends import create_backend
 
 logger = logging.getLogger(__name__)
 
+# Chunks embedded and upserted per step while indexing; progress is
+# reported (and cancellation checked) between steps
+INDEX_BATCH_SIZE = 128
+
+# Indexing progress callback: (phase, chunks_done, chunks_total) -> True to stop
+IndexProgress = Callable[[str, int, int], bool]
+
+
+class IndexingCancelled(Exception):
+    """Raised when an indexing progress callback asks to stop."""
+
+
+def document_id(document: Dict[str, str]) -> str:
+    """
+    Deterministic point id for a chunk.
+    Derived from (source URL, chunk_index, content hash), so an unchanged
+    chunk keeps its id across crawls and can be skipped on reindex. The
+    pages sharing a deduplicated chunk ('shared_by') are not part of it:
+    when they change, IndexWriter updates the payload in place.
+    
+    Args:
+        document: Dict with 'content' and 'metadata' keys
+        
+    Returns:
+        UUID string usable as a Qdrant point id
+    """
+    metadata = document.get('metadata', {})
+    content_hash = hashlib.sha256(document['content'].encode('utf-8')).hexdigest()
+    key = f"{metadata.get('source', '')}#{metadata.get('chunk_index', 0)}#{content_hash}"
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+
+
+class IndexWriter:
+    """
+    One write into the vector store, fed in batches (see VectorStore.writer).
+    
+    A full write fills a new versioned collection that commit() activates
+    (blue/green). An incremental write goes to the live collection: chunks
+    whose id already exists are skipped, and commit() deletes the chunks
+    that were not part of this write.
+    
+    A chunk's 'shared_by' pages are payload only. Where they differ from
+    what the collection holds, commit() updates the payload without
+    re-embedding the chunk.
+    """
+    
+    def __init__(self, store: "VectorStore", full: bool):
+        self.store = store
+        self.full = full
+        if full:
+            self.collection = store._new_collection_name()
+            store._create_collection(self.collection)
+            self._existing: Set[str] = set()
+            self._stored_shares: Dict[str, Tuple[str, ...]] = {}
+        else:
+            self.collection = VectorStore._active_collection
+            shares = store.backend.list_payload_values(self.collection, "shared_by")
+            self._existing = set(shares)
+            self._stored_shares = {point_id: tuple(shared or ()) for point_id, shared in shares.items()}
+        # Ids making up the index once committed, and ids written so far
+        self._incoming: Set[str] = set()
+        self._written: Set[str] = set()
+        # 'shared_by' each incoming chunk should end up with
+        self._shares: Dict[str, Tuple[str, ...]] = {}
+        self._finished = False
+    
+    @property
+    def total(self) -> int:
+        """Chunks in this write so far, including unchanged ones."""
+        return len(self._incoming)
+    
+    def select(self, documents: List[Dict[str, str]]) -> Tuple[List[str], List[Dict[str, str]]]:
+        """
+        Add documents to this write.
+        
+        Returns:
+            (ids, documents) of those that still need embedding and writing;
+            the rest are already in the collection or in this write
+        """
+        ids, pending = [], []
+        for document in documents:
+            point_id = document_id(document)
+            if point_id in self._incoming:
+                continue
+            self._incoming.add(point_id)
+            self._shares[point_id] = tuple(document.get('metadata', {}).get('shared_by') or ())
+            if point_id not in self._existing:
+                ids.append(point_id)
+                pending.append(document)
+        return ids, pending
+    
+    def reshare(self, documents: List[Dict[str, str]]):
+        """Record the current 'shared_by' of documents already selected (applied on commit)."""
+        for document in documents:
+            point_id = document_id(document)
+            if point_id in self._incoming:
+                self._shares[point_id] = tuple(document.get('metadata', {}).get('shared_by') or ())
+    
+    def write(
+        self,
+        ids: List[str],
+        documents: List[Dict[str, str]],
+        vectors: List[List[float]],
+        wait: bool = True
+    ):
+        """Upsert embedded documents selected by select()."""
+        payloads = [
+            {"content": document['content'], **document.get('metadata', {})}
+            for document in documents
+        ]
+        self.store.backend.upsert(self.collection, ids, vectors, payloads, wait=wait)
+        self._written.update(ids)
+        for point_id, payload in zip(ids, payloads):
+            self._stored_shares[point_id] = tuple(payload.get('shared_by') or ())
+    
+    def commit(self, prune: bool = True) -> Dict[str, int]:
+        """
+        Publish the write: update 'shared_by' payloads that changed, then
+        activate the new collection or (incremental) delete chunks no longer
+        part of the index.
+        
+        Args:
+            prune: Delete existing chunks missing from this write (incremental only)
+            
+        Returns:
+            Dict with 'added', 'removed', 'updated' (payload only),
+            'unchanged' and 'total' counts
+        """
+        store = self.store
+        updated = self._update_shares()
+        added = len(self._written - self._existing)
+        stale = []
+        if prune and not self.full:
+            stale = list(self._existing - self._incoming)
+        store.backend.delete(self.collection, stale)
+        self._finished = True
+        
+        stats = {
+            "added": added,
+            "removed": len(stale),
+            "updated": len(updated - self._written),
+            "unchanged": len(self._incoming) - added - len(updated - self._written),
+            "total": len(self._incoming),
+        }
+        changed = bool(added or stats["removed"] or stats["updated"])
+        if self.full:
+            store._activate(self.collection)
+            VectorStore._initialized = stats["total"] > 0
+            logger.info(f"Rebuilt vector store: {stats['total']} documents in '{self.collection}'")
+        else:
+            store._refresh_count()
+            if changed:
+                store._bump_index_version()
+            VectorStore._initialized = VectorStore._point_count > 0
+            logger.info(
+                f"Synced vector store: {stats['added']} added, {stats['removed']} removed, "
+                f"{stats['updated']} updated, {stats['unchanged']} unchanged"
+            )
+        if prune:
+            # A complete build (not add_documents): persist it for the next start
+            store._save_snapshot(force=self.full or changed)
+        return stats
+    
+    def _update_shares(self) -> Set[str]:
+        """Set 'shared_by' where the collection holds another value; returns the ids updated."""
+        by_shares: Dict[Tuple[str, ...], List[str]] = {}
+        for point_id, shares in self._shares.items():
+            if point_id in self._stored_shares and self._stored_shares[point_id] != shares:
+                by_shares.setdefault(shares, []).append(point_id)
+        for shares, ids in by_shares.items():
+            self.store.backend.set_payload(self.collection, ids, {"shared_by": list(shares) or None})
+            for point_id in ids:
+                self._stored_shares[point_id] = shares
+        return {point_id for ids in by_shares.values() for point_id in ids}
+    
+    def abort(self):
+        """Undo the write: drop the new collection, or delete the chunks written."""
+        if self._finished:
+            return
+        self._finished = True
+        if self.full:
+            self.store._retire_collection(self.collection, delay=0)
+        else:
+            self.store.backend.delete(self.collection, list(self._written))
+            self.store._refresh_count()
+
 
 class VectorStore:
-    """Manages Qdrant vector storage and retrieval."""
+    """Manages vector storage (Qdrant or NumPy) and retrieval."""
     
     _instance = None
-    _client = None
+    _backend = None
+    # Stable public name: an alias pointing at the active versioned collection
     _collection_name = None
+    # Concrete collection that searches and writes currently go to
+    _active_collection = None
+    # Point count of the active collection, refreshed after every write so
+    # searches don't need a get_collection round trip
+    _point_count = 0
     _initialized = False
+    _rebuild_lock = threading.Lock()
+    # Bumped whenever the searchable content changes; listeners registered
+    # with on_index_change() are called with the new version
+    _index_version = 0
+    _index_listeners: List[Callable[[int], None]] = []
+    # On-disk copy of the index for in-memory backends (None otherwise)
+    _snapshot: Optional[IndexSnapshot] = None
+    # Manifest of the snapshot the index was restored from at startup
+    restored_snapshot: Optional[Dict] = None
     
     def __new__(cls):
         """Singleton pattern for vector store."""
@@ -32,62 +239,206 @@ class VectorStore:
     
     def __init__(self):
         """
-        Initialize Qdrant client.
-        Supports both in-memory storage and external Qdrant server.
+        Initialize the storage backend.
+        Supports in-memory Qdrant, an external Qdrant server, and the
+        in-process NumPy backend (see vector_backends.create_backend).
         Set QDRANT_URL environment variable to use an external server.
         """
-        if VectorStore._client is None:
-            qdrant_url = config.QDRANT_URL
-            
-            if qdrant_url == ":memory:" or not qdrant_url:
-                # Use in-memory Qdrant - no external server needed
-                logger.info("Initializing Qdrant (in-memory mode)")
-                VectorStore._client = QdrantClient(":memory:")
-            else:
-                # Connect to external Qdrant server (self-hosted open source)
-                logger.info(f"Connecting to external Qdrant server at {qdrant_url}")
-                try:
-                    VectorStore._client = QdrantClient(url=qdrant_url)
-                    logger.info("Connected to external Qdrant server successfully")
-                except Exception as e:
-                    logger.error(f"Failed to connect to Qdrant server: {e}")
-                    logger.info("Falling back to in-memory mode")
-                    VectorStore._client = QdrantClient(":memory:")
-            
+        if VectorStore._backend is None:
+            VectorStore._backend = create_backend()
             VectorStore._collection_name = config.COLLECTION_NAME
+            if config.ENABLE_INDEX_SNAPSHOT and VectorStore._backend.in_memory:
+                VectorStore._snapshot = IndexSnapshot(os.path.join(config.CACHE_DIR, "index"))
             
-            # Create collection if it doesn't exist
-            self._create_collection()
+            # Restore the last build, or resolve the live collection behind
+            # the alias (creating one if needed)
+            VectorStore._active_collection = (
+                self._restore_snapshot() or self._resolve_active_collection()
+            )
+            self._refresh_count()
             
-            logger.info(f"Qdrant collection '{config.COLLECTION_NAME}' ready")
+            logger.info(
+                f"Vector collection '{config.COLLECTION_NAME}' ready "
+                f"(active: {VectorStore._active_collection})"
+            )
+    
+    def _resolve_active_collection(self) -> str:
+        """
+        Find the collection the public alias points to.
+        Deployments that predate aliases keep using their plain collection
+        until the next rebuild replaces it.
+        """
+        alias = VectorStore._collection_name
+        try:
+            target = self.backend.get_alias(alias)
+            if target:
+                self._drop_stale_collections(keep=target)
+                return target
+            if self.backend.collection_exists(alias):
+                return alias
+        except Exception as e:
+            logger.debug(f"Alias lookup note: {e}")
+        
+        name = self._new_collection_name()
+        self._create_collection(name)
+        try:
+            self.backend.set_alias(alias, name)
+        except Exception as e:
+            logger.warning(f"Could not create alias '{alias}': {e}")
+        return name
+    
+    def _restore_snapshot(self) -> Optional[str]:
+        """
+        Load the saved index into a new collection behind the alias.
+        Only a snapshot embedded with the current model, backend and
+        quantization is used (the embedding model is already loaded by
+        then, at import of the embeddings module).
+        
+        Returns:
+            Name of the restored collection, or None if there is no usable snapshot
+        """
+        if VectorStore._snapshot is None:
+            return None
+        started = time.perf_counter()
+        loaded = VectorStore._snapshot.load(
+            config.EMBEDDING_MODEL,
+            config.EMBEDDING_BACKEND,
+            embedding_quantization(config.EMBEDDING_BACKEND)
+        )
+        if loaded is None:
+            return None
+        manifest, ids, vectors, payloads = loaded
+        
+        name = self._new_collection_name()
+        try:
+            self.backend.load_collection(name, ids, vectors, payloads)
+            self.backend.set_alias(VectorStore._collection_name, name)
+        except Exception as e:
+            logger.warning(f"Failed to restore index snapshot: {e}")
+            return None
+        VectorStore._initialized = True
+        VectorStore.restored_snapshot = manifest
+        logger.info(
+            f"Restored {len(ids)} documents from the index snapshot of "
+            f"{time.ctime(manifest['built_at'])} in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return name
+    
+    def _save_snapshot(self, force: bool = True):
+        """
+        Save the active collection (in-memory backends only).
+        
+        Args:
+            force: Save even if a snapshot exists and the index is unchanged
+        """
+        snapshot = VectorStore._snapshot
+        if snapshot is None or (not force and snapshot.exists()):
+            return
+        try:
+            if VectorStore._point_count == 0:
+                snapshot.remove()
+                return
+            ids, vectors, payloads = self.backend.export(VectorStore._active_collection)
+            snapshot.save(
+                ids, vectors, payloads,
+                config.EMBEDDING_MODEL,
+                config.EMBEDDING_BACKEND,
+                embedding_quantization(config.EMBEDDING_BACKEND)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save index snapshot: {e}")
+    
+    def _new_collection_name(self) -> str:
+        """Versioned collection name for a new build."""
+        return f"{VectorStore._collection_name}__v{time.time_ns()}"
     
-    def _create_collection(self):
-        """Create the vector collection if it doesn't exist."""
+    def _create_collection(self, name: str):
+        """Create a vector collection if it doesn't exist."""
         try:
             # Get embedding dimension
             dim = embedding_manager.get_embedding_dimension()
             
             # Create collection
-            VectorStore._client.create_collection(
-                collection_name=VectorStore._collection_name,
-                vectors_config=VectorParams(
-                    size=dim,
-                    distance=Distance.COSINE
-                )
-            )
-            logger.info(f"Created collection with dimension {dim}")
+            VectorStore._backend.create_collection(name, dim)
+            logger.info(f"Created collection '{name}' with dimension {dim}")
         except Exception as e:
             # Collection might already exist
             logger.debug(f"Collection creation note: {e}")
     
+    def _drop_stale_collections(self, keep: str):
+        """
+        Delete versioned collections left behind by interrupted builds.
+        On an external server another replica may be building one right
+        now, so only versions older than STALE_BUILD_MAX_AGE_SECONDS
+        (by the build time in their name) are dropped there.
+        """
+        prefix = f"{VectorStore._collection_name}__v"
+        cutoff_ns = time.time_ns() - int(config.STALE_BUILD_MAX_AGE_SECONDS * 1e9)
+        for name in self.backend.list_collections():
+            if not name.startswith(prefix) or name == keep:
+                continue
+            if not self.backend.in_memory:
+                try:
+                    built_ns = int(name[len(prefix):])
+                except ValueError:
+                    continue
+                if built_ns > cutoff_ns:
+                    continue
+            self._retire_collection(name, delay=0)
+    
+    def _retire_collection(self, name: str, delay: float = None):
+        """
+        Drop an old collection in the background.
+        The delay lets searches that started before the switch finish.
+        """
+        delay = config.RETIRED_COLLECTION_GRACE_SECONDS if delay is None else delay
+        
+        def drop():
+            try:
+                self.backend.delete_collection(name)
+                logger.info(f"Dropped retired collection '{name}'")
+            except Exception as e:
+                logger.warning(f"Failed to drop retired collection '{name}': {e}")
+        
+        timer = threading.Timer(delay, drop)
+        timer.daemon = True
+        timer.start()
+    
+    def on_index_change(self, listener: Callable[[int], None]):
+        """
+        Register a callback for index changes (add, sync, rebuild, clear).
+        
+        Callbacks may run on a worker thread and receive the new index version.
+        """
+        VectorStore._index_listeners.append(listener)
+    
+    def _bump_index_version(self):
+        """Record a content change and notify listeners."""
+        VectorStore._index_version += 1
+        for listener in list(VectorStore._index_listeners):
+            try:
+                listener(VectorStore._index_version)
+            except Exception as e:
+                logger.warning(f"Index change listener failed: {e}")
+    
+    @property
+    def index_version(self) -> int:
+        """Counter that changes whenever the searchable content changes."""
+        return VectorStore._index_version
+    
     @property
     def client(self):
-        """Get the Qdrant client."""
-        return VectorStore._client
+        """Get the Qdrant client (None for the NumPy backend)."""
+        return VectorStore._backend.client
+
+    @property
+    def backend(self):
+        """Get the storage backend."""
+        return VectorStore._backend
     
     def add_documents(self, documents: List[Dict[str, str]]) -> int:
         """
-        Add documents to the vector store.
+        Add documents to the live collection.
         
         Args:
             documents: List of dicts with 'content' and 'metadata' keys
@@ -95,38 +446,144 @@ class VectorStore:
         Returns:
             Number of documents added
         """
-        if not documents:
-            return 0
+        with self.writer() as writer:
+            count = self._index_documents(writer, documents)
+            writer.commit(prune=False)
+        if count:
+            logger.info(f"Added {count} documents to vector store")
+        return count
+    
+    @contextmanager
+    def writer(self, full: bool = False) -> Iterator["IndexWriter"]:
+        """
+        Open an IndexWriter, holding the rebuild lock until the block ends.
         
-        # Extract content and metadata
-        contents = [doc['content'] for doc in documents]
-        metadatas = [doc.get('metadata', {}) for doc in documents]
-        
-        # Generate embeddings
-        embeddings = embedding_manager.embed_texts(contents)
-        
-        # Create points for Qdrant
-        points = []
-        for i, (content, embedding, metadata) in enumerate(zip(contents, embeddings, metadatas)):
-            point = PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embedding,
-                payload={
-                    "content": content,
-                    **metadata
-                }
-            )
-            points.append(point)
+        Call writer.commit() inside the block to publish the write; if the
+        block raises, everything written so far is rolled back.
         
-        # Add to collection
-        self.client.upsert(
-            collection_name=VectorStore._collection_name,
-            points=points
-        )
+        Args:
+            full: Write a fresh collection (blue/green) instead of syncing
+                the live one
+        """
+        with VectorStore._rebuild_lock:
+            writer = IndexWriter(self, full)
+            try:
+                yield writer
+            except BaseException:
+                writer.abort()
+                raise
+    
+    def rebuild(self, documents: List[Dict[str, str]], progress: Optional[IndexProgress] = None) -> int:
+        """
+        Build a fresh index without interrupting searches (blue/green).
         
-        VectorStore._initialized = True
-        logger.info(f"Added {len(documents)} documents to vector store")
-        return len(documents)
+        Documents are embedded into a new versioned collection while
+        searches keep hitting the current one. Once the new collection is
+        fully populated, the alias and the in-process pointer are switched
+        and the old collection is dropped in the background.
+        
+        Args:
+            documents: List of dicts with 'content' and 'metadata' keys
+            progress: Optional callback, see _index_documents
+            
+        Returns:
+            Number of documents in the new index
+            
+        Raises:
+            IndexingCancelled: If progress asked to stop; the live index is untouched
+        """
+        with self.writer(full=True) as writer:
+            self._index_documents(writer, documents, progress)
+            return writer.commit()["total"]
+    
+    def sync_documents(
+        self,
+        documents: List[Dict[str, str]],
+        progress: Optional[IndexProgress] = None
+    ) -> Dict[str, int]:
+        """
+        Incrementally reconcile the live collection with a fresh crawl.
+        
+        Chunks whose deterministic id already exists are skipped, new or
+        changed chunks are embedded and upserted, and chunks that
+        disappeared from the site are deleted. Upserts happen before
+        deletes so searches never see a gap.
+        
+        Args:
+            documents: List of dicts with 'content' and 'metadata' keys
+            progress: Optional callback, see _index_documents
+            
+        Returns:
+            Dict with 'added', 'removed', 'updated', 'unchanged' and 'total' counts
+            
+        Raises:
+            IndexingCancelled: If progress asked to stop; chunks added so
+                far are removed again, leaving the index as it was
+        """
+        with self.writer() as writer:
+            self._index_documents(writer, documents, progress)
+            return writer.commit()
+    
+    def _activate(self, name: str):
+        """Atomically switch searches and the public alias to a collection."""
+        alias = VectorStore._collection_name
+        previous = VectorStore._active_collection
+        
+        # In-process readers switch first; they never see a partial index
+        VectorStore._point_count = self._fetch_count(name)
+        VectorStore._active_collection = name
+        
+        try:
+            if previous == alias:
+                # Pre-alias deployment: the plain collection must go before
+                # its name can be reused as an alias.
+                self.backend.delete_collection(previous)
+                previous = None
+            self.backend.set_alias(alias, name)
+        except Exception as e:
+            logger.warning(f"Could not update alias '{alias}': {e}")
+        
+        if previous and previous != name:
+            self._retire_collection(previous)
+        self._bump_index_version()
+    
+    def _index_documents(
+        self,
+        writer: "IndexWriter",
+        documents: List[Dict[str, str]],
+        progress: Optional[IndexProgress] = None
+    ) -> int:
+        """
+        Embed the documents a writer still needs and write them, in batches.
+        
+        Args:
+            writer: Open IndexWriter
+            documents: List of dicts with 'content' and 'metadata' keys
+            progress: Optional callback called as ("embed", done, total)
+                before each batch is embedded and ("upsert", done, total)
+                before it is upserted; returning True stops indexing
+            
+        Returns:
+            Number of documents embedded and written
+            
+        Raises:
+            IndexingCancelled: If progress returned True
+        """
+        ids, documents = writer.select(documents)
+        total = len(documents)
+        for start in range(0, total, INDEX_BATCH_SIZE):
+            batch = documents[start:start + INDEX_BATCH_SIZE]
+            if progress is not None and progress("embed", start, total):
+                raise IndexingCancelled(f"Indexing stopped after {start} of {total} chunks")
+            
+            # Generate embeddings
+            embeddings = embedding_manager.embed_texts([doc['content'] for doc in batch])
+            
+            if progress is not None and progress("upsert", start + len(batch), total):
+                raise IndexingCancelled(f"Indexing stopped after {start} of {total} chunks")
+            
+            writer.write(ids[start:start + INDEX_BATCH_SIZE], batch, embeddings)
+        return total
     
     def search(
         self, 
@@ -137,6 +594,30 @@ class VectorStore:
         """
         Search for relevant documents.
         
+        Args:
+            query: Search query
+            n_results: Maximum number of results (defaults to config.MAX_CONTEXT_DOCS)
+            distance_threshold: Maximum distance for relevance (defaults to config.RELEVANCE_THRESHOLD)
+            
+        Returns:
+            List of tuples: (content, distance, metadata)
+        """
+        # Generate query embedding
+        query_embedding = embedding_manager.embed_text(query)
+        return self.search_by_vector(query_embedding, n_results, distance_threshold)
+
+    async def asearch(
+        self,
+        query: str,
+        n_results: int = None,
+        distance_threshold: float = None
+    ) -> List[Tuple[str, float, Dict]]:
+        """
+        Async variant of search() for use inside the RAG pipeline.
+        The query is embedded through the micro-batching queue and the
+        vector lookup is awaited (AsyncQdrantClient for an external server,
+        a worker thread for local mode), keeping the event loop free.
+        
         Args:
             query: Search query
             n_results: Maximum number of results (defaults to config.MAX_CONTEXT_DOCS)
@@ -148,20 +629,46 @@ class VectorStore:
         n_results = n_results or config.MAX_CONTEXT_DOCS
         distance_threshold = distance_threshold or config.RELEVANCE_THRESHOLD
         
-        if self.count() == 0:
+        if VectorStore._point_count == 0:
             logger.warning("Vector store is empty")
             return []
         
-        # Generate query embedding
-        query_embedding = embedding_manager.embed_text(query)
-        
-        # Search
-        results = self.client.search(
-            collection_name=VectorStore._collection_name,
-            query_vector=query_embedding,
-            limit=n_results
+        query_embedding = await query_batcher.embed(query)
+        results = await self.backend.asearch(
+            VectorStore._active_collection, query_embedding, n_results
         )
+        return self._process_hits(results, distance_threshold)
+
+    def search_by_vector(
+        self,
+        query_embedding: List[float],
+        n_results: int = None,
+        distance_threshold: float = None
+    ) -> List[Tuple[str, float, Dict]]:
+        """
+        Search for relevant documents using a precomputed query embedding.
+        
+        Args:
+            query_embedding: Normalized query vector
+            n_results: Maximum number of results (defaults to config.MAX_CONTEXT_DOCS)
+            distance_threshold: Maximum distance for relevance (defaults to config.RELEVANCE_THRESHOLD)
+            
+        Returns:
+            List of tuples: (content, distance, metadata)
+        """
+        n_results = n_results or config.MAX_CONTEXT_DOCS
+        distance_threshold = distance_threshold or config.RELEVANCE_THRESHOLD
         
+        if VectorStore._point_count == 0:
+            logger.warning("Vector store is empty")
+            return []
+        
+        # Search
+        results = self.backend.search(VectorStore._active_collection, query_embedding, n_results)
+        return self._process_hits(results, distance_threshold)
+    
+    def _process_hits(self, results, distance_threshold: float) -> List[Tuple[str, float, Dict]]:
+        """Convert backend hits to (content, distance, metadata) tuples."""
         # Process results
         processed = []
         for hit in results:
@@ -178,23 +685,42 @@ class VectorStore:
         return processed
     
     def count(self) -> int:
-        """Get the number of documents in the store."""
+        """Get the number of documents in the store (tracked locally)."""
+        return VectorStore._point_count
+    
+    def _fetch_count(self, name: str) -> int:
+        """Ask the backend for a collection's point count."""
         try:
-            info = self.client.get_collection(VectorStore._collection_name)
-            return info.points_count
+            return self.backend.count(name)
         except Exception:
             return 0
     
+    def _refresh_count(self):
+        """Re-read the active collection's point count after a write."""
+        VectorStore._point_count = self._fetch_count(VectorStore._active_collection)
+    
+    async def aclose(self):
+        """Release pooled backend connections (call on shutdown)."""
+        await self.backend.aclose()
+    
     def clear(self):
-        """Clear all documents from the store."""
+        """Clear all documents by switching to a fresh, empty collection."""
         try:
-            self.client.delete_collection(VectorStore._collection_name)
-            self._create_collection()
+            with VectorStore._rebuild_lock:
+                name = self._new_collection_name()
+                self._create_collection(name)
+                self._activate(name)
+                self._save_snapshot()
             VectorStore._initialized = False
             logger.info("Vector store cleared")
         except Exception as e:
             logger.error(f"Error clearing vector store: {e}")
     
+    @property
+    def collection_name(self) -> str:
+        """Name of the collection currently serving searches."""
+        return VectorStore._active_collection
+    
     def is_initialized(self) -> bool:
         """Check if the vector store has been populated with data."""
         return VectorStore._initialized and self.count() > 0